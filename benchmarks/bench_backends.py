@@ -0,0 +1,57 @@
+"""Latency of every indicator per compute backend, on the short histories of a
+signal service and on long ones.
+
+The Polars backend copies the data into a lazy frame once per data, which is
+timed on its own row and not in the indicators.
+"""
+
+import argparse
+import importlib.util
+
+from benchmarks.common import best_of, synthetic_ohlcv
+from benchmarks.suite import indicator_names
+from insider.constants import BACKENDS
+from insider.indicators.backends import make_backend
+from insider.stock_insider import StockInsider
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[250, 100_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output-format", default="frame")
+    args = parser.parse_args()
+
+    backends = [
+        backend
+        for backend in BACKENDS
+        if backend != "polars" or importlib.util.find_spec("polars") is not None
+    ]
+    print(f"{'case':<20}" + "".join(f"{backend + ' ms':>12}" for backend in backends))
+    for size in args.sizes:
+        df = synthetic_ohlcv(size)
+        row = [
+            best_of(lambda: make_backend(backend, df), repeat=args.repeat) * 1000
+            for backend in backends
+        ]
+        print(f"{f'setup[{size}]':<20}" + "".join(f"{t:>12.3f}" for t in row))
+
+        for name in indicator_names():
+            row = []
+            for backend in backends:
+                si = StockInsider(
+                    "bench", df=df, output_format=args.output_format, backend=backend
+                )
+
+                def call(si=si):
+                    # drop the cached results so that every call computes
+                    si.clear_cache()
+                    return getattr(si, name)()
+
+                call()
+                row.append(best_of(call, repeat=args.repeat) * 1000)
+            print(f"{name + f'[{size}]':<20}" + "".join(f"{t:>12.3f}" for t in row))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Compare `StockInsider.compute` with calling the indicators one by one, for the
+set of about 20 indicators a feature job asks for per symbol.
+"""
+
+import argparse
+
+from benchmarks.common import best_of, synthetic_ohlcv
+from insider.stock_insider import StockInsider
+
+FEATURES = [
+    ("ma", {"n": 5}),
+    ("ma", {"n": 10}),
+    ("ma", {"n": 20}),
+    ("ema", {"n": 12}),
+    ("ema", {"n": 26}),
+    "macd",
+    "vmacd",
+    "kdj",
+    "rsi",
+    "vrsi",
+    "env",
+    "mike",
+    "boll",
+    "bbiboll",
+    "atr",
+    "dmi",
+    "cdp",
+    "mtm",
+    "obv",
+    "sar",
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[250, 5_000, 100_000])
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--backend", default="pandas")
+    args = parser.parse_args()
+
+    print(f"{'bars':>8} {'one by one ms':>14} {'compute ms':>11} {'speedup':>8}")
+    for size in args.sizes:
+        si = StockInsider("bench", df=synthetic_ohlcv(size), backend=args.backend)
+
+        def one_by_one():
+            si.clear_cache()
+            for item in FEATURES:
+                name, params = (item, {}) if isinstance(item, str) else item
+                getattr(si, name)(**params)
+
+        separate = best_of(one_by_one, repeat=args.repeat) * 1000
+        combined = best_of(lambda: si.compute(FEATURES), repeat=args.repeat) * 1000
+        print(
+            f"{size:>8} {separate:>14.2f} {combined:>11.2f} "
+            f"{separate / combined:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
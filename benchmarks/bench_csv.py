@@ -0,0 +1,55 @@
+"""Time and peak memory of loading external CSV data with extra columns, as a
+plain `pd.read_csv` and with `read_external_csv` (whole file and a date range).
+"""
+
+import argparse
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import best_of, synthetic_ohlcv
+from benchmarks.suite import peak_memory
+from insider.external import read_external_csv
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--extra-cols", type=int, default=10)
+    parser.add_argument("--engine", default=None)
+    args = parser.parse_args()
+
+    df = synthetic_ohlcv(args.rows)
+    rng = np.random.default_rng(0)
+    for i in range(args.extra_cols):
+        df[f"extra{i}"] = rng.normal(size=args.rows)
+    # the last tenth of the minutes in the file
+    start_date = df["day"].iloc[-args.rows // 10]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        fpath = os.path.join(tmp_dir, "external.csv")
+        df.to_csv(fpath, index=False)
+        del df
+        print(f"{os.path.getsize(fpath) / 2**20:.0f} MB, {args.rows:,} rows")
+
+        cases = {
+            "pd.read_csv": lambda: pd.read_csv(fpath),
+            "read_external_csv": lambda: read_external_csv(fpath, engine=args.engine),
+            "last 10% by filter": lambda: read_external_csv(
+                fpath, start_date=start_date, engine=args.engine
+            ),
+            "last 10% by seek": lambda: read_external_csv(
+                fpath, start_date=start_date, sorted_by_day=True, engine=args.engine
+            ),
+        }
+        print(f"{'case':<20} {'time s':>8} {'peak MB':>8}")
+        for name, func in cases.items():
+            print(
+                f"{name:<20} {best_of(func, repeat=1):>8.2f} {peak_memory(func):>8.0f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
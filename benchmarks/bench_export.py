@@ -0,0 +1,42 @@
+"""Charts exported per second by `ChartExporter`, with different numbers of
+worker processes. Images need kaleido; use `--fmt html` without it.
+"""
+
+import argparse
+import tempfile
+
+from benchmarks.common import best_of, synthetic_ohlcv
+from insider.constants import MA_COLS
+from insider.export import ChartExporter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--codes", type=int, default=100)
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--fmt", default="html")
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument(
+        "--indicators", nargs="+", default=["price", "macd", "kdj", "boll"]
+    )
+    args = parser.parse_args()
+
+    frames = {}
+    for i in range(args.codes):
+        df = synthetic_ohlcv(args.rows, seed=i)
+        for col in MA_COLS:
+            df[col] = df["close"].rolling(int(col[2:]), min_periods=1).mean()
+        frames[f"sz{i:06d}"] = df
+    jobs = [(code, name) for code in frames for name in args.indicators]
+
+    print(f"{len(jobs)} {args.fmt} charts")
+    print(f"{'processes':<10} {'time s':>8} {'charts/s':>9}")
+    for processes in args.processes:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            exporter = ChartExporter(tmp_dir, fmt=args.fmt, processes=processes)
+            elapsed = best_of(lambda: exporter.export(jobs, frames=frames), repeat=1)
+        print(f"{processes:<10} {elapsed:>8.2f} {len(jobs) / elapsed:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
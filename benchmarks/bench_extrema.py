@@ -0,0 +1,37 @@
+"""Rolling extrema used by KDJ and MIKE: pandas rolling vs the shared sparse table."""
+
+import argparse
+
+from benchmarks.common import best_of, synthetic_ohlcv
+from insider.stock_insider import StockInsider
+
+
+def pandas_extrema(df, ns):
+    for n in ns:
+        df["low"].rolling(n).min()
+        df["high"].rolling(n).max()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bars", type=int, default=1_000_000)
+    parser.add_argument("--ns", type=int, nargs="+", default=[9, 12, 26])
+    args = parser.parse_args()
+
+    df = synthetic_ohlcv(args.bars)
+
+    def shared():
+        si = StockInsider("bench", df=df)
+        si._rolling_extrema("low", args.ns, kind="min")
+        si._rolling_extrema("high", args.ns, kind="max")
+
+    pandas_time = best_of(lambda: pandas_extrema(df, args.ns))
+    shared_time = best_of(shared)
+    print(f"bars: {args.bars}, windows: {args.ns}")
+    print(f"pandas rolling: {pandas_time:8.3f} s")
+    print(f"sparse table:   {shared_time:8.3f} s")
+    print(f"speedup:        {pandas_time / shared_time:8.1f} x")
+
+
+if __name__ == "__main__":
+    main()
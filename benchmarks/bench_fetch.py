@@ -0,0 +1,74 @@
+"""End-to-end fetch throughput and tail latency of `StockUniverse` against a local
+`ReplayServer`.
+
+With `--tail-prob`, that share of the responses is delayed by `--tail-delay`
+seconds, and the run is repeated with hedged requests to compare the latencies.
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks.bench_parse import synthetic_record
+from insider.fetch import Fetcher
+from insider.replay import ReplayServer
+from insider.universe import StockUniverse
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--codes", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=2_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--tail-prob", type=float, default=0.0)
+    parser.add_argument("--tail-delay", type=float, default=0.5)
+    parser.add_argument("--hedge-percentile", type=float, default=90)
+    args = parser.parse_args()
+
+    codes = [f"sz{i:06d}" for i in range(args.codes)]
+    record = synthetic_record(args.rows)
+    rng = random.Random(0)
+
+    def latency():
+        return args.tail_delay if rng.random() < args.tail_prob else 0
+
+    policies = {"plain": None}
+    if args.tail_prob:
+        policies["hedged"] = args.hedge_percentile
+
+    with ReplayServer(latency=latency) as server:
+        for code in codes:
+            server.add(code, "D", record)
+
+        print(
+            f"{'policy':>8} {'workers':>8} {'codes/s':>10} {'rows/s':>14} "
+            f"{'p50 ms':>8} {'p99 ms':>8} {'hedges':>7}"
+        )
+        for policy, hedge_percentile in policies.items():
+            for workers in args.workers:
+                fetcher = Fetcher(
+                    session=StockUniverse._make_session(workers),
+                    hedge_percentile=hedge_percentile,
+                )
+                universe = StockUniverse(
+                    codes, max_workers=workers, url=server.url, fetcher=fetcher
+                )
+                start = time.perf_counter()
+                universe.load()
+                elapsed = time.perf_counter() - start
+                assert not universe.failures, universe.failures
+
+                stats = fetcher.stats.summary()
+                print(
+                    f"{policy:>8} {workers:>8} {len(codes) / elapsed:>10,.0f} "
+                    f"{len(codes) * args.rows / elapsed:>14,.0f} "
+                    f"{stats['p50'] * 1000:>8.1f} {stats['p99'] * 1000:>8.1f} "
+                    f"{stats['hedges']:>7}"
+                )
+                fetcher.close()
+
+
+if __name__ == "__main__":
+    main()
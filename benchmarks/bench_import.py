@@ -0,0 +1,51 @@
+"""Import time of the compute path in a fresh interpreter, against the first chart.
+
+Each case runs in a new process, as a spawned worker would. The compute path must
+not load plotly; the script fails if it does.
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+CASES = {
+    "import insider.stock_insider": "import insider.stock_insider",
+    "compute macd": (
+        "from insider.stock_insider import StockInsider; "
+        "from benchmarks.common import synthetic_ohlcv; "
+        "StockInsider('bench', df=synthetic_ohlcv(1000)).macd()"
+    ),
+    "first plot_macd": (
+        "from insider.stock_insider import StockInsider; "
+        "from benchmarks.common import synthetic_ohlcv; "
+        "StockInsider('bench', df=synthetic_ohlcv(1000)).plot_macd(show=False)"
+    ),
+}
+CHECK = "; import sys; print(any(m.startswith('plotly') for m in sys.modules))"
+
+
+def run(code: str):
+    start = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", code + CHECK], check=True, capture_output=True, text=True
+    )
+    return time.perf_counter() - start, out.stdout.strip() == "True"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'case':<32} {'best s':>8} {'plotly':>7}")
+    for name, code in CASES.items():
+        results = [run(code) for _ in range(args.repeat)]
+        loaded = results[0][1]
+        print(f"{name:<32} {min(t for t, _ in results):>8.3f} {str(loaded):>7}")
+        if loaded and "plot" not in name:
+            sys.exit(f"{name} loaded plotly")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Compare the numba kernels of `insider.indicators.jit` with the pandas and
+Python code they replace, on one long series and on a panel of many stocks.
+
+The kernels are compiled, or loaded from the numba cache, before timing; the
+time of the first call is reported separately.
+"""
+
+import argparse
+import time
+
+from benchmarks.common import best_of, synthetic_ohlcv
+from insider.indicators import jit
+from insider.indicators.sar import _sar, _sar_panel
+from insider.panel import StockPanel
+
+
+def cases(close, high, low):
+    yield "ema(12)", (
+        lambda: close.ewm(span=12, adjust=False, min_periods=0).mean(),
+        lambda: jit.ewm_mean(close, span=12),
+    )
+    yield "sma(6)", (
+        lambda: close.ewm(alpha=1 / 6, adjust=False, min_periods=0).mean(),
+        lambda: jit.ewm_mean(close, alpha=1 / 6),
+    )
+    yield "obv sum", (
+        lambda: close.expanding(1).sum(),
+        lambda: jit.cumsum(close),
+    )
+    arrays = [high.to_numpy(), low.to_numpy(), close.to_numpy()]
+    if close.ndim == 1:
+        yield "sar", (lambda: _sar(*arrays), lambda: jit.sar(*arrays))
+    else:
+        yield "sar", (lambda: _sar_panel(*arrays), lambda: jit.sar_panel(*arrays))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bars", type=int, default=1_000_000)
+    parser.add_argument("--codes", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=2_000)
+    args = parser.parse_args()
+
+    if not jit.available():
+        raise SystemExit("numba is not installed, or disabled by $INSIDER_JIT")
+
+    df = synthetic_ohlcv(args.bars)
+    frames = {
+        f"sz{i:06d}": synthetic_ohlcv(args.rows, seed=i).iloc[i % 200 :]
+        for i in range(args.codes)
+    }
+    panel = StockPanel.from_frames(frames).full_data
+    inputs = {
+        f"series[{args.bars}]": df,
+        f"panel[{args.rows}x{args.codes}]": panel,
+    }
+
+    print(f"{'case':<32} {'first s':>8} {'pandas s':>9} {'jit s':>8} {'speedup':>8}")
+    for shape, data in inputs.items():
+        for name, (reference, compiled) in cases(
+            data["close"], data["high"], data["low"]
+        ):
+            start = time.perf_counter()
+            compiled()
+            first = time.perf_counter() - start
+            baseline, fast = best_of(reference), best_of(compiled)
+            print(
+                f"{name + ' ' + shape:<32} {first:>8.3f} {baseline:>9.4f} "
+                f"{fast:>8.4f} {baseline / fast:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Throughput of limit-up detection: the row by row `.apply` of the old
+`reach_surged_limit` against `limit_hits` on a full-market snapshot, and
+`limit_matrix` over days x codes of history.
+"""
+
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.common import best_of
+from insider.limits import limit_hits, limit_matrix
+
+
+def snapshot(rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    prefixes = np.array(["sh600", "sz000", "sz300", "sh688", "bj830"])
+    preprice = np.round(rng.uniform(1, 200, rows), 2)
+    # about one in ten rows closes at +10%
+    change = np.where(rng.random(rows) < 0.1, 0.1, rng.normal(0, 0.03, rows))
+    return pd.DataFrame(
+        {
+            "code": np.char.add(
+                prefixes[rng.integers(0, len(prefixes), rows)],
+                np.char.zfill((np.arange(rows) % 1000).astype(str), 3),
+            ),
+            "name": np.where(rng.random(rows) < 0.05, "*ST", "stock"),
+            "preprice": preprice,
+            "price": np.round(preprice * (1 + change), 2),
+        }
+    )
+
+
+def apply_surged_limit(df: pd.DataFrame) -> pd.Series:
+    """The old row by row check, with a fixed 10% limit."""
+    surged = df["preprice"].apply(lambda x: round(x * 1.1, 2))
+    return (surged == df["price"]) & (df["preprice"] != df["price"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--days", type=int, default=1_000)
+    parser.add_argument("--codes", type=int, default=5_000)
+    args = parser.parse_args()
+
+    df = snapshot(args.rows)
+    rng = np.random.default_rng(1)
+    close = pd.DataFrame(
+        np.round(
+            10 * np.exp(np.cumsum(rng.normal(0, 0.03, (args.days, args.codes)), 0)), 2
+        ),
+        index=pd.bdate_range("2018-01-01", periods=args.days),
+        columns=[f"sz{300000 + i:06d}" for i in range(args.codes)],
+    )
+
+    cases = {
+        f"apply [{args.rows:,} rows]": (args.rows, lambda: apply_surged_limit(df)),
+        f"limit_hits [{args.rows:,} rows]": (args.rows, lambda: limit_hits(df)),
+        f"limit_matrix [{args.days} x {args.codes}]": (
+            close.size,
+            lambda: limit_matrix(close),
+        ),
+    }
+    print(f"{'case':<36} {'time s':>8} {'M rows/s':>9}")
+    for name, (rows, func) in cases.items():
+        elapsed = best_of(func, repeat=1)
+        print(f"{name:<36} {elapsed:>8.2f} {rows / elapsed / 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""Latency of every indicator per output format, on the short histories of a
+signal service and on long ones.
+"""
+
+import argparse
+
+from benchmarks.common import best_of, synthetic_ohlcv
+from benchmarks.suite import indicator_names
+from insider.constants import OUTPUT_FORMATS
+from insider.stock_insider import StockInsider
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[250, 100_000])
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--read-only", action="store_true")
+    args = parser.parse_args()
+
+    print(f"{'case':<20}" + "".join(f"{fmt + ' ms':>12}" for fmt in OUTPUT_FORMATS))
+    for size in args.sizes:
+        df = synthetic_ohlcv(size)
+        for name in indicator_names():
+            row = []
+            for fmt in OUTPUT_FORMATS:
+                si = StockInsider(
+                    "bench", df=df, read_only=args.read_only, output_format=fmt
+                )
+
+                def call(si=si):
+                    # drop the cached results so that every call computes
+                    si.clear_cache()
+                    return getattr(si, name)()
+
+                row.append(best_of(call, repeat=args.repeat) * 1000)
+            print(f"{name + f'[{size}]':<20}" + "".join(f"{t:>12.3f}" for t in row))
+
+
+if __name__ == "__main__":
+    main()
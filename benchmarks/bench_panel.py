@@ -0,0 +1,48 @@
+"""Full-market indicator pass: one `StockInsider` per stock against one `StockPanel`."""
+
+import argparse
+
+from benchmarks.common import best_of, synthetic_ohlcv
+from insider.panel import StockPanel
+from insider.stock_insider import StockInsider
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--codes", type=int, default=500)
+    parser.add_argument("--rows", type=int, default=1_000)
+    parser.add_argument(
+        "--indicators", nargs="+", default=["macd", "kdj", "boll", "rsi", "sar"]
+    )
+    args = parser.parse_args()
+
+    frames = {
+        f"sz{i:06d}": synthetic_ohlcv(args.rows, seed=i) for i in range(args.codes)
+    }
+    build = best_of(lambda: StockPanel.from_frames(frames), repeat=1)
+    panel = StockPanel.from_frames(frames)
+    print(f"{args.codes} stocks x {args.rows} bars, panel built in {build:.2f} s")
+    print(f"{'indicator':<10} {'per stock s':>12} {'panel s':>10} {'speedup':>8}")
+    for name in args.indicators:
+        per_stock = best_of(
+            lambda: [
+                getattr(StockInsider(code, df=df), name)()
+                for code, df in frames.items()
+            ],
+            repeat=1,
+        )
+
+        def run_panel():
+            # drop the cached results so that each run computes the indicator
+            panel.clear_cache()
+            getattr(panel, name)()
+
+        elapsed = best_of(run_panel)
+        print(
+            f"{name:<10} {per_stock:>12.2f} {elapsed:>10.3f} "
+            f"{per_stock / elapsed:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Parse throughput of the ifeng `record` payload in `Stock._parse_record`."""
+
+import argparse
+
+import pandas as pd
+
+from benchmarks.common import best_of, synthetic_ohlcv
+from insider.constants import DAY_COL, NUMERIC_COLUMNS
+from insider.stock import Stock
+
+
+def synthetic_record(n: int) -> list:
+    """Build an ifeng-like payload where numbers are strings with thousands separators."""
+    df = synthetic_ohlcv(n)
+    df["day"] = df["day"].str[:10]
+    df["volumn"] *= 100
+    for col in NUMERIC_COLUMNS:
+        if col not in df:
+            df[col] = df["close"]
+    cols = [df["day"]] + [df[col].map("{:,.2f}".format) for col in NUMERIC_COLUMNS]
+    return [list(row) for row in zip(*cols)]
+
+
+def applymap_parse(record: list) -> pd.DataFrame:
+    """Former per-cell parsing of the payload."""
+    df = pd.DataFrame(record, columns=DAY_COL + NUMERIC_COLUMNS)
+    df[NUMERIC_COLUMNS] = (
+        df[NUMERIC_COLUMNS]
+        .apply(lambda x: x.map(lambda v: v.replace(",", "")))
+        .astype("float64")
+    )
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[5_000, 50_000, 500_000])
+    args = parser.parse_args()
+
+    print(
+        f"{'rows':>10} {'per-cell rows/s':>18} {'vectorized rows/s':>18} {'speedup':>8}"
+    )
+    for n in args.rows:
+        record = synthetic_record(n)
+        per_cell = best_of(lambda: applymap_parse(record))
+        vectorized = best_of(lambda: Stock._parse_record(record))
+        print(
+            f"{n:>10} {n / per_cell:>18,.0f} {n / vectorized:>18,.0f} "
+            f"{per_cell / vectorized:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
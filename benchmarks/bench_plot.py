@@ -0,0 +1,42 @@
+"""Figure build time and JSON payload of long-history charts, with the default
+point budget and with every point (`max_points=None`).
+"""
+
+import argparse
+
+from benchmarks.common import best_of, synthetic_ohlcv
+from insider.constants import MA_COLS
+from insider.stock_insider import StockInsider
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000]
+    )
+    parser.add_argument("--plots", nargs="+", default=["plot", "plot_ma", "plot_sar"])
+    args = parser.parse_args()
+
+    print(f"{'case':<28} {'budget s':>9} {'budget MB':>10} {'all s':>8} {'all MB':>8}")
+    for size in args.sizes:
+        df = synthetic_ohlcv(size)
+        for col in MA_COLS:
+            df[col] = df["close"]
+        insider = StockInsider("bench", df=df)
+        for name in args.plots:
+            row = []
+            for max_points in (StockInsider.max_points, None):
+                insider.max_points = max_points
+
+                def build():
+                    return getattr(insider, name)(head=None, show=False).to_json()
+
+                row += [best_of(build, repeat=1), len(build()) / 2**20]
+            print(
+                f"{name + f'[{size}]':<28} {row[0]:>9.2f} {row[1]:>10.2f} "
+                f"{row[2]:>8.2f} {row[3]:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+"""Time and peak memory of every indicator and of the data accessors, with the
+data copied per call (default) and shared in read-only mode.
+
+Each instance is built, and its data frozen, once up front, so only the cost per
+call is measured.
+"""
+
+import argparse
+
+from benchmarks.common import best_of, synthetic_ohlcv
+from benchmarks.suite import indicator_names, peak_memory
+from insider.stock_insider import StockInsider
+
+
+def cases(df):
+    middle = df["day"].iloc[len(df) // 2]
+    yield "full_data", lambda si: si.full_data
+    yield "show_data", lambda si: si.show_data(start_date=middle)
+    for name in indicator_names():
+        yield name, lambda si, name=name: getattr(si, name)()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'case':<24} {'copy s':>8} {'copy MB':>8} {'ro s':>8} {'ro MB':>8}")
+    for size in args.sizes:
+        df = synthetic_ohlcv(size)
+        for name, func in cases(df):
+            row = []
+            for read_only in (False, True):
+                si = StockInsider("bench", df=df, read_only=read_only)
+
+                def call(si=si):
+                    # drop the cached results so that every call computes
+                    si.clear_cache()
+                    return func(si)
+
+                row += [best_of(call, repeat=args.repeat), peak_memory(call)]
+            print(
+                f"{name + f'[{size}]':<24} {row[0]:>8.4f} {row[1]:>8.1f} "
+                f"{row[2]:>8.4f} {row[3]:>8.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
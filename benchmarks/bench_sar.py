@@ -0,0 +1,77 @@
+"""Compare the array SAR kernel with the former per-row `.loc` loop.
+
+The `.loc` loop is far too slow to run on 1M bars, so it is timed on a
+smaller sample and its cost is extrapolated linearly (the loop is O(n)).
+"""
+
+import argparse
+
+from benchmarks.common import best_of, synthetic_ohlcv
+from insider.stock_insider import StockInsider
+
+
+def loc_sar(df):
+    df_sar = df.loc[:, ["day", "close", "high", "low"]]
+    trend, af = True, 0.02
+    df_sar.loc[:, "sar"] = df_sar["close"]
+    df_sar.loc[:, "trend"] = True
+    start_high = df_sar.loc[0, "high"]
+    start_low = df_sar.loc[0, "low"]
+    for i in range(1, len(df_sar)):
+        reverse = False
+        if trend:
+            df_sar.loc[i, "sar"] = df_sar.loc[i - 1, "sar"] + (
+                af * (start_high - df_sar.loc[i - 1, "sar"])
+            )
+            if df_sar.loc[i, "low"] < df_sar.loc[i, "sar"]:
+                reverse = True
+                start_low = df_sar.loc[i, "low"]
+                df_sar.loc[i, "sar"] = start_high
+                af = 0.02
+            elif df_sar.loc[i, "high"] > start_high:
+                start_high = df_sar.loc[i, "high"]
+                af = min(af + 0.02, 0.2)
+        else:
+            df_sar.loc[i, "sar"] = df_sar.loc[i - 1, "sar"] + (
+                af * (start_low - df_sar.loc[i - 1, "sar"])
+            )
+            if df_sar.loc[i, "high"] > df_sar.loc[i, "sar"]:
+                reverse = True
+                start_high = df_sar.loc[i, "high"]
+                df_sar.loc[i, "sar"] = start_low
+                af = 0.02
+            elif df_sar.loc[i, "low"] < start_low:
+                start_low = df_sar.loc[i, "low"]
+                af = min(af + 0.02, 0.2)
+        trend = trend != reverse
+        df_sar.loc[i, "trend"] = trend
+    return df_sar
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--bars", type=int, default=1_000_000)
+    parser.add_argument("--loc-bars", type=int, default=5_000)
+    args = parser.parse_args()
+
+    df = synthetic_ohlcv(args.bars)
+    insider = StockInsider("bench", df=df)
+
+    def sar():
+        # drop the cached result so that every call runs the kernel
+        insider.clear_cache()
+        return insider.sar()
+
+    kernel = best_of(sar)
+
+    loc_sample = best_of(lambda: loc_sar(df.head(args.loc_bars)), repeat=1)
+    loc_estimate = loc_sample * args.bars / args.loc_bars
+
+    print(f"bars: {args.bars}")
+    print(f"array kernel:        {kernel:10.3f} s")
+    print(f".loc loop (estimate): {loc_estimate:10.3f} s")
+    print(f"speedup:             {loc_estimate / kernel:10.1f} x")
+
+
+if __name__ == "__main__":
+    main()
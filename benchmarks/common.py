@@ -0,0 +1,40 @@
+"""Helpers shared by the benchmark scripts.
+
+Run the benchmarks from the repository root, e.g. ``python -m benchmarks.bench_sar``.
+"""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def synthetic_ohlcv(n: int, seed: int = 0) -> pd.DataFrame:
+    """Build a random-walk OHLCV frame with the same columns as the fetched data."""
+    rng = np.random.default_rng(seed)
+    close = 10 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    open_ = close * (1 + rng.normal(0, 0.01, n))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.02, n))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.02, n))
+    volumn = rng.integers(100_000, 10_000_000, n).astype("float64")
+    day = pd.date_range("1990-01-01", periods=n, freq="min").strftime("%Y-%m-%d %H:%M")
+    return pd.DataFrame(
+        {
+            "day": day,
+            "open": open_,
+            "high": high,
+            "close": close,
+            "low": low,
+            "volumn": volumn,
+        }
+    )
+
+
+def best_of(func, repeat: int = 3) -> float:
+    """Return the best wall time of `repeat` calls of `func` in seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
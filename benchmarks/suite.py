@@ -0,0 +1,140 @@
+"""Benchmark suite of all indicators and of the fetch/parse and CSV loading paths.
+
+Every public method of the indicator mixins is run on synthetic OHLCV data of
+each size, `Stock._get_stock_data` is run against a `ReplayServer` stand-in of
+the ifeng endpoint and `StockInsider.from_external_csv_data` on a CSV file. Wall
+time (best of `--repeat`) and peak traced memory are reported for each case.
+
+    python -m benchmarks.suite --save baseline.json
+    python -m benchmarks.suite --compare baseline.json
+
+With `--compare`, cases whose time or peak memory exceeds `--threshold` times
+the baseline are reported as regressions and the exit code is 1.
+"""
+
+import argparse
+import inspect
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from benchmarks.bench_parse import synthetic_record
+from benchmarks.common import best_of, synthetic_ohlcv
+from insider import stock
+from insider.indicators.price import PriceIndicatorMixin
+from insider.indicators.sar import SARIndicatorMixin
+from insider.indicators.volume import VolumnIndicatorMixin
+from insider.replay import ReplayServer
+from insider.stock_insider import StockInsider
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000]
+MIXINS = [PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicatorMixin]
+METRICS = ["time", "peak_mb"]
+
+
+def indicator_names():
+    names = []
+    for mixin in MIXINS:
+        for name, _ in inspect.getmembers(mixin, inspect.isfunction):
+            if not name.startswith("_") and name in vars(mixin):
+                names.append(name)
+    return names
+
+
+def peak_memory(func) -> float:
+    """Peak memory in MB traced while running `func` once."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def cases(sizes, tmp_dir, server):
+    """Yield (name, callable) for every benchmark case."""
+    for i, size in enumerate(sizes):
+        df = synthetic_ohlcv(size)
+        for name in indicator_names():
+            # a new instance per call so that the indicator cache is never hit
+            yield f"indicator.{name}[{size}]", (
+                lambda name=name, df=df: getattr(StockInsider("bench", df=df), name)()
+            )
+
+        fpath = os.path.join(tmp_dir, f"external_{size}.csv")
+        df.to_csv(fpath, index=False)
+        yield f"load.csv[{size}]", (
+            lambda fpath=fpath: StockInsider.from_external_csv_data(fpath)
+        )
+
+        code = f"sh{i:06d}"
+        server.add(code, "D", synthetic_record(size))
+        yield f"fetch.ifeng[{size}]", (
+            lambda code=code: stock.Stock(code, url=server.url)
+        )
+
+
+def run(sizes, repeat: int, pattern: str = None) -> dict:
+    results = {}
+    with ReplayServer() as server, tempfile.TemporaryDirectory() as tmp_dir:
+        for name, func in cases(sizes, tmp_dir, server):
+            if pattern and pattern not in name:
+                continue
+            results[name] = {
+                "time": best_of(func, repeat=repeat),
+                "peak_mb": peak_memory(func),
+            }
+            print(
+                f"{name:<32} {results[name]['time']:10.4f} s "
+                f"{results[name]['peak_mb']:10.1f} MB",
+                flush=True,
+            )
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    regressions = []
+    print(f"\n{'case':<32} {'time':>7} {'memory':>7}")
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        ratios = [result[key] / max(baseline[name][key], 1e-9) for key in METRICS]
+        flag = ""
+        if max(ratios) > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<32} {ratios[0]:6.2f}x {ratios[1]:6.2f}x{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("-k", dest="pattern", help="only run cases containing this")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    parser.add_argument("--compare", help="compare with the results in this JSON file")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args()
+
+    results = run(args.sizes, args.repeat, args.pattern)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) above {args.threshold}x")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
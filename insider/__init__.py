@@ -1 +1,5 @@
 from insider.stock_insider import StockInsider
+from insider.universe import StockUniverse
+from insider.panel import StockPanel
+from insider.screener import Screener
+from insider.export import ChartExporter
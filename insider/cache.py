@@ -0,0 +1,100 @@
+import importlib.util
+import os
+import tempfile
+import time
+from typing import Optional
+
+import pandas as pd
+
+from insider.constants import CACHE_FORMATS, CACHE_TTL
+
+
+def _default_format() -> str:
+    if importlib.util.find_spec("pyarrow") or importlib.util.find_spec("fastparquet"):
+        return "parquet"
+    return "pickle"
+
+
+class BarCache:
+    """Local on-disk cache of fetched bars, keyed by stock code and ktype.
+    本地K线数据缓存，以股票代码和K线类型为键。
+
+    Bars are stored in Parquet when a Parquet engine is installed, otherwise
+    in pickle. Entries older than `ttl` seconds are stale: the next fetch is
+    merged into them so that only new trading days are appended.
+    """
+
+    def __init__(
+        self, cache_dir: str, ttl: float = CACHE_TTL, fmt: Optional[str] = None
+    ):
+        """
+        Parameters:
+            cache_dir: Directory to store the cached bars. 缓存目录
+            ttl: Seconds a cached entry stays fresh, default is 12 hours. 缓存有效期（秒）
+            fmt: File format, `parquet` or `pickle`, default is None which uses Parquet
+                if available. 缓存文件格式
+        """
+        if fmt is None:
+            fmt = _default_format()
+        if fmt not in CACHE_FORMATS:
+            raise ValueError(
+                f"Invalid cache format is given, valid inputs are {CACHE_FORMATS}"
+            )
+
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.fmt = fmt
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def path(self, code: str, ktype: str) -> str:
+        return os.path.join(self.cache_dir, f"{code}_{ktype.upper()}.{self.fmt}")
+
+    def is_fresh(self, code: str, ktype: str) -> bool:
+        """Check if the cached entry exists and is younger than the TTL."""
+        try:
+            mtime = os.path.getmtime(self.path(code, ktype))
+        except OSError:
+            return False
+        return time.time() - mtime < self.ttl
+
+    def load(self, code: str, ktype: str) -> Optional[pd.DataFrame]:
+        """Return the cached bars regardless of their age, or None if not cached."""
+        path = self.path(code, ktype)
+        if not os.path.exists(path):
+            return None
+        if self.fmt == "parquet":
+            return pd.read_parquet(path)
+        return pd.read_pickle(path)
+
+    def save(self, code: str, ktype: str, df: pd.DataFrame):
+        path = self.path(code, ktype)
+        # write to a temporary file first so that readers never see partial data,
+        # unique per call as the threads of `StockUniverse` share the cache
+        fd, tmp_path = tempfile.mkstemp(
+            suffix=".tmp", prefix=os.path.basename(path) + ".", dir=self.cache_dir
+        )
+        os.close(fd)
+        try:
+            if self.fmt == "parquet":
+                df.to_parquet(tmp_path, index=False)
+            else:
+                df.to_pickle(tmp_path)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+
+    def update(self, code: str, ktype: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Merge the bars in `df` into the cached ones, save and return them.
+
+        The fetched bars replace the cached ones from their first trading day on,
+        so that the last cached bar, which may have been taken during the
+        session, is refreshed as well.
+        """
+        cached = self.load(code, ktype)
+        if cached is not None and not cached.empty:
+            if not df.empty:
+                cached = cached[cached["day"] < df["day"].min()]
+            df = pd.concat([cached, df], ignore_index=True)
+        self.save(code, ktype, df)
+        return df
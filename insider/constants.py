@@ -2,14 +2,28 @@
 STOCK_URL = (
     "http://api.finance.ifeng.com/{ktype}/?code={code}&type=last"
 )  # URL to fetch stock information
+STOCK_URL_ENV = "INSIDER_STOCK_URL"  # environment variable overriding STOCK_URL
+REPLAY_DIR_ENV = "INSIDER_REPLAY_DIR"  # environment variable of the replay directory
+JIT_ENV = "INSIDER_JIT"  # environment variable, set to 0 to skip the numba kernels
 MA_COLS = ["ma5", "ma10", "ma20"]  # columns from dataset to use to plot MA lines
 MA_COLORS = ["black", "orange", "red"]  # colors to choose to plot different MA lines
+PLOT_MAX_POINTS = 2000  # points of a trace above which charts are downsampled to WebGL
 KTYPE_CONVERSION = {
     "D": "akdaily",
     "W": "akweekly",
     "M": "akmonthly",
 }  # Conversion for the type of K-lines for URL
 KTYPES = ["D", "W", "M"]  # Allowed types of K-lines
+# periods of the weekly and monthly bars built from daily bars
+RESAMPLE_PERIODS = {"W": "W-FRI", "M": "M"}
+BAR_AGGREGATIONS = {
+    "day": "last",
+    "open": "first",
+    "high": "max",
+    "low": "min",
+    "close": "last",
+    "volumn": "sum",
+}  # how the daily bars of a period make its bar
 DAY_COL = ["day"]  # date column from fetched dataset
 NUMERIC_COLUMNS = [
     "open",
@@ -35,6 +49,11 @@ VOLUMN_VOLS = ["day", "close", "volumn"]  # cols used for RSI & VRSI & OBV indic
 ADTM_COLS = ["day", "open", "close", "high", "low"]  # cols used for ADTM indicator mixin
 
 # Constants used in StockInsider class
+INDICATOR_CACHE_SIZE = 64  # maximum number of cached indicator results per instance
+# result types of the indicators: DataFrame, dict of arrays, structured array
+OUTPUT_FORMATS = ["frame", "arrays", "struct"]
+# libraries computing the indicators, see insider.indicators.backends
+BACKENDS = ["pandas", "numpy", "polars"]
 MA_N = [5, 10, 20, 60]  # Number of days counted for MA indicator
 MD_N = [5, 10, 20]  # Number of days counted for MD indicator
 EXPMA_N = [5, 10, 20, 60]  # Number of days counted for EMA indicator
@@ -44,7 +63,47 @@ CDP_COLS = ["ah", "nh", "cdp", "al", "nl"]  # Columns defined in CDP indicator
 
 # Constants used in SARIndicator Mixin
 INITIAL_TREND = True
-INITIAL_AF = 0.02
+INITIAL_AF = 0.02  # initial value and step of the acceleration factor
+MAX_AF = 0.2  # upper limit of the acceleration factor
 
 # Columns that are at least included in external data
 EXTERNAL_COLS = ["day", "high", "low", "open", "close", "volumn"]
+CSV_CHUNKSIZE = 500_000  # rows of external data parsed at a time
+CSV_ENGINES = ["c", "python", "pyarrow"]  # allowed parser engines of external data
+
+# Fields of each stock in a panel
+PANEL_FIELDS = ["open", "high", "low", "close", "volumn"]
+
+# Daily price limits in percent of the previous close, by board
+LIMIT_PCT = {"main": 10, "chinext": 20, "star": 20, "bse": 30, "st": 5}
+CHINEXT_REFORM_DAY = "2020-08-24"  # ChiNext limits were 10% (ST 5%) before this day
+STAR_PREFIXES = ("688", "689")  # first digits of STAR Market codes
+CHINEXT_PREFIXES = ("300", "301", "302")  # first digits of ChiNext codes
+BSE_PREFIXES = ("4", "8", "92")  # first digits of Beijing Stock Exchange codes
+
+# Constants used in ChartExporter class
+CHART_FORMATS = ["png", "svg", "html"]  # file formats charts can be exported to
+EXPORT_CHUNKSIZE = 16  # codes sent to a worker process at a time
+
+# Constants used in StockUniverse class
+UNIVERSE_MAX_WORKERS = 16  # default number of concurrent requests
+
+# Constants used in Screener class
+SCREENER_CHUNKSIZE = 16  # codes sent to a worker process at a time
+
+# Constants used in Fetcher class
+FETCH_TIMEOUT = 10  # seconds to wait for each request
+FETCH_RETRIES = 2  # retries after the first attempt of a request
+FETCH_BACKOFF = 0.2  # base seconds of the exponential backoff between retries
+FETCH_MAX_BACKOFF = 5  # upper limit of a backoff delay in seconds
+HEDGE_MIN_SAMPLES = 20  # latencies needed before hedging requests
+LATENCY_WINDOW = 1000  # number of recent latencies kept for the statistics
+BREAKER_THRESHOLD = 5  # consecutive failures which open the circuit breaker
+BREAKER_RESET = 30  # seconds the circuit breaker stays open
+
+# Constants used in BarCache class
+CACHE_TTL = 60 * 60 * 12  # seconds a cached entry stays fresh
+CACHE_FORMATS = ["parquet", "pickle"]  # allowed file formats of cached bars
+
+# Constants used for computing indicators on the plotted window only
+WARMUP_TOLERANCE = 1e-6  # weight of the dropped history allowed in EMA/SMA recursions
@@ -0,0 +1,97 @@
+"""Shape-preserving downsampling of long series for plotting.
+
+`lttb` keeps the points of a line which span the largest triangles with their
+neighbours (Largest-Triangle-Three-Buckets), so peaks and troughs survive.
+`ohlc_buckets` merges consecutive bars into wider bars, e.g. daily bars into
+bars of a few days, and `bucket_extremes` keeps the largest bar of each bucket.
+Points are spaced by position, as on the category x-axis of the charts.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _bucket_ids(n: int, n_out: int) -> np.ndarray:
+    return np.arange(n) * n_out // n
+
+
+def lttb(y, n_out: int) -> np.ndarray:
+    """Return the positions of at most `n_out` points of `y` which keep the shape
+    of the line. NaN points are dropped.
+
+    Parameters:
+        y: values of the line. 曲线的值
+        n_out: number of points to keep, at least 3. 保留的点数
+    """
+    if n_out < 3:
+        raise ValueError("At least 3 points must be kept.")
+    y = np.asarray(y, dtype="float64")
+    valid = np.flatnonzero(~np.isnan(y))
+    n = len(valid)
+    if n <= n_out:
+        return valid
+
+    x = valid.astype("float64")
+    v = y[valid]
+    # n_out - 2 buckets between the first and the last point, which are kept
+    edges = 1 + np.arange(n_out - 1) * (n - 2) // (n_out - 2)
+    selected = np.empty(n_out, dtype="int64")
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = v[end:next_end].mean()
+        # twice the area of the triangle of the last kept point, a candidate and
+        # the average of the next bucket
+        area = np.abs(
+            (x[a] - avg_x) * (v[start:end] - v[a])
+            - (x[a] - x[start:end]) * (avg_y - v[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return valid[selected]
+
+
+def bucket_extremes(y, n_out: int) -> np.ndarray:
+    """Return the position of the value with the largest magnitude in each of
+    `n_out` buckets, e.g. to downsample the bars of MACD.
+
+    Parameters:
+        y: values of the bars. 柱状图的值
+        n_out: number of buckets. 分组数
+    """
+    y = np.asarray(y, dtype="float64")
+    if len(y) <= n_out:
+        return np.arange(len(y))
+    magnitude = pd.Series(np.nan_to_num(np.abs(y), nan=-1.0))
+    return magnitude.groupby(_bucket_ids(len(y), n_out)).idxmax().to_numpy()
+
+
+def ohlc_buckets(df: pd.DataFrame, n_out: int) -> pd.DataFrame:
+    """Merge consecutive bars into at most `n_out` bars. 合并K线。
+
+    Each merged bar starts on the day of its first bar, opens at its first open,
+    closes at its last close, spans the highest high and the lowest low, and sums
+    the volumn.
+
+    Parameters:
+        df: bars with `day`, `open`, `high`, `low`, `close` and optionally `volumn`.
+            K线数据
+        n_out: number of bars to keep. 保留的K线数
+    """
+    if len(df) <= n_out:
+        return df
+    rules = {
+        "day": "first",
+        "open": "first",
+        "high": "max",
+        "low": "min",
+        "close": "last",
+        "volumn": "sum",
+    }
+    rules = {col: rule for col, rule in rules.items() if col in df}
+    merged = df.groupby(_bucket_ids(len(df), n_out)).agg(rules)
+    return merged.reset_index(drop=True)
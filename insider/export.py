@@ -0,0 +1,247 @@
+"""Render many charts to static files without a browser.
+
+`ChartExporter` builds the figures of (code, indicator) jobs with the `plot_*`
+methods in a process pool. HTML files are written directly; PNG and SVG files
+need kaleido, and each worker keeps one kaleido renderer alive for all of its
+charts instead of starting one per chart.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import importlib.util
+import multiprocessing.util
+import os
+import re
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import pandas as pd
+
+from insider.cache import BarCache
+from insider.constants import CHART_FORMATS, EXPORT_CHUNKSIZE
+from insider.fetch import Fetcher
+from insider.stock_insider import StockInsider
+from insider.utils import LazyModule
+
+pio = LazyModule("plotly.io")
+
+Job = Union[Tuple[str, str], Tuple[str, str, dict]]
+
+
+def _plot_method(indicator: str) -> str:
+    return "plot" if indicator == "price" else f"plot_{indicator}"
+
+
+def _file_stem(code: str, indicator: str, params: dict) -> str:
+    stem = f"{code}_{indicator}"
+    for key, value in sorted(params.items()):
+        stem += "_" + re.sub(r"[^\w.-]", "", f"{key}-{value}")
+    return stem
+
+
+# per-process fetcher and renderer, reused by all the charts of a worker
+_fetcher = None
+
+
+def _init_worker(fmt: str):
+    global _fetcher
+    _fetcher = Fetcher()
+    if fmt != "html":
+        import kaleido
+
+        # kaleido >= 1.1 can keep its browser running between calls
+        if hasattr(kaleido, "start_sync_server"):
+            kaleido.start_sync_server(silence_warnings=True)
+            multiprocessing.util.Finalize(
+                None,
+                kaleido.stop_sync_server,
+                kwargs={"silence_warnings": True},
+                exitpriority=10,
+            )
+
+
+def _export_codes(tasks, out_dir, fmt, image_opts, ktype, stock_kwargs):
+    written, failures = [], {}
+    figs, paths, stems = [], [], []
+    for code, df, jobs in tasks:
+        try:
+            if df is not None:
+                insider = StockInsider(code, df=df)
+            else:
+                insider = StockInsider(code, ktype, fetcher=_fetcher, **stock_kwargs)
+        except Exception as e:
+            for _, indicator, params in jobs:
+                failures[_file_stem(code, indicator, params)] = e
+            continue
+
+        for _, indicator, params in jobs:
+            stem = _file_stem(code, indicator, params)
+            path = os.path.join(out_dir, f"{stem}.{fmt}")
+            try:
+                fig = getattr(insider, _plot_method(indicator))(show=False, **params)
+                if fmt == "html":
+                    fig.write_html(
+                        path, include_plotlyjs=image_opts["include_plotlyjs"]
+                    )
+                    written.append(path)
+                else:
+                    figs.append(fig)
+                    paths.append(path)
+                    stems.append(stem)
+            except Exception as e:
+                failures[stem] = e
+
+    if figs:
+        # one call renders the whole batch in the same renderer
+        try:
+            if hasattr(pio, "write_images"):
+                pio.write_images(
+                    figs,
+                    paths,
+                    format=fmt,
+                    width=image_opts["width"],
+                    height=image_opts["height"],
+                    scale=image_opts["scale"],
+                )
+            else:
+                for fig, path in zip(figs, paths):
+                    pio.write_image(
+                        fig,
+                        path,
+                        format=fmt,
+                        width=image_opts["width"],
+                        height=image_opts["height"],
+                        scale=image_opts["scale"],
+                    )
+            written.extend(paths)
+        except Exception as e:
+            failures.update((stem, e) for stem in stems)
+    return written, failures
+
+
+class ChartExporter:
+    """Export charts of many stocks to PNG, SVG or HTML files. 批量导出股票图表。
+
+    A job is `(code, indicator)` or `(code, indicator, params)`, where indicator
+    is the suffix of a `plot_*` method, e.g. `macd`, or `price` for `plot`, and
+    params are passed to the method. The charts of a code are drawn from one
+    fetch, and failed jobs are recorded in `failures` by file name.
+    """
+
+    def __init__(
+        self,
+        out_dir: str,
+        fmt: str = "png",
+        processes: Optional[int] = None,
+        chunksize: int = EXPORT_CHUNKSIZE,
+        ktype: str = "D",
+        width: Optional[int] = None,
+        height: Optional[int] = None,
+        scale: Optional[float] = None,
+        include_plotlyjs: Union[bool, str] = "cdn",
+        cache: Optional[BarCache] = None,
+        url: Optional[str] = None,
+        replay_dir: Optional[str] = None,
+    ):
+        """
+        Parameters:
+            out_dir: directory of the exported files. 导出目录
+            fmt: file format, valid values are `png`, `svg` and `html`, default is
+                `png`. PNG and SVG need kaleido. 文件格式
+            processes: number of worker processes, default is None which uses the
+                number of cores. 进程数
+            chunksize: number of codes sent to a worker at a time, default is 16.
+                每次分配给进程的股票数
+            ktype: freq, valid values are `D`, `W`, and `M`，股票趋势频率
+            width: width of the images in pixels, default is None. 图片宽度
+            height: height of the images in pixels, default is None. 图片高度
+            scale: scale of the images, default is None. 图片缩放比例
+            include_plotlyjs: how HTML files include plotly.js, default is `cdn`
+                which links it instead of embedding it in every file. HTML文件引用plotly.js的方式
+            cache: local bar cache shared by the workers, default is None. 本地K线数据缓存
+            url: URL template passed to `Stock`, default is None. 数据接口URL模板
+            replay_dir: replay directory passed to `Stock`, default is None. 离线回放目录
+        """
+        fmt = fmt.lower()
+        if fmt not in CHART_FORMATS:
+            raise ValueError(f"Invalid format {fmt}, valid values are {CHART_FORMATS}.")
+        if fmt != "html" and importlib.util.find_spec("kaleido") is None:
+            raise ImportError(
+                f"kaleido is required to export {fmt} charts, "
+                "install it with `pip install kaleido`."
+            )
+        if processes is not None and processes < 1:
+            raise ValueError("processes must be at least 1.")
+
+        self.out_dir = out_dir
+        self.fmt = fmt
+        self.processes = processes or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.ktype = ktype
+        self.image_opts = {
+            "width": width,
+            "height": height,
+            "scale": scale,
+            "include_plotlyjs": include_plotlyjs,
+        }
+        self.stock_kwargs = {"cache": cache, "url": url, "replay_dir": replay_dir}
+
+        self.failures: Dict[str, Exception] = {}
+
+    @staticmethod
+    def _group(jobs: Iterable[Job]) -> Dict[str, List[Tuple[str, str, dict]]]:
+        by_code = {}
+        for job in jobs:
+            code, indicator = job[0], job[1]
+            params = job[2] if len(job) > 2 else {}
+            if not hasattr(StockInsider, _plot_method(indicator)):
+                raise ValueError(f"No chart of {indicator} can be plotted.")
+            by_code.setdefault(code, []).append((code, indicator, params))
+        return by_code
+
+    def export(
+        self,
+        jobs: Iterable[Job],
+        frames: Optional[Dict[str, pd.DataFrame]] = None,
+    ) -> List[str]:
+        """Export the charts. 导出图表。
+
+        Parameters:
+            jobs: (code, indicator) or (code, indicator, params) of each chart, e.g.
+                [("sh600000", "macd"), ("sh600000", "ma", {"ns": [5, 10]})].
+                需要导出的图表
+            frames: data which is already loaded, by code, e.g. `StockUniverse.data`,
+                default is None which fetches the data of each code. 已获取的数据
+
+        Returns:
+            paths of the exported files. 导出文件的路径
+        """
+        by_code = self._group(jobs)
+        os.makedirs(self.out_dir, exist_ok=True)
+        frames = frames or {}
+        tasks = [
+            (code, frames.get(code), code_jobs) for code, code_jobs in by_code.items()
+        ]
+        chunks = [
+            tasks[i : i + self.chunksize] for i in range(0, len(tasks), self.chunksize)
+        ]
+
+        written, failures = [], {}
+        n = len(chunks)
+        with ProcessPoolExecutor(
+            min(self.processes, max(n, 1)),
+            initializer=_init_worker,
+            initargs=(self.fmt,),
+        ) as pool:
+            results = pool.map(
+                _export_codes,
+                chunks,
+                [self.out_dir] * n,
+                [self.fmt] * n,
+                [self.image_opts] * n,
+                [self.ktype] * n,
+                [self.stock_kwargs] * n,
+            )
+            for chunk_written, chunk_failures in results:
+                written.extend(chunk_written)
+                failures.update(chunk_failures)
+        self.failures = failures
+        return written
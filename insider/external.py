@@ -0,0 +1,163 @@
+"""Reading of external stock data in CSV.
+
+Only the `EXTERNAL_COLS`, the `MA_COLS` the file has, which `plot` draws, and
+any `extra_cols` are parsed, with float prices, volumn and moving averages and a
+datetime `day`. The file is read in chunks, so the peak memory
+is bounded by the rows kept plus one chunk. Rows outside the date range are
+dropped chunk by chunk; when the file is sorted by day, the first row of the
+range is found by binary search on the byte offsets of the memory-mapped file
+and reading stops after the last one, so the rest of the file is never parsed.
+"""
+
+import csv
+import io
+import mmap
+from typing import List, Optional
+
+import pandas as pd
+
+from insider.constants import CSV_CHUNKSIZE, CSV_ENGINES, EXTERNAL_COLS, MA_COLS
+
+NUMERIC_EXTERNAL_COLS = [col for col in EXTERNAL_COLS if col != "day"]
+DTYPES = dict.fromkeys(NUMERIC_EXTERNAL_COLS, "float64")
+# the engines infer timestamps of different resolutions
+DAY_DTYPE = "datetime64[ns]"
+
+
+def _line_start(mm: mmap.mmap, pos: int, data_start: int) -> int:
+    """Offset of the first line starting at or after `pos`."""
+    if pos <= data_start:
+        return data_start
+    end = mm.find(b"\n", pos - 1)
+    return len(mm) if end == -1 else end + 1
+
+
+def _line_day(mm: mmap.mmap, offset: int, day_idx: int) -> pd.Timestamp:
+    end = mm.find(b"\n", offset)
+    line = mm[offset : len(mm) if end == -1 else end].decode().rstrip("\r")
+    return pd.Timestamp(next(csv.reader([line]))[day_idx])
+
+
+def _seek_date(fpath: str, start_date: pd.Timestamp, day_idx: int) -> int:
+    """Byte offset of the first row on or after `start_date` in a file sorted by
+    day, or the file size if there is none.
+    """
+    with open(fpath, "rb") as f:
+        header_end = f.readline()
+        data_start = len(header_end)
+        if f.seek(0, io.SEEK_END) == data_start:
+            return data_start
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            lo, hi = data_start, len(mm)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                offset = _line_start(mm, mid, data_start)
+                if offset >= len(mm) or _line_day(mm, offset, day_idx) >= start_date:
+                    hi = mid
+                else:
+                    lo = mid + 1
+            return _line_start(mm, lo, data_start)
+
+
+def read_external_csv(
+    fpath: str,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    sorted_by_day: bool = False,
+    engine: Optional[str] = None,
+    chunksize: int = CSV_CHUNKSIZE,
+    extra_cols: Optional[List[str]] = None,
+) -> pd.DataFrame:
+    """Read the typed columns of external stock data. 读取外部股票数据。
+
+    Parameters:
+        fpath: the path to the external stock data in CSV. 外部数据的路径
+        start_date: first day to load, e.g. '2019-01-01', default is None. 起始时间
+        end_date: last day to load, e.g. '2020-01-01', default is None. 终止时间
+        sorted_by_day: if the rows are sorted by day, which lets a date range be
+            loaded without parsing the rest of the file, default is False.
+            数据是否已按日期排序
+        engine: parser engine of `pandas.read_csv`, `c`, `python` or `pyarrow`,
+            default is None which uses `c`. `pyarrow` parses with several threads
+            but reads all the columns of the file (or of the rows from `start_date`
+            on) in one go. 解析引擎
+        chunksize: number of rows parsed at a time, default is 500,000. 每次解析的行数
+        extra_cols: other columns to load, default is None. The `MA_COLS` used
+            by `plot` are always loaded when the file has them. 额外读取的列
+    """
+    engine = engine or "c"
+    if engine not in CSV_ENGINES:
+        raise ValueError(f"Invalid engine is given, valid inputs are {CSV_ENGINES}")
+
+    columns = list(pd.read_csv(fpath, nrows=0).columns)
+    if not set(EXTERNAL_COLS).issubset(columns):
+        raise ValueError(
+            f"{EXTERNAL_COLS} are mandatory in external data so as to plot"
+            f" all trading indicators."
+        )
+    extra_cols = extra_cols or []
+    missing = set(extra_cols) - set(columns)
+    if missing:
+        raise ValueError(f"Columns {sorted(missing)} are not found in {fpath}.")
+
+    start_date = pd.Timestamp(start_date) if start_date else None
+    end_date = pd.Timestamp(end_date) if end_date else None
+
+    offset = 0
+    if sorted_by_day and start_date is not None:
+        offset = _seek_date(fpath, start_date, columns.index("day"))
+
+    ma_cols = [col for col in MA_COLS if col in columns]
+    usecols = set(EXTERNAL_COLS + ma_cols + extra_cols)
+    dtypes = {**DTYPES, **dict.fromkeys(ma_cols, "float64")}
+    with open(fpath, "rb") as f:
+        if f.seek(0, io.SEEK_END) <= offset:
+            return _empty_frame(columns, usecols, dtypes)
+        f.seek(offset)
+        selected = [col for col in columns if col in usecols]
+        if engine == "pyarrow":
+            # the pyarrow engine parses the whole table at once and does not
+            # support `usecols` together with `names`, so select afterwards
+            chunks = [
+                pd.read_csv(
+                    f,
+                    header=0 if offset == 0 else None,
+                    names=columns,
+                    dtype=dtypes,
+                    engine=engine,
+                )[selected]
+            ]
+        else:
+            chunks = pd.read_csv(
+                f,
+                header=0 if offset == 0 else None,
+                names=columns,
+                usecols=selected,
+                dtype=dtypes,
+                engine=engine,
+                chunksize=chunksize,
+            )
+
+        kept = []
+        for chunk in chunks:
+            chunk["day"] = pd.to_datetime(chunk["day"]).astype(DAY_DTYPE)
+            mask = pd.Series(True, index=chunk.index)
+            if start_date is not None:
+                mask &= chunk["day"] >= start_date
+            if end_date is not None:
+                mask &= chunk["day"] <= end_date
+            kept.append(chunk[mask] if not mask.all() else chunk)
+            if sorted_by_day and end_date is not None and len(chunk):
+                if chunk["day"].iloc[-1] > end_date:
+                    break
+
+    if not kept:
+        return _empty_frame(columns, usecols, dtypes)
+    return pd.concat(kept, ignore_index=True)
+
+
+def _empty_frame(columns: List[str], usecols: set, dtypes: dict) -> pd.DataFrame:
+    df = pd.DataFrame(
+        {col: pd.Series(dtype=object) for col in columns if col in usecols}
+    )
+    return df.astype({"day": DAY_DTYPE, **dtypes})
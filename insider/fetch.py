@@ -0,0 +1,302 @@
+"""Fetch policy of the payload requests.
+
+`Fetcher` retries transient failures (timeouts, connection and other transport
+errors, 5xx and 429 responses, malformed JSON) with jittered exponential
+backoff, can send a hedged duplicate of a request that is slower than a
+percentile of the recent latencies, and stops sending requests for a while
+through a circuit breaker once the upstream keeps failing. `stats` holds the
+latencies to tune it with.
+"""
+
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+import numpy as np
+import requests
+
+from insider.constants import (
+    BREAKER_RESET,
+    BREAKER_THRESHOLD,
+    FETCH_BACKOFF,
+    FETCH_MAX_BACKOFF,
+    FETCH_RETRIES,
+    FETCH_TIMEOUT,
+    HEDGE_MIN_SAMPLES,
+    LATENCY_WINDOW,
+)
+
+# exceptions which are worth another attempt: every requests error but the 4xx
+# responses, caught before, and a malformed JSON body, which raises a ValueError
+# subclass in every supported version of requests
+RETRY_EXCEPTIONS = (requests.RequestException, ValueError)
+
+
+class FetchError(ValueError):
+    """The payload could not be fetched. 获取数据失败。"""
+
+
+class CircuitOpenError(FetchError):
+    """The circuit breaker is open and the request was not sent. 熔断中。"""
+
+
+class _RetryableStatus(Exception):
+    def __init__(self, status: int):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+class LatencyStats:
+    """Latencies and counters of a fetcher.
+
+    Two windows of recent latencies are kept: of the single attempts, which set
+    the hedging delay, and of the whole calls including retries and hedges,
+    which is what the callers see.
+    """
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._lock = threading.Lock()
+        self._latencies = {
+            "attempts": deque(maxlen=window),
+            "calls": deque(maxlen=window),
+        }
+        self.counts = dict.fromkeys(
+            ["requests", "retries", "hedges", "hedge_wins", "failures", "rejected"], 0
+        )
+
+    def record(self, latency: float, kind: str = "calls"):
+        with self._lock:
+            self._latencies[kind].append(latency)
+
+    def incr(self, name: str):
+        with self._lock:
+            self.counts[name] += 1
+
+    def count(self, kind: str = "calls") -> int:
+        return len(self._latencies[kind])
+
+    def percentile(self, q: float, kind: str = "calls") -> Optional[float]:
+        """Return the q-th percentile (0-100) of the recent latencies in seconds."""
+        with self._lock:
+            latencies = list(self._latencies[kind])
+        if not latencies:
+            return None
+        return float(np.percentile(latencies, q))
+
+    def summary(self, kind: str = "calls") -> Dict[str, float]:
+        """Return the counters with p50/p90/p99/max latencies in seconds."""
+        with self._lock:
+            latencies = np.array(self._latencies[kind])
+            summary = dict(self.counts)
+        if len(latencies):
+            p50, p90, p99 = np.percentile(latencies, [50, 90, 99])
+            summary.update(p50=p50, p90=p90, p99=p99, max=latencies.max())
+        return summary
+
+
+class CircuitBreaker:
+    """Fail fast after `threshold` consecutive failures.
+
+    The breaker opens for `reset_timeout` seconds, then lets a single trial
+    request through (half-open): its success closes the breaker and its
+    failure opens it again.
+    """
+
+    def __init__(
+        self, threshold: int = BREAKER_THRESHOLD, reset_timeout: float = BREAKER_RESET
+    ):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        # thread sending the trial request while half-open
+        self._trial = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return "open"
+            return "half-open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            if self._trial is not None:
+                return False
+            self._trial = threading.get_ident()
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial is not None or self._failures >= self.threshold:
+                self._opened_at = time.monotonic()
+                self._trial = None
+
+    def release(self):
+        """End the trial request of the calling thread if it is still pending, so
+        that an unexpected exception can not keep the breaker half-open forever.
+        """
+        with self._lock:
+            if self._trial == threading.get_ident():
+                self._trial = None
+
+
+class Fetcher:
+    """Fetch JSON payloads with retries, hedging and a circuit breaker.
+    带重试、对冲请求和熔断的数据获取。
+
+    One fetcher is meant to be shared by all the requests to an upstream, so
+    that the latency statistics and the breaker see the whole traffic.
+    """
+
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        timeout: float = FETCH_TIMEOUT,
+        retries: int = FETCH_RETRIES,
+        backoff: float = FETCH_BACKOFF,
+        max_backoff: float = FETCH_MAX_BACKOFF,
+        hedge_percentile: Optional[float] = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        """
+        Parameters:
+            session: requests session to send the requests, default is None which
+                creates one. HTTP会话
+            timeout: Seconds to wait for each attempt, default is 10. 单次请求超时（秒）
+            retries: Number of retries after the first attempt, default is 2. 重试次数
+            backoff: Base delay in seconds of the exponential backoff, default is 0.2.
+                退避基础时长（秒）
+            max_backoff: Upper limit of a backoff delay in seconds, default is 5.
+                最大退避时长（秒）
+            hedge_percentile: Send a duplicate request once an attempt is slower than
+                this percentile (0-100) of the recent latencies, default is None which
+                never hedges. 对冲请求的延迟分位数
+            breaker: circuit breaker, default is None which creates one with the
+                default threshold and reset timeout. 熔断器
+        """
+        if retries < 0:
+            raise ValueError("retries must not be negative.")
+        if hedge_percentile is not None and not 0 < hedge_percentile < 100:
+            raise ValueError("hedge_percentile must be between 0 and 100.")
+
+        self.session = session if session is not None else requests.Session()
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hedge_percentile = hedge_percentile
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.stats = LatencyStats()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _attempt(self, url: str) -> dict:
+        self.stats.incr("requests")
+        start = time.perf_counter()
+        r = self.session.get(url, timeout=self.timeout)
+        if r.status_code >= 500 or r.status_code == 429:
+            raise _RetryableStatus(r.status_code)
+        r.raise_for_status()
+        payload = r.json()
+        self.stats.record(time.perf_counter() - start, kind="attempts")
+        return payload
+
+    def _hedge_delay(self) -> Optional[float]:
+        if self.hedge_percentile is None:
+            return None
+        if self.stats.count("attempts") < HEDGE_MIN_SAMPLES:
+            return None
+        return self.stats.percentile(self.hedge_percentile, kind="attempts")
+
+    def _hedged_attempt(self, url: str) -> dict:
+        delay = self._hedge_delay()
+        if delay is None:
+            return self._attempt(url)
+
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(thread_name_prefix="insider-hedge")
+        primary = self._executor.submit(self._attempt, url)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        self.stats.incr("hedges")
+        hedge = self._executor.submit(self._attempt, url)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if future is hedge:
+                        self.stats.incr("hedge_wins")
+                    # the slower request is left to finish in the background
+                    return future.result()
+        return primary.result()
+
+    def get_json(self, url: str) -> dict:
+        """Return the JSON payload of the URL. 获取URL返回的JSON数据。
+
+        Raises `CircuitOpenError` without sending anything while the breaker is
+        open and `FetchError` once all the attempts failed.
+        """
+        start = time.perf_counter()
+        for attempt in range(self.retries + 1):
+            if not self.breaker.allow():
+                self.stats.incr("rejected")
+                raise CircuitOpenError(
+                    "Too many failed requests, the upstream is skipped for now."
+                )
+            try:
+                payload = self._hedged_attempt(url)
+            except requests.HTTPError as e:
+                # the upstream is healthy, the request itself is wrong
+                self.breaker.record_success()
+                self.stats.incr("failures")
+                raise FetchError(f"Failed to fetch {url}: {e}") from e
+            except (_RetryableStatus,) + RETRY_EXCEPTIONS as e:
+                self.breaker.record_failure()
+                error = e
+            else:
+                self.breaker.record_success()
+                self.stats.record(time.perf_counter() - start)
+                return payload
+            finally:
+                self.breaker.release()
+
+            if attempt < self.retries:
+                self.stats.incr("retries")
+                # full jitter keeps the retries of many clients from synchronizing
+                time.sleep(
+                    random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))
+                )
+
+        self.stats.incr("failures")
+        if isinstance(error, requests.Timeout):
+            raise FetchError("The request timed out. Please try again.") from error
+        raise FetchError(
+            f"Failed to fetch {url} after {self.retries + 1} attempts: {error}"
+        ) from error
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,218 @@
+"""Compute backends of the indicator formulas.
+
+The indicator mixins write their formulas with arithmetic operators and the
+operations of a backend, so that the same formulas run on the columns of any of
+them:
+
+- `pandas`: Series of the data, the reference, which also runs the panels.
+- `numpy`: float64 arrays, without the overhead of Series.
+- `polars`: Series of a Polars copy of the data, converted to arrays by
+  `collect`.
+
+Missing values are NaN in pandas and NumPy and null in Polars, and every backend
+skips them like pandas does. The results agree with pandas to rounding, except
+that pandas weights the first value after missing ones differently in an EMA
+with a span of 3, which Polars does not reproduce.
+"""
+
+import importlib.util
+
+import numpy as np
+import pandas as pd
+
+from insider.constants import BACKENDS
+from insider.indicators import jit
+from insider.utils import LazyModule
+
+pl = LazyModule("polars")
+
+
+class PandasBackend:
+    """Columns are Series of the data, or frames of dates x codes of a panel."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+
+    def column(self, col: str):
+        return self.df[col]
+
+    def shift(self, x, n: int):
+        return x.shift(n)
+
+    def rolling(self, x, n: int, how: str):
+        if how == "std":
+            return x.rolling(n).std(ddof=0)
+        return getattr(x.rolling(n), how)()
+
+    def ewm_mean(self, x, span=None, alpha=None):
+        if jit.available():
+            return jit.ewm_mean(x, span=span, alpha=alpha)
+        return x.ewm(
+            ignore_na=False, span=span, alpha=alpha, min_periods=0, adjust=False
+        ).mean()
+
+    def cumsum(self, x):
+        if jit.available():
+            return jit.cumsum(x)
+        return x.expanding(1).sum()
+
+    def fill_missing(self, x, value: float):
+        return x.fillna(value)
+
+    def clip(self, x, lower=None, upper=None):
+        return x.clip(lower, upper)
+
+    def where(self, cond, a, b):
+        return pd.Series(np.where(cond, a, b), index=self.df.index)
+
+    def row_mean(self, xs):
+        return pd.Series(_row_mean(xs), index=self.df.index)
+
+    def row_max(self, xs):
+        return pd.Series(np.vstack(xs).max(axis=0), index=self.df.index)
+
+    def collect(self, outputs: dict) -> dict:
+        return outputs
+
+
+class NumpyBackend(PandasBackend):
+    """Columns are float64 arrays."""
+
+    def column(self, col: str):
+        return self.df[col].to_numpy(dtype="float64")
+
+    def shift(self, x, n: int):
+        shifted = np.full_like(x, np.nan)
+        if n < len(x):
+            shifted[n:] = x[: len(x) - n]
+        return shifted
+
+    def rolling(self, x, n: int, how: str):
+        out = np.full_like(x, np.nan)
+        if n <= len(x):
+            windows = np.lib.stride_tricks.sliding_window_view(x, n)
+            out[n - 1 :] = getattr(windows, how)(axis=1)
+        return out
+
+    def ewm_mean(self, x, span=None, alpha=None):
+        if jit.available():
+            return jit.ewm_mean(x, span=span, alpha=alpha)
+        return super().ewm_mean(pd.Series(x), span, alpha).to_numpy()
+
+    def cumsum(self, x):
+        if jit.available():
+            return jit.cumsum(x)
+        return pd.Series(x).expanding(1).sum().to_numpy()
+
+    def fill_missing(self, x, value: float):
+        return np.where(np.isnan(x), value, x)
+
+    def clip(self, x, lower=None, upper=None):
+        return np.clip(x, lower, upper)
+
+    def where(self, cond, a, b):
+        return np.where(cond, a, b).astype("float64")
+
+    def row_mean(self, xs):
+        return _row_mean(xs)
+
+    def row_max(self, xs):
+        return np.vstack(xs).max(axis=0)
+
+
+class PolarsBackend:
+    """Columns are Polars Series of a copy of the numeric columns."""
+
+    def __init__(self, df: pd.DataFrame):
+        if importlib.util.find_spec("polars") is None:
+            raise ImportError(
+                "polars is required for the polars backend, "
+                "install it with `pip install StockInsider[polars]`."
+            )
+        self.frame = pl.DataFrame(
+            [
+                pl.Series(col, df[col].to_numpy(dtype="float64"), nan_to_null=True)
+                for col in df.columns
+                if pd.api.types.is_numeric_dtype(df[col])
+            ]
+        )
+
+    def column(self, col: str):
+        return self.frame[col]
+
+    def shift(self, x, n: int):
+        return x.shift(n)
+
+    def rolling(self, x, n: int, how: str):
+        x = x.fill_nan(None)
+        if how == "std":
+            return x.rolling_std(n, min_samples=n, ddof=0)
+        return getattr(x, f"rolling_{how}")(n, min_samples=n)
+
+    def ewm_mean(self, x, span=None, alpha=None):
+        # pandas carries the mean over missing values
+        return (
+            x.fill_nan(None)
+            .ewm_mean(
+                span=span, alpha=alpha, adjust=False, min_samples=1, ignore_nulls=False
+            )
+            .forward_fill()
+        )
+
+    def cumsum(self, x):
+        return x.fill_nan(None).cum_sum().forward_fill()
+
+    def fill_missing(self, x, value: float):
+        return x.fill_nan(value).fill_null(value)
+
+    def clip(self, x, lower=None, upper=None):
+        return x.clip(lower, upper)
+
+    def where(self, cond, a, b):
+        # a null condition is false, as a comparison with NaN is
+        return self._select(pl.when(cond).then(a).otherwise(b).cast(pl.Float64))
+
+    def row_mean(self, xs):
+        return self._select(pl.mean_horizontal(xs))
+
+    def row_max(self, xs):
+        # NaN in any of the rows makes the maximum NaN in NumPy
+        missing = pl.any_horizontal([x.is_null() for x in xs])
+        return self._select(
+            pl.when(missing).then(None).otherwise(pl.max_horizontal(xs))
+        )
+
+    @staticmethod
+    def _select(expr):
+        return pl.select(expr).to_series()
+
+    def collect(self, outputs: dict) -> dict:
+        return {
+            col: x.to_numpy() if isinstance(x, pl.Series) else x
+            for col, x in outputs.items()
+        }
+
+
+def _row_mean(xs) -> np.ndarray:
+    # mean skipping NaN like `DataFrame.mean(axis=1)`, NaN if all are missing
+    values = np.vstack(xs)
+    count = np.count_nonzero(~np.isnan(values), axis=0)
+    with np.errstate(invalid="ignore"):
+        return np.nansum(values, axis=0) / count
+
+
+def make_backend(name: str, df: pd.DataFrame):
+    """Create the backend `name` of the data. 创建计算后端
+
+    Parameters:
+        name: one of `BACKENDS`. 后端名称
+        df: data of the stock. 股票数据
+    """
+    backends = {
+        "pandas": PandasBackend,
+        "numpy": NumpyBackend,
+        "polars": PolarsBackend,
+    }
+    if name not in BACKENDS:
+        raise ValueError(f"Invalid backend is given, valid inputs are {BACKENDS}")
+    return backends[name](df)
@@ -1,58 +1,421 @@
-from typing import Union
+from collections import OrderedDict
+from functools import wraps
+import inspect
+from typing import Dict, Iterable, List, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
-from insider.constants import VOLUMN_VOLS
+from insider.constants import INDICATOR_CACHE_SIZE, OUTPUT_FORMATS, VOLUMN_VOLS
+from insider.indicators.backends import make_backend
+from insider.utils import freeze
+
+
+def memoize(func):
+    """Cache the result of an indicator method per instance, keyed by the method
+    name and its bound arguments.
+
+    The cache holds at most `INDICATOR_CACHE_SIZE` results and evicts the least
+    recently used one. It is dropped whenever `_df` is reassigned. Callers get a
+    copy so that they can modify the result freely; in read-only mode the copy is
+    shallow, and copy-on-write or the read-only arrays keep the cached result intact.
+    """
+    signature = inspect.signature(func)
+
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        key = (func.__name__, self.output_format, self.backend) + tuple(
+            bound.arguments.items()
+        )[1:]
+        try:
+            hash(key)
+        except TypeError:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return func(self, *args, **kwargs)
+
+        cache = self._indicator_cache
+        if key in cache:
+            cache.move_to_end(key)
+        else:
+            # NumPy warns about the divisions by zero which pandas lets pass
+            with np.errstate(divide="ignore", invalid="ignore"):
+                cache[key] = func(self, *args, **kwargs)
+            if len(cache) > INDICATOR_CACHE_SIZE:
+                cache.popitem(last=False)
+        return _copy_result(cache[key], deep=not self.read_only)
+
+    return wrapper
+
+
+def _shared(func):
+    """Share the result of a primitive operation between the indicators of one
+    `compute` call, so that each distinct operation runs once.
+
+    Operations are keyed like `memoize`, with the columns given by identity. The
+    shared results keep their arguments alive, so an identity is not reused while
+    `compute` runs. Outside of it the operation just runs.
+    """
+    signature = inspect.signature(func)
+
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        shared = self.__dict__.get("_shared")
+        if shared is None:
+            return func(self, *args, **kwargs)
+
+        bound = signature.bind(self, *args, **kwargs)
+        bound.apply_defaults()
+        key = (func.__name__,) + _identity(tuple(bound.arguments.values())[1:])
+        if key not in shared:
+            shared[key] = (func(self, *args, **kwargs), bound.arguments)
+        return shared[key][0]
+
+    return wrapper
+
+
+def _identity(value):
+    if isinstance(value, (str, int, float, bool, type(None))):
+        return value
+    if isinstance(value, (list, tuple)):
+        return tuple(_identity(item) for item in value)
+    if isinstance(value, dict):
+        return tuple((key, _identity(item)) for key, item in value.items())
+    return ("id", id(value))
+
+
+def _copy_result(result, deep: bool):
+    if isinstance(result, dict):
+        return {
+            col: values.copy() if deep else values for col, values in result.items()
+        }
+    if isinstance(result, np.ndarray):
+        return result.copy() if deep else result.view()
+    return result.copy(deep=deep)
+
+
+def _shift(values: np.ndarray, step: int) -> np.ndarray:
+    """Shift values down along the first axis and pad with NaN."""
+    shifted = np.full_like(values, np.nan)
+    if step < len(values):
+        shifted[step:] = values[: len(values) - step]
+    return shifted
+
+
+class _ExtremaTable:
+    """Sparse table of rolling extrema along the first axis.
+
+    Level k holds the extremum of the 2**k values ending at each row, and any
+    window of n values is the extremum of two overlapping windows of the largest
+    level below n. Levels are only built up to the largest window asked for, so
+    windows of different sizes share the work. Like pandas rolling with
+    `min_periods=n`, a window with a NaN in it is NaN.
+    """
+
+    def __init__(self, values: np.ndarray, func: np.ufunc):
+        self.func = func
+        self.levels = [np.asarray(values, dtype="float64")]
+
+    def query(self, n: int) -> np.ndarray:
+        k = n.bit_length() - 1
+        while len(self.levels) <= k:
+            prev = self.levels[-1]
+            self.levels.append(
+                self.func(prev, _shift(prev, 1 << (len(self.levels) - 1)))
+            )
+
+        level = self.levels[k]
+        rest = n - (1 << k)
+        if rest:
+            return self.func(level, _shift(level, rest))
+        return level.copy()
 
 
 class BaseMixin:
     """Base Mixins used in different Indicator Mixins"""
 
+    # `_df` is frozen by `insider.utils.freeze` when set, see `Stock.read_only`
+    read_only: bool = False
+    # Type of the indicator results, one of `OUTPUT_FORMATS`: a DataFrame, a dict
+    # of contiguous arrays or a structured array. 指标结果的类型
+    output_format: str = "frame"
+    # Backend computing the indicators, one of `BACKENDS`, see
+    # `insider.indicators.backends`. 计算指标的后端
+    backend: str = "pandas"
+
+    @property
+    def _df(self) -> pd.DataFrame:
+        # bars appended by `IncrementalMixin.append_bar` are concatenated at once
+        # when the data is read, rather than copying the data on every bar
+        rows = self.__dict__.pop("_pending_rows", None)
+        if rows:
+            df = self.__dict__["_df"]
+            rows = pd.DataFrame(rows)
+            dtypes = {
+                col: dtype
+                for col, dtype in df.dtypes.items()
+                if col in rows and rows[col].notna().all()
+            }
+            self._df = pd.concat([df, rows.astype(dtypes)], ignore_index=True)
+        return self.__dict__["_df"]
+
+    @_df.setter
+    def _df(self, df: pd.DataFrame):
+        if self.read_only:
+            df = freeze(df)
+        self.__dict__["_df"] = df
+        self.__dict__.pop("_pending_rows", None)
+        self._drop_caches()
+
+    def _drop_caches(self):
+        # a new dict rather than clear() since shallow copies of the instance
+        # share the same cache object
+        self.__dict__["_indicator_cache"] = OrderedDict()
+        self.__dict__["_backends"] = {}
+
+    @property
+    def _indicator_cache(self) -> OrderedDict:
+        return self.__dict__.setdefault("_indicator_cache", OrderedDict())
+
+    def clear_cache(self):
+        """Drop all cached indicator results. 清除缓存的指标结果。"""
+        self.__dict__["_indicator_cache"] = OrderedDict()
+
+    def set_read_only(self, read_only: bool = True):
+        """Switch the read-only mode. 切换只读模式。
+
+        In read-only mode the data can not be modified in place, and the data
+        accessors and the indicators return frames sharing its arrays.
+
+        Parameters:
+            read_only: whether to turn it on, default is True. 是否开启，默认开启
+        """
+        self.read_only = read_only
+        self._df = self._df
+
+    @property
+    def _backend(self):
+        # built once per data, as the Polars backend copies it
+        backends = self.__dict__.setdefault("_backends", {})
+        if self.backend not in backends:
+            backends[self.backend] = make_backend(self.backend, self._df)
+        return backends[self.backend]
+
+    def compute(self, indicators: Iterable[Union[str, Tuple[str, dict]]]):
+        """Compute several indicators at once into one wide result. 同时计算多个指标
+
+        The operations the indicators have in common, like the moving averages of
+        `ma`, `env` and `boll` or the EMAs of `macd`, are computed once. The result
+        holds the columns of the data used by the indicators, followed by their
+        output columns named `indicator.column`, or `indicator(n=9).column` with
+        parameters, in `output_format`.
+
+        Parameters:
+            indicators: names of the indicator methods, or pairs of a name and its
+            parameters, e.g. `["macd", ("kdj", {"n": 9})]`. 指标名称，或指标名称与参数
+        """
+        calls = {}
+        for item in indicators:
+            name, params = (item, {}) if isinstance(item, str) else item
+            func = getattr(getattr(type(self), name, None), "__wrapped__", None)
+            if func is None or name.startswith("_"):
+                raise ValueError(f"{name} is not an indicator.")
+            if params:
+                name += "(" + ",".join(f"{k}={v}" for k, v in params.items()) + ")"
+            calls[name] = (func, params)
+
+        self.__dict__["_shared"] = {}
+        try:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                results = {
+                    label: func(self, **params)
+                    for label, (func, params) in calls.items()
+                }
+        finally:
+            del self.__dict__["_shared"]
+        return self._combine(results)
+
+    def _combine(self, results: dict):
+        # the results of `_frame` inside `compute`, in one result of `_frame`
+        cols: List[str] = []
+        outputs = {}
+        for label, (result_cols, result_outputs) in results.items():
+            cols += [col for col in result_cols if col not in cols]
+            for col, values in result_outputs.items():
+                outputs[f"{label}.{col}"] = values
+        return _copy_result(self._frame(cols, **outputs), deep=not self.read_only)
+
+    def _frame(self, cols: Iterable[str], **outputs):
+        """Build the result of an indicator from the columns `cols` of the data,
+        which are shared rather than copied, followed by the output columns, in
+        `output_format`.
+
+        The arrays of the dict and structured array results are read-only, as they
+        are cached and may be views of the data. Inside `compute` the columns and
+        the outputs are returned as they are, to be combined.
+        """
+        if "_shared" in self.__dict__:
+            return list(cols), self._backend.collect(outputs)
+        data = {col: self._df[col] for col in cols}
+        data.update(self._backend.collect(outputs))
+        if self.output_format == "frame":
+            return pd.DataFrame(data, copy=False)
+        if self.output_format not in OUTPUT_FORMATS:
+            raise ValueError(
+                f"Invalid output_format is given, valid inputs are {OUTPUT_FORMATS}"
+            )
+
+        arrays = {}
+        for col, values in data.items():
+            if isinstance(values, pd.Series):
+                values = values.to_numpy()
+            values = np.ascontiguousarray(values)
+            values.flags.writeable = False
+            arrays[col] = values
+        if self.output_format == "arrays":
+            return arrays
+
+        result = np.empty(
+            len(self._df), dtype=[(col, values.dtype) for col, values in arrays.items()]
+        )
+        for col, values in arrays.items():
+            result[col] = values
+        result.flags.writeable = False
+        return result
+
+    @_shared
+    def _column(self, col: str):
+        """Column `col` of the data as a column of the backend."""
+        return self._backend.column(col)
+
+    @_shared
+    def _shift(self, x, n: int = 1):
+        return self._backend.shift(x, n)
+
+    @_shared
+    def _rolling(self, x, n: int, how: str = "mean"):
+        """Rolling `how` of a column over `n` values: mean, std, sum, min or max."""
+        return self._backend.rolling(x, n, how)
+
+    def _where(self, cond, a, b):
+        return self._backend.where(cond, a, b)
+
+    @_shared
+    def _clip(self, x, lower=None, upper=None):
+        return self._backend.clip(x, lower, upper)
+
+    @_shared
+    def _row_max(self, xs):
+        """Maximum of the columns per row, NaN if any of them is."""
+        return self._backend.row_max(xs)
+
+    @_shared
+    def _row_mean(self, cols: Iterable[str]):
+        """Mean of the columns per row skipping NaN, like `DataFrame.mean(axis=1)`
+        but without selecting the columns into a frame.
+        """
+        return self._backend.row_mean([self._column(col) for col in cols])
+
     def _ma(self, col, n, df=None):
-        if df is None:
-            df = self._df
-        return df[col].rolling(n).mean()
+        x = self._column(col) if df is None else df[col]
+        return self._rolling(x, n, "mean")
 
     def _md(self, col, n, df=None):
+        x = self._column(col) if df is None else df[col]
+        return self._rolling(x, n, "std")
+
+    @_shared
+    def _rolling_extrema(
+        self, col: str, ns: Iterable[int], kind: str = "min", df=None
+    ) -> Dict[int, pd.Series]:
+        """Calculate rolling min or max of a column for several windows at once.
+
+        The sparse table of each column is cached with the indicator results, so
+        indicators using the extrema of the same column share it.
+        """
+        if kind not in ("min", "max"):
+            raise ValueError("Only min and max are allowed for kind.")
+        if self.backend == "polars":
+            x = self._column(col) if df is None else df[col]
+            return {n: self._rolling(x, n, kind) for n in ns}
+        func = np.minimum if kind == "min" else np.maximum
+
         if df is None:
             df = self._df
-        return df[col].rolling(n).std(ddof=0)
+            key = ("_extrema_table", col, kind)
+            table = self._indicator_cache.get(key)
+            if table is None:
+                table = self._indicator_cache[key] = _ExtremaTable(
+                    df[col].to_numpy(), func
+                )
+        else:
+            table = _ExtremaTable(np.asarray(df[col]), func)
+
+        # a panel column is a frame of dates x codes
+        values = df[col]
+        if isinstance(values, pd.DataFrame):
+            return {
+                n: pd.DataFrame(
+                    table.query(n), index=values.index, columns=values.columns
+                )
+                for n in ns
+            }
+        if self.backend == "numpy":
+            return {n: table.query(n) for n in ns}
+        return {n: pd.Series(table.query(n), index=df.index, name=col) for n in ns}
+
+    def _rolling_min(self, col, n, df=None):
+        return self._rolling_extrema(col, [n], kind="min", df=df)[n]
+
+    def _rolling_max(self, col, n, df=None):
+        return self._rolling_extrema(col, [n], kind="max", df=df)[n]
 
     def _ema(self, col, n, df=None):
-        if df is None:
-            df = self._df
-        return df[col].ewm(ignore_na=False, span=n, min_periods=0, adjust=False).mean()
+        x = self._column(col) if df is None else df[col]
+        return self._ewm(x, span=n)
+
+    @_shared
+    def _ewm(self, x, span=None, alpha=None):
+        return self._backend.ewm_mean(x, span=span, alpha=alpha)
 
-    def _sma(self, n, col=None, df=None, use_ser: Union[bool, pd.Series] = False):
+    @_shared
+    def _fill_missing(self, x, value: float):
+        return self._backend.fill_missing(x, value)
+
+    def _sma(self, n, col=None, df=None, use_ser=False):
         """Calculate SMA indicator
 
-        if use_ser is assigned with a pandas.Series, then will use it to calculate
-        SMA and ignore other given data, default is False which will use the default
-        dataset.
+        if use_ser is assigned with a column of the backend, like a pandas.Series
+        (or a DataFrame of a panel), then will use it to calculate SMA and ignore
+        other given data, default is False which will use the default dataset.
         """
         assert n != 0, "Cannot set n to 0 for SMA."
 
-        if df is None:
-            df = self._df
-
-        if isinstance(use_ser, pd.Series):
-            ser = use_ser.fillna(0)
-        elif use_ser is False:
-            ser = df[col].fillna(0)
-        else:
+        if use_ser is False:
+            ser = self._column(col) if df is None else df[col]
+        elif isinstance(use_ser, bool):
             raise ValueError("Only False or a Series is allowed for user_ser.")
-        return ser.ewm(min_periods=0, ignore_na=False, adjust=False, alpha=1 / n).mean()
+        else:
+            ser = use_ser
+        return self._ewm(self._fill_missing(ser, 0), alpha=1 / n)
+
+    @_shared
+    def _cumsum(self, data):
+        """Cumulative sum of a column, or of a frame of a panel, skipping NaN."""
+        return self._backend.cumsum(data)
 
     def _rsi(self, col: str, n: int = 6):
-        df_rsi = self._df.loc[:, VOLUMN_VOLS]
-        ser_shift_diff = df_rsi[col] - df_rsi[col].shift(1)
-
-        df_rsi["shift_diff"] = ser_shift_diff.clip(lower=0)
-        df_rsi["shift_diff_abs"] = ser_shift_diff.abs()
-        df_rsi["rsi"] = (
-            self._sma(col="shift_diff", n=n, df=df_rsi)
-            / self._sma(col="shift_diff_abs", n=n, df=df_rsi)
-            * 100
-        )
+        ser = self._column(col)
+        ser_shift_diff = ser - self._shift(ser, 1)
 
-        return df_rsi
+        shift_diff = self._clip(ser_shift_diff, lower=0)
+        shift_diff_abs = abs(ser_shift_diff)
+        return self._frame(
+            VOLUMN_VOLS,
+            shift_diff=shift_diff,
+            shift_diff_abs=shift_diff_abs,
+            rsi=self._sma(n=n, use_ser=shift_diff)
+            / self._sma(n=n, use_ser=shift_diff_abs)
+            * 100,
+        )
@@ -0,0 +1,669 @@
+"""Streaming versions of the indicators which are updated bar by bar.
+
+Every tracker keeps the state of one indicator (running EMA/SMA values, rolling
+window buffers, cumulative OBV, SAR trend, etc.) so that appending a bar costs
+O(1) per indicator, and produces the same values as the full recompute.
+"""
+
+import math
+from collections import deque
+from typing import Dict
+
+from insider.indicators.base import BaseMixin
+from insider.constants import INITIAL_AF, INITIAL_TREND, MAX_AF
+
+NAN = float("nan")
+
+
+def _isnan(x) -> bool:
+    return x != x
+
+
+def _divide(a: float, b: float) -> float:
+    """Float division with the same zero handling as pandas."""
+    if b == 0:
+        if a == 0 or _isnan(a):
+            return NAN
+        return math.copysign(math.inf, a) * math.copysign(1, b)
+    return a / b
+
+
+def _clip(x: float, lower: float, upper: float) -> float:
+    if _isnan(x):
+        return x
+    return min(max(x, lower), upper)
+
+
+class _Lag:
+    """Return the value seen `n` updates ago, NaN until there is one."""
+
+    def __init__(self, n: int):
+        self.n = n
+        self._values = deque(maxlen=n + 1)
+
+    def update(self, x: float) -> float:
+        self._values.append(x)
+        if len(self._values) <= self.n:
+            return NAN
+        return self._values[0]
+
+
+class _Rolling:
+    """Rolling mean, sum and population std over a window of `n` values.
+
+    Like pandas with `min_periods=n`, the result is NaN until the window holds
+    `n` valid values.
+    """
+
+    def __init__(self, n: int):
+        self.n = n
+        self._values = deque()
+        self._nobs = 0
+        self._sum = 0.0
+        self._mean = 0.0
+        self._ssqdm = 0.0
+
+    def _add(self, x: float):
+        if _isnan(x):
+            return
+        self._nobs += 1
+        self._sum += x
+        delta = x - self._mean
+        self._mean += delta / self._nobs
+        self._ssqdm += (self._nobs - 1) * delta * delta / self._nobs
+
+    def _remove(self, x: float):
+        if _isnan(x):
+            return
+        self._nobs -= 1
+        self._sum -= x
+        if self._nobs:
+            delta = x - self._mean
+            self._mean -= delta / self._nobs
+            self._ssqdm -= (self._nobs + 1) * delta * delta / self._nobs
+        else:
+            self._sum = self._mean = self._ssqdm = 0.0
+
+    def update(self, x: float):
+        self._values.append(x)
+        self._add(x)
+        if len(self._values) > self.n:
+            self._remove(self._values.popleft())
+
+    @property
+    def ready(self) -> bool:
+        return self._nobs >= self.n
+
+    @property
+    def sum(self) -> float:
+        return self._sum if self.ready else NAN
+
+    @property
+    def mean(self) -> float:
+        return self._sum / self._nobs if self.ready else NAN
+
+    @property
+    def std(self) -> float:
+        if not self.ready:
+            return NAN
+        return math.sqrt(max(self._ssqdm / self._nobs, 0.0))
+
+
+class _RollingExtremum:
+    """Rolling min or max over `n` values with a monotonic deque."""
+
+    def __init__(self, n: int, is_max: bool):
+        self.n = n
+        self.is_max = is_max
+        self._i = -1
+        self._deque = deque()
+        self._nans = deque()
+
+    def update(self, x: float) -> float:
+        self._i += 1
+        start = self._i - self.n + 1
+
+        if _isnan(x):
+            self._nans.append(self._i)
+        else:
+            if self.is_max:
+                while self._deque and self._deque[-1][1] <= x:
+                    self._deque.pop()
+            else:
+                while self._deque and self._deque[-1][1] >= x:
+                    self._deque.pop()
+            self._deque.append((self._i, x))
+
+        while self._deque and self._deque[0][0] < start:
+            self._deque.popleft()
+        while self._nans and self._nans[0] < start:
+            self._nans.popleft()
+
+        if start < 0 or self._nans:
+            return NAN
+        return self._deque[0][1]
+
+
+class _EWM:
+    """Exponentially weighted mean with `adjust=False` and `ignore_na=False`,
+    i.e. `BaseMixin._ema` and `BaseMixin._sma`.
+    """
+
+    def __init__(self, alpha: float):
+        self.alpha = alpha
+        self._weighted = None
+        self._old_wt = 1.0
+        self._new_wt = alpha
+
+    def update(self, x: float) -> float:
+        if self._weighted is None or _isnan(self._weighted):
+            self._weighted = x
+        else:
+            self._old_wt *= 1 - self.alpha
+            if self.alpha == 0.5:
+                # as pandas does when com is 1, which only matters after NaN
+                self._new_wt = 1 - self._old_wt
+            if not _isnan(x):
+                if self._weighted != x:
+                    self._weighted = (
+                        self._old_wt * self._weighted + self._new_wt * x
+                    ) / (self._old_wt + self._new_wt)
+                self._old_wt = 1.0
+        return self._weighted
+
+
+def _ema(n: int) -> _EWM:
+    return _EWM(2 / (n + 1))
+
+
+class _SMA(_EWM):
+    def __init__(self, n: int):
+        super().__init__(1 / n)
+
+    def update(self, x: float) -> float:
+        return super().update(0.0 if _isnan(x) else x)
+
+
+class _Tracker:
+    """Base class of the indicator trackers, `update` takes a bar as a dict."""
+
+    def update(self, bar: Dict[str, float]) -> Dict[str, float]:
+        raise NotImplementedError
+
+
+class _MATracker(_Tracker):
+    col = "close"
+
+    def __init__(self, n: int = 5):
+        self._rolling = _Rolling(n)
+
+    def update(self, bar):
+        self._rolling.update(bar[self.col])
+        return {self.col: self._rolling.mean}
+
+
+class _VMATracker(_MATracker):
+    col = "volumn"
+
+
+class _MDTracker(_Tracker):
+    def __init__(self, n: int = 5):
+        self._rolling = _Rolling(n)
+
+    def update(self, bar):
+        self._rolling.update(bar["close"])
+        return {"close": self._rolling.std}
+
+
+class _VSTDTracker(_Tracker):
+    def __init__(self, n: int = 5):
+        self._rolling = _Rolling(n)
+
+    def update(self, bar):
+        self._rolling.update(bar["volumn"])
+        return {"vstd": self._rolling.std}
+
+
+class _EMATracker(_Tracker):
+    def __init__(self, n: int = 5):
+        self._ema = _ema(n)
+
+    def update(self, bar):
+        return {"close": self._ema.update(bar["close"])}
+
+
+class _MACDTracker(_Tracker):
+    col = "close"
+
+    def __init__(self, n: int = 12, m: int = 26, k: int = 9):
+        self._fast, self._slow, self._dea = _ema(n), _ema(m), _ema(k)
+
+    def update(self, bar):
+        diff = self._fast.update(bar[self.col]) - self._slow.update(bar[self.col])
+        dea = self._dea.update(diff)
+        return {"diff": diff, "dea": dea, "macd": 2 * (diff - dea)}
+
+
+class _VMACDTracker(_MACDTracker):
+    col = "volumn"
+
+
+class _KDJTracker(_Tracker):
+    def __init__(self, n: int = 9, smooth_type: str = "sma"):
+        if smooth_type == "sma":
+            smooth = _SMA
+        elif smooth_type == "ema":
+            smooth = _ema
+        else:
+            raise ValueError(
+                "Invalid smooth average method is given, only sma and ema are allowed."
+            )
+        self._low = _RollingExtremum(n, is_max=False)
+        self._high = _RollingExtremum(n, is_max=True)
+        self._k, self._d = smooth(3), smooth(3)
+
+    def update(self, bar):
+        low = self._low.update(bar["low"])
+        high = self._high.update(bar["high"])
+        rsv = _divide(bar["close"] - low, high - low) * 100
+        k = self._k.update(rsv)
+        d = self._d.update(k)
+        j = 3 * k - 2 * d
+        return {"K": _clip(k, 0, 100), "D": _clip(d, 0, 100), "J": _clip(j, 0, 100)}
+
+
+class _RSITracker(_Tracker):
+    col = "close"
+
+    def __init__(self, n: int = 6):
+        self._prev = NAN
+        self._up, self._abs = _SMA(n), _SMA(n)
+
+    def update(self, bar):
+        diff = bar[self.col] - self._prev
+        self._prev = bar[self.col]
+        up = self._up.update(_clip(diff, 0, math.inf))
+        total = self._abs.update(abs(diff))
+        return {"rsi": _divide(up, total) * 100}
+
+
+class _VRSITracker(_RSITracker):
+    col = "volumn"
+
+
+class _ENVTracker(_Tracker):
+    def __init__(self, n: int = 14):
+        self._rolling = _Rolling(n)
+
+    def update(self, bar):
+        self._rolling.update(bar["close"])
+        ma = self._rolling.mean
+        return {"up": ma * 1.06, "down": ma * 0.94}
+
+
+class _MITracker(_Tracker):
+    def __init__(self, n: int = 12):
+        self._lag = _Lag(n)
+        self._sma = _SMA(n)
+
+    def update(self, bar):
+        diff = bar["close"] - self._lag.update(bar["close"])
+        return {"mi": self._sma.update(diff)}
+
+
+class _MIKETracker(_Tracker):
+    def __init__(self, n: int = 12):
+        self._high = _RollingExtremum(n, is_max=True)
+        self._low = _RollingExtremum(n, is_max=False)
+
+    def update(self, bar):
+        typ = (bar["high"] + bar["low"] + bar["close"]) / 3
+        hv = self._high.update(bar["high"])
+        lv = self._low.update(bar["low"])
+        return {
+            "wr": typ * 2 - lv,
+            "mr": typ + hv - lv,
+            "sr": 2 * hv - lv,
+            "ws": typ * 2 - hv,
+            "ms": typ - hv + lv,
+            "ss": 2 * lv - hv,
+        }
+
+
+class _ADTMTracker(_Tracker):
+    def __init__(self, n: int = 23, m: int = 8):
+        self._prev_open = NAN
+        self._stm, self._sbm = _Rolling(n), _Rolling(n)
+        self._adtmma = _Rolling(m)
+
+    def update(self, bar):
+        open_diff = bar["open"] - self._prev_open
+        self._prev_open = bar["open"]
+        high_open_diff = bar["high"] - bar["open"]
+        open_low_diff = bar["open"] - bar["low"]
+
+        dtm = max(high_open_diff, open_low_diff) if open_diff > 0 else 0
+        dbm = 0 if open_diff >= 0 else open_low_diff
+        self._stm.update(dtm)
+        self._sbm.update(dbm)
+        stm, sbm = self._stm.sum, self._sbm.sum
+
+        if stm > sbm:
+            adtm = (stm - sbm) / stm
+        elif stm < sbm:
+            adtm = (stm - sbm) / sbm
+        else:
+            adtm = 0
+        self._adtmma.update(adtm)
+        return {
+            "dtm": dtm,
+            "dbm": dbm,
+            "stm": stm,
+            "sbm": sbm,
+            "adtm": adtm,
+            "adtmma": self._adtmma.mean,
+        }
+
+
+class _RCTracker(_Tracker):
+    def __init__(self, n: int = 30):
+        self._lag = _Lag(n)
+        self._prev_rc = NAN
+        self._sma = _SMA(n)
+
+    def update(self, bar):
+        rc = _divide(bar["close"], self._lag.update(bar["close"]))
+        arc = self._sma.update(self._prev_rc)
+        self._prev_rc = rc
+        return {"rc": rc, "arc": arc}
+
+
+class _BOLLTracker(_Tracker):
+    def __init__(self, n: int = 26):
+        self._rolling = _Rolling(n)
+
+    def update(self, bar):
+        self._rolling.update(bar["close"])
+        middle, md = self._rolling.mean, self._rolling.std
+        return {"middle": middle, "up": middle + 2 * md, "down": middle - 2 * md}
+
+
+class _BBIBOLLTracker(_Tracker):
+    def __init__(self, n: int = 11, m: int = 6):
+        self.m = m
+        self._mas = [_Rolling(i) for i in (3, 6, 12, 24)]
+        self._md = _Rolling(n)
+
+    def update(self, bar):
+        for ma in self._mas:
+            ma.update(bar["close"])
+        bbiboll = sum(ma.mean for ma in self._mas) / 4
+        self._md.update(bbiboll)
+        md = self._md.std
+        return {
+            "bbiboll": bbiboll,
+            "upr": bbiboll + self.m * md,
+            "dwn": bbiboll - self.m * md,
+        }
+
+
+class _ATRTracker(_Tracker):
+    def __init__(self, n: int = 14):
+        self._prev_close = NAN
+        self._atr = _Rolling(n)
+
+    def update(self, bar):
+        ranges = [
+            abs(bar["high"] - bar["low"]),
+            abs(self._prev_close - bar["high"]),
+            abs(self._prev_close - bar["low"]),
+        ]
+        self._prev_close = bar["close"]
+        tr = NAN if any(_isnan(r) for r in ranges) else max(ranges)
+        self._atr.update(tr)
+        return {"tr": tr, "atr": self._atr.mean}
+
+
+class _CDPTracker(_Tracker):
+    def __init__(self, n: int = 1):
+        self._prev = None
+        self._ah, self._nh, self._al, self._nl = (_Rolling(n) for _ in range(4))
+
+    def update(self, bar):
+        if self._prev is None:
+            cdp = high = low = NAN
+        else:
+            high, low, close = self._prev
+            cdp = (high + low + close) / 3
+        self._prev = (bar["high"], bar["low"], bar["close"])
+
+        self._ah.update(cdp + high - low)
+        self._nh.update(cdp * 2 - low)
+        self._al.update(cdp - high + low)
+        self._nl.update(cdp * 2 - high)
+        return {
+            "cdp": cdp,
+            "ah": self._ah.mean,
+            "nh": self._nh.mean,
+            "al": self._al.mean,
+            "nl": self._nl.mean,
+        }
+
+
+class _MTMTracker(_Tracker):
+    def __init__(self, n: int = 6, m: int = 5):
+        self._lag = _Lag(n)
+        self._mtmma = _Rolling(m)
+
+    def update(self, bar):
+        mtm = bar["close"] - self._lag.update(bar["close"])
+        self._mtmma.update(mtm)
+        return {"mtm": mtm, "mtmma": self._mtmma.mean}
+
+
+class _DMITracker(_Tracker):
+    def __init__(self, n: int = 14):
+        self._prev = None
+        self._atr = _ATRTracker(n)
+        self._pdi, self._mdi, self._adx = _Rolling(n), _Rolling(n), _Rolling(n)
+        self._adx_lag = _Lag(n)
+
+    def update(self, bar):
+        if self._prev is None:
+            up = down = NAN
+        else:
+            up = bar["high"] - self._prev[0]
+            down = self._prev[1] - bar["low"]
+        self._prev = (bar["high"], bar["low"])
+
+        atr = self._atr.update(bar)["atr"]
+        self._pdi.update(up if up > down and up > 0 else 0)
+        self._mdi.update(down if down > up and down > 0 else 0)
+        pdi = _divide(100 * self._pdi.mean, atr)
+        mdi = _divide(100 * self._mdi.mean, atr)
+
+        self._adx.update(abs(pdi - mdi))
+        adx = _divide(100 * self._adx.mean, pdi + mdi)
+        adxr = (adx + self._adx_lag.update(adx)) / 2
+        return {
+            "up": up,
+            "down": down,
+            "atr": atr,
+            "pdi": pdi,
+            "mdi": mdi,
+            "adx": adx,
+            "adxr": adxr,
+        }
+
+
+class _VOSCTracker(_Tracker):
+    def __init__(self, n: int = 12, m: int = 26):
+        self._short, self._long = _Rolling(n), _Rolling(m)
+
+    def update(self, bar):
+        self._short.update(bar["volumn"])
+        self._long.update(bar["volumn"])
+        short = self._short.mean
+        return {"vosc": _divide(short - self._long.mean, short) * 100}
+
+
+class _OBVTracker(_Tracker):
+    def __init__(self):
+        self._prev_close = NAN
+        self._obv = 0.0
+
+    def update(self, bar):
+        close_diff = bar["close"] - self._prev_close
+        self._prev_close = bar["close"]
+        if close_diff > 0:
+            v = bar["volumn"]
+        elif close_diff < 0:
+            v = -bar["volumn"]
+        else:
+            v = 0
+        # the full recompute sums the volumn skipping NaN
+        if not _isnan(v):
+            self._obv += v
+        return {"close_diff": close_diff, "v": v, "obv": self._obv}
+
+
+class _SARTracker(_Tracker):
+    def __init__(self, af_step: float = INITIAL_AF, af_max: float = MAX_AF):
+        self.af_step, self.af_max = af_step, af_max
+        self._trend = INITIAL_TREND
+        self._af = af_step
+        self._sar = None
+
+    def update(self, bar):
+        if self._sar is None:
+            self._start_high, self._start_low = bar["high"], bar["low"]
+            self._sar = bar["close"]
+        elif self._trend:
+            sar = self._sar + self._af * (self._start_high - self._sar)
+            if bar["low"] < sar:
+                self._trend = False
+                self._start_low = bar["low"]
+                sar = self._start_high
+                self._af = self.af_step
+            elif bar["high"] > self._start_high:
+                self._start_high = bar["high"]
+                self._af = min(self._af + self.af_step, self.af_max)
+            self._sar = sar
+        else:
+            sar = self._sar + self._af * (self._start_low - self._sar)
+            if bar["high"] > sar:
+                self._trend = True
+                self._start_high = bar["high"]
+                sar = self._start_low
+                self._af = self.af_step
+            elif bar["low"] < self._start_low:
+                self._start_low = bar["low"]
+                self._af = min(self._af + self.af_step, self.af_max)
+            self._sar = sar
+        return {
+            "sar": self._sar,
+            "trend": self._trend,
+            "color": "red" if self._trend else "green",
+        }
+
+
+TRACKERS = {
+    "ma": _MATracker,
+    "md": _MDTracker,
+    "ema": _EMATracker,
+    "macd": _MACDTracker,
+    "kdj": _KDJTracker,
+    "rsi": _RSITracker,
+    "env": _ENVTracker,
+    "mi": _MITracker,
+    "mike": _MIKETracker,
+    "adtm": _ADTMTracker,
+    "rc": _RCTracker,
+    "boll": _BOLLTracker,
+    "bbiboll": _BBIBOLLTracker,
+    "atr": _ATRTracker,
+    "cdp": _CDPTracker,
+    "mtm": _MTMTracker,
+    "dmi": _DMITracker,
+    "vma": _VMATracker,
+    "vmacd": _VMACDTracker,
+    "vstd": _VSTDTracker,
+    "vrsi": _VRSITracker,
+    "vosc": _VOSCTracker,
+    "obv": _OBVTracker,
+    "sar": _SARTracker,
+}
+
+
+class IncrementalMixin(BaseMixin):
+    """Keep indicators up to date when new bars are appended. 增量更新指标。"""
+
+    def track(self, name: str, **params) -> str:
+        """Start tracking an indicator, its state is built from the current data.
+        开始跟踪一个指标。
+
+        Parameters:
+            name: Name of the indicator, e.g. `macd`. 指标名称
+            params: Parameters of the indicator, same as the indicator method,
+                e.g. `n=9`. 指标参数
+
+        Returns:
+            The key under which the indicator values are returned by `append_bar`.
+            `append_bar`返回结果中该指标的键。
+        """
+        if name not in TRACKERS:
+            raise ValueError(
+                f"Invalid indicator is given, valid inputs are {list(TRACKERS)}"
+            )
+
+        tracker = TRACKERS[name](**params)
+        cols = [
+            col for col in ["open", "high", "low", "close", "volumn"] if col in self._df
+        ]
+        for bar in self._df[cols].itertuples(index=False):
+            tracker.update(bar._asdict())
+
+        if not hasattr(self, "_trackers"):
+            self._trackers = {}
+        key = name
+        if params:
+            key += "(" + ", ".join(f"{k}={v}" for k, v in sorted(params.items())) + ")"
+        self._trackers[key] = tracker
+        return key
+
+    def untrack(self, key: str):
+        """Stop tracking an indicator. 停止跟踪一个指标。"""
+        self._trackers.pop(key)
+
+    def append_bar(
+        self,
+        day,
+        open: float,
+        high: float,
+        low: float,
+        close: float,
+        volumn: float,
+        **kwargs,
+    ) -> Dict[str, Dict[str, float]]:
+        """Append a new bar to the data and update all tracked indicators.
+        添加一根新的K线并更新所有跟踪的指标。
+
+        Parameters:
+            day: trading day of the bar, e.g. '2020-05-06'. 交易日
+            open, high, low, close, volumn: prices and volumn of the bar. 价格与成交量
+            kwargs: other columns of the data, missing columns are left empty.
+            其他列的数据
+
+        Returns:
+            The latest values of each tracked indicator, keyed as returned by `track`.
+            每个跟踪指标的最新值。
+        """
+        bar = {"open": open, "high": high, "low": low, "close": close, "volumn": volumn}
+        # kept aside until the data is read, see `BaseMixin._df`
+        self.__dict__.setdefault("_pending_rows", []).append(
+            {"day": day, **bar, **kwargs}
+        )
+        self._drop_caches()
+
+        trackers = getattr(self, "_trackers", {})
+        return {key: tracker.update(bar) for key, tracker in trackers.items()}
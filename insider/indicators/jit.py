@@ -0,0 +1,239 @@
+"""Compiled kernels of the recursive indicators, used when numba is installed.
+
+EMA and SMA (exponentially weighted means), the cumulative sum of OBV and SAR are
+first-order recursions, which run as plain loops once compiled. The kernels follow
+the pandas code step by step, with NaN handled the same way, so the results agree
+with it to rounding. Each kernel is compiled on its first call, so importing the
+package never imports numba; set `$INSIDER_JIT` to 0 to use the pandas code.
+"""
+
+from functools import wraps
+import importlib.util
+import os
+
+import numpy as np
+import pandas as pd
+
+from insider.constants import INITIAL_AF, INITIAL_TREND, JIT_ENV, MAX_AF
+
+_HAS_NUMBA = importlib.util.find_spec("numba") is not None
+_COMPILED = {}
+
+
+def available() -> bool:
+    """Whether the compiled kernels are used. 是否使用编译后的计算内核"""
+    return _HAS_NUMBA and os.environ.get(JIT_ENV, "1") != "0"
+
+
+def _kernel(func):
+    """Compile `func` with numba on its first call."""
+
+    @wraps(func)
+    def wrapper(*args):
+        compiled = _COMPILED.get(func.__name__)
+        if compiled is None:
+            import numba
+
+            compiled = numba.njit(cache=True, nogil=True)(func)
+            _COMPILED[func.__name__] = compiled
+        return compiled(*args)
+
+    return wrapper
+
+
+@_kernel
+def _ewm_mean_kernel(values, com):
+    # window_aggregations.ewm of pandas with adjust=False, ignore_na=False and
+    # min_periods=1, on each column
+    alpha = 1.0 / (1.0 + com)
+    old_wt_factor = 1.0 - alpha
+    out = np.empty_like(values)
+    for j in range(values.shape[1]):
+        weighted = values[0, j]
+        nobs = 1 if weighted == weighted else 0
+        out[0, j] = weighted if nobs else np.nan
+        old_wt = 1.0
+        new_wt = alpha
+        for i in range(1, values.shape[0]):
+            cur = values[i, j]
+            is_observation = cur == cur
+            if is_observation:
+                nobs += 1
+            if weighted == weighted:
+                old_wt *= old_wt_factor
+                if com == 1:
+                    # as pandas does, which only matters after a gap of NaN
+                    new_wt = 1.0 - old_wt
+                if is_observation:
+                    if weighted != cur:
+                        weighted = old_wt * weighted + new_wt * cur
+                        weighted /= old_wt + new_wt
+                    old_wt = 1.0
+            elif is_observation:
+                weighted = cur
+            out[i, j] = weighted if nobs else np.nan
+    return out
+
+
+@_kernel
+def _cumsum_kernel(values):
+    # Kahan summation skipping NaN, like the expanding sum of pandas
+    out = np.empty_like(values)
+    for j in range(values.shape[1]):
+        total = 0.0
+        compensation = 0.0
+        nobs = 0
+        for i in range(values.shape[0]):
+            val = values[i, j]
+            if val == val:
+                nobs += 1
+                y = val - compensation
+                t = total + y
+                compensation = t - total - y
+                total = t
+            out[i, j] = total if nobs else np.nan
+    return out
+
+
+@_kernel
+def _sar_kernel(high, low, close, af_step, af_max, trend):
+    # same steps as `insider.indicators.sar._sar`
+    n = len(high)
+    sar = close.copy()
+    trends = np.empty(n, dtype=np.bool_)
+    if n == 0:
+        return sar, trends
+    trends[0] = trend
+
+    af = af_step
+    start_high = high[0]
+    start_low = low[0]
+    prev_sar = sar[0]
+    for i in range(1, n):
+        if trend:
+            cur_sar = prev_sar + af * (start_high - prev_sar)
+            if low[i] < cur_sar:
+                trend = False
+                start_low = low[i]
+                cur_sar = start_high
+                af = af_step
+            elif high[i] > start_high:
+                start_high = high[i]
+                af = min(af + af_step, af_max)
+        else:
+            cur_sar = prev_sar + af * (start_low - prev_sar)
+            if high[i] > cur_sar:
+                trend = True
+                start_high = high[i]
+                cur_sar = start_low
+                af = af_step
+            elif low[i] < start_low:
+                start_low = low[i]
+                af = min(af + af_step, af_max)
+
+        sar[i] = cur_sar
+        trends[i] = trend
+        prev_sar = cur_sar
+    return sar, trends
+
+
+@_kernel
+def _sar_panel_kernel(high, low, close, af_step, af_max, trend):
+    # same steps as `insider.indicators.sar._sar_panel`, one stock at a time
+    sar = np.full_like(close, np.nan)
+    trends = np.empty(close.shape, dtype=np.bool_)
+    for j in range(close.shape[1]):
+        started = False
+        up = trend
+        af = af_step
+        start_high = start_low = prev_sar = np.nan
+        for i in range(close.shape[0]):
+            h, lo, c = high[i, j], low[i, j], close[i, j]
+            if h != h or lo != lo or c != c:
+                trends[i, j] = up
+                continue
+            if not started:
+                started = True
+                cur_sar = c
+                start_high = h
+                start_low = lo
+            elif up:
+                cur_sar = prev_sar + af * (start_high - prev_sar)
+                if lo < cur_sar:
+                    up = False
+                    cur_sar = start_high
+                    start_low = lo
+                    af = af_step
+                elif h > start_high:
+                    start_high = h
+                    af = min(af + af_step, af_max)
+            else:
+                cur_sar = prev_sar + af * (start_low - prev_sar)
+                if h > cur_sar:
+                    up = True
+                    cur_sar = start_low
+                    start_high = h
+                    af = af_step
+                elif lo < start_low:
+                    start_low = lo
+                    af = min(af + af_step, af_max)
+            prev_sar = cur_sar
+            sar[i, j] = cur_sar
+            trends[i, j] = up
+    return sar, trends
+
+
+def _apply(kernel, data, *args):
+    # run a column-wise kernel on a Series, an array or on a frame of a panel
+    values = np.asarray(data, dtype="float64")
+    result = kernel(values.reshape(len(values), -1), *args)
+    if isinstance(data, pd.DataFrame):
+        return pd.DataFrame(result, index=data.index, columns=data.columns)
+    if isinstance(data, np.ndarray):
+        return result.reshape(data.shape)
+    return pd.Series(result[:, 0], index=data.index, name=data.name)
+
+
+def ewm_mean(data, span: float = None, alpha: float = None):
+    """Exponentially weighted mean with `adjust=False`, like
+    `data.ewm(span=span, alpha=alpha, adjust=False).mean()`.
+
+    Parameters:
+        data: a Series or an array, or a frame of dates x codes of a panel. 数据
+        span: span of the weights, or give `alpha`. 跨度
+        alpha: smoothing factor. 平滑系数
+    """
+    # the center of mass as pandas derives it, so that the weights are the same
+    com = (span - 1) / 2 if span is not None else (1 - alpha) / alpha
+    if com < 0:
+        raise ValueError("span must be at least 1, or alpha in (0, 1].")
+    return _apply(_ewm_mean_kernel, data, float(com))
+
+
+def cumsum(data):
+    """Cumulative sum skipping NaN, like `data.expanding(1).sum()`.
+
+    Parameters:
+        data: a Series or an array, or a frame of dates x codes of a panel. 数据
+    """
+    return _apply(_cumsum_kernel, data)
+
+
+def sar(high, low, close, af_step=INITIAL_AF, af_max=MAX_AF, trend=INITIAL_TREND):
+    """Compiled `insider.indicators.sar._sar`."""
+    return _sar_kernel(
+        *(np.ascontiguousarray(a, dtype="float64") for a in (high, low, close)),
+        float(af_step),
+        float(af_max),
+        bool(trend),
+    )
+
+
+def sar_panel(high, low, close, af_step=INITIAL_AF, af_max=MAX_AF, trend=INITIAL_TREND):
+    """Compiled `insider.indicators.sar._sar_panel`."""
+    return _sar_panel_kernel(
+        *(np.asarray(a, dtype="float64") for a in (high, low, close)),
+        float(af_step),
+        float(af_max),
+        bool(trend),
+    )
@@ -0,0 +1,79 @@
+"""Warm-up lengths of the indicators.
+
+The warm-up of an indicator is the number of bars before a row which the value
+of that row depends on. Computing an indicator on the last `head + warm-up` bars
+then gives the same last `head` values as computing it on the whole history.
+
+Windowed indicators (MA, MD, rolling extrema, shifts) have an exact warm-up. The
+EMA/SMA recursions depend on the whole history with geometrically decaying
+weights, so their warm-up is the horizon after which the weight of the dropped
+history is below `WARMUP_TOLERANCE`, i.e. the values differ from the full
+recompute by at most that fraction of the gap between the first kept value and
+the dropped history. OBV and SAR carry state from the very first bar and have no
+warm-up, they are always computed on the full history.
+"""
+
+import math
+from typing import Optional
+
+from insider.constants import WARMUP_TOLERANCE
+
+
+def ewm_horizon(alpha: float, tol: float = WARMUP_TOLERANCE) -> int:
+    """Number of steps after which the weight of the initial value drops below `tol`."""
+    if alpha >= 1:
+        return 0
+    return math.ceil(math.log(tol) / math.log(1 - alpha))
+
+
+def ema_horizon(n: int) -> int:
+    return ewm_horizon(2 / (n + 1))
+
+
+def sma_horizon(n: int) -> int:
+    return ewm_horizon(1 / n)
+
+
+def _macd(n=12, m=26, k=9):
+    return max(ema_horizon(n), ema_horizon(m)) + ema_horizon(k)
+
+
+def _kdj(n=9, smooth_type="sma"):
+    smooth = sma_horizon(3) if smooth_type == "sma" else ema_horizon(3)
+    # K is smoothed from RSV, and D again from K
+    return n - 1 + 2 * smooth
+
+
+LOOKBACKS = {
+    "ma": lambda n=5: n - 1,
+    "md": lambda n=5: n - 1,
+    "ema": lambda n=5: ema_horizon(n),
+    "macd": _macd,
+    "kdj": _kdj,
+    "rsi": lambda n=6: 1 + sma_horizon(n),
+    "env": lambda n=14: n - 1,
+    "mi": lambda n=12: n + sma_horizon(n),
+    "mike": lambda n=12: n - 1,
+    "adtm": lambda n=23, m=8: n + m - 1,
+    "rc": lambda n=30: n + 1 + sma_horizon(n),
+    "boll": lambda n=26: n - 1,
+    "bbiboll": lambda n=11, m=6: 24 + n - 2,
+    "atr": lambda n=14: n,
+    "cdp": lambda n=1: n,
+    "mtm": lambda n=6, m=5: n + m - 1,
+    "dmi": lambda n=14: 3 * n - 1,
+    "vma": lambda n=5: n - 1,
+    "vmacd": _macd,
+    "vstd": lambda n=5: n - 1,
+    "vrsi": lambda n=6: 1 + sma_horizon(n),
+    "vosc": lambda n=12, m=26: max(n, m) - 1,
+}
+
+
+def lookback(name: str, **params) -> Optional[int]:
+    """Return the warm-up of an indicator with the given parameters, or None if
+    it needs the full history.
+    """
+    if name not in LOOKBACKS:
+        return None
+    return LOOKBACKS[name](**params)
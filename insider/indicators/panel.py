@@ -0,0 +1,296 @@
+import numpy as np
+import pandas as pd
+
+from insider.indicators.base import BaseMixin, memoize
+from insider.indicators import jit
+from insider.indicators.sar import _sar_panel
+from insider.constants import INITIAL_AF, MAX_AF
+
+
+class PanelIndicatorMixin(BaseMixin):
+    """Panel Indicator Mixin (多股票面板指标混合)
+
+    `_df` is a panel: a frame of days x (field, code) columns, so that
+    `self._df["close"]` is the days x codes frame of all close prices and the
+    `BaseMixin` primitives compute every stock in one vectorized call.
+
+    Every indicator follows the rules of the single stock indicator of the same
+    name and returns a frame of days x (column, code). Only its result columns
+    are kept: the columns of the data, the intermediate ones (`up` and `down` of
+    `dmi`, `dtm` to `sbm` of `adtm`, `close_diff` and `v` of `obv`, etc.) and the
+    `color` of `sar` are left out. Values are NaN on days a stock has no bar. A stock listed later
+    gets the same values as if it was computed on its own; for a stock which is
+    suspended for some days, the windows count the suspended days (SAR skips them).
+    """
+
+    def _panel(self, **cols: pd.DataFrame) -> pd.DataFrame:
+        has_bar = self._df["close"].notna()
+        return pd.concat(
+            {
+                name: (
+                    frame.where(has_bar) if frame.dtypes.eq("float64").all() else frame
+                )
+                for name, frame in cols.items()
+            },
+            axis=1,
+        )
+
+    def _combine(self, results: dict) -> pd.DataFrame:
+        # the frames of the indicators in `compute` side by side
+        return pd.concat(
+            [
+                frame.rename(columns=lambda col, label=label: f"{label}.{col}", level=0)
+                for label, frame in results.items()
+            ],
+            axis=1,
+        )
+
+    @staticmethod
+    def _like(frame: pd.DataFrame, values: np.ndarray) -> pd.DataFrame:
+        return pd.DataFrame(values, index=frame.index, columns=frame.columns)
+
+    def _ema_macd(self, col: str, n: int, m: int, k: int):
+        diff = self._ema(col=col, n=n) - self._ema(col=col, n=m)
+        dea = self._ema(col="diff", n=k, df={"diff": diff})
+        return diff, dea, 2 * (diff - dea)
+
+    def _rsi_panel(self, col: str, n: int) -> pd.DataFrame:
+        shift_diff = self._df[col] - self._df[col].shift(1)
+        rsi = (
+            self._sma(n=n, use_ser=shift_diff.clip(lower=0))
+            / self._sma(n=n, use_ser=shift_diff.abs())
+            * 100
+        )
+        return self._panel(rsi=rsi)
+
+    @memoize
+    def ma(self, n=5):
+        """Moving Average Calculation (移动平均值计算)"""
+        return self._panel(close=self._ma(col="close", n=n))
+
+    @memoize
+    def md(self, n=5):
+        """Moving Deviation Calculation (移动标准差值计算)"""
+        return self._panel(close=self._md(col="close", n=n))
+
+    @memoize
+    def ema(self, n=5):
+        """Exponential Moving Average Calculation (指数移动平均值计算)"""
+        return self._panel(close=self._ema(col="close", n=n))
+
+    @memoize
+    def macd(self, n=12, m=26, k=9):
+        """Moving Average Convergence Divergence Calculation (平滑异同移动平均计算)"""
+        diff, dea, macd = self._ema_macd("close", n, m, k)
+        return self._panel(diff=diff, dea=dea, macd=macd)
+
+    @memoize
+    def kdj(self, n: int = 9, smooth_type: str = "sma"):
+        """KDJ Indicator (随机指标)"""
+        if smooth_type == "sma":
+            func = self._sma
+        elif smooth_type == "ema":
+            func = self._ema
+        else:
+            raise ValueError(
+                "Invalid smooth average method is given, only sma and ema are allowed."
+            )
+
+        lv = self._rolling_min("low", n)
+        rsv = (self._df["close"] - lv) / (self._rolling_max("high", n) - lv) * 100
+        k = func(col="K", n=3, df={"K": rsv})
+        d = func(col="K", n=3, df={"K": k})
+        j = 3 * k - 2 * d
+
+        # Cap it between 0 and 100 as shown in THS.
+        return self._panel(K=k.clip(0, 100), D=d.clip(0, 100), J=j.clip(0, 100))
+
+    @memoize
+    def rsi(self, n: int = 6):
+        return self._rsi_panel("close", n=n)
+
+    @memoize
+    def env(self, n: int = 14):
+        ma = self._ma(col="close", n=n)
+        return self._panel(up=ma * 1.06, down=ma * 0.94)
+
+    @memoize
+    def mi(self, n=12):
+        """Calculate MI indicator."""
+        close = self._df["close"]
+        return self._panel(mi=self._sma(n=n, use_ser=close - close.shift(n)))
+
+    @memoize
+    def mike(self, n: int = 12):
+        """Calculate MIKE Base indicator"""
+        df = self._df
+        typ = (df["high"] + df["low"] + df["close"]) / 3
+        hv = self._rolling_max("high", n)
+        lv = self._rolling_min("low", n)
+        return self._panel(
+            wr=typ * 2 - lv,
+            mr=typ + hv - lv,
+            sr=2 * hv - lv,
+            ws=typ * 2 - hv,
+            ms=typ - hv + lv,
+            ss=2 * lv - hv,
+        )
+
+    @memoize
+    def adtm(self, n: int = 23, m: int = 8):
+        """动态买卖气指数"""
+        open_ = self._df["open"]
+        open_diff = (open_ - open_.shift(1)).to_numpy()
+        high_open_diff = (self._df["high"] - open_).to_numpy()
+        open_low_diff = (open_ - self._df["low"]).to_numpy()
+
+        dtm = np.where(
+            open_diff > 0,
+            np.where(high_open_diff >= open_low_diff, high_open_diff, open_low_diff),
+            0,
+        )
+        dbm = np.where(open_diff >= 0, 0, open_low_diff)
+        # the windows of a stock start at its first bar
+        has_bar = open_.notna().to_numpy()
+        dtm = np.where(has_bar, dtm, np.nan)
+        dbm = np.where(has_bar, dbm, np.nan)
+        stm = self._like(open_, dtm).rolling(n).sum().to_numpy()
+        sbm = self._like(open_, dbm).rolling(n).sum().to_numpy()
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            adtm = np.select(
+                condlist=[stm > sbm, stm < sbm, stm == sbm],
+                choicelist=[(stm - sbm) / stm, (stm - sbm) / sbm, 0],
+            )
+        adtm = self._like(open_, adtm).where(has_bar)
+        return self._panel(
+            adtm=adtm, adtmma=self._ma(col="adtm", n=m, df={"adtm": adtm})
+        )
+
+    @memoize
+    def rc(self, n: int = 30):
+        """Calculate RC (Price rate of Change) indicator。 计算价格变化率"""
+        close = self._df["close"]
+        rc = close / close.shift(n)
+        return self._panel(rc=rc, arc=self._sma(n=n, use_ser=rc.shift(1)))
+
+    @memoize
+    def boll(self, n: int = 26):
+        """Calculate BOLL line indicator. 计算布林线。"""
+        md = self._md(col="close", n=n)
+        middle = self._ma(col="close", n=n)
+        return self._panel(middle=middle, up=middle + 2 * md, down=middle - 2 * md)
+
+    @memoize
+    def bbiboll(self, n: int = 11, m: int = 6):
+        """Calculate BBIBOLL line indicator. 计算多空布林线."""
+        bbiboll = (
+            self._ma(col="close", n=3)
+            + self._ma(col="close", n=6)
+            + self._ma(col="close", n=12)
+            + self._ma(col="close", n=24)
+        ) / 4
+        md = self._md(col="bbiboll", n=n, df={"bbiboll": bbiboll})
+        return self._panel(bbiboll=bbiboll, upr=bbiboll + m * md, dwn=bbiboll - m * md)
+
+    def _tr(self) -> pd.DataFrame:
+        df = self._df
+        prev_close = df["close"].shift(1)
+        return np.maximum(
+            np.maximum((df["high"] - df["low"]).abs(), (prev_close - df["high"]).abs()),
+            (prev_close - df["low"]).abs(),
+        )
+
+    @memoize
+    def atr(self, n: int = 14):
+        """Average True Ranger Indicator."""
+        tr = self._tr()
+        return self._panel(tr=tr, atr=self._ma(col="tr", n=n, df={"tr": tr}))
+
+    @memoize
+    def cdp(self, n: int = 1):
+        """CDP (Contrarian Operation Indicator) 逆势操作指标。"""
+        prev_high = self._df["high"].shift(1)
+        prev_low = self._df["low"].shift(1)
+        cdp = (prev_high + prev_low + self._df["close"].shift(1)) / 3
+        return self._panel(
+            cdp=cdp,
+            ah=(cdp + prev_high - prev_low).rolling(n).mean(),
+            nh=(cdp * 2 - prev_low).rolling(n).mean(),
+            al=(cdp - prev_high + prev_low).rolling(n).mean(),
+            nl=(cdp * 2 - prev_high).rolling(n).mean(),
+        )
+
+    @memoize
+    def mtm(self, n: int = 6, m: int = 5):
+        """Momentum Index. （动量指标）"""
+        close = self._df["close"]
+        mtm = close - close.shift(n)
+        return self._panel(mtm=mtm, mtmma=self._ma(col="mtm", n=m, df={"mtm": mtm}))
+
+    @memoize
+    def dmi(self, n: int = 14):
+        """DMI (Directional Movement Index) 动向指标"""
+        high, low = self._df["high"], self._df["low"]
+        up = high - high.shift(1)
+        down = low.shift(1) - low
+        pdi = self._like(up, np.where((up > down) & (up > 0), up, 0))
+        mdi = self._like(up, np.where((down > up) & (down > 0), down, 0))
+
+        atr = self._ma(col="tr", n=n, df={"tr": self._tr()})
+        pdi = 100 * self._ma(col="pdi", n=n, df={"pdi": pdi}) / atr
+        mdi = 100 * self._ma(col="mdi", n=n, df={"mdi": mdi}) / atr
+        adx = 100 * (pdi - mdi).abs().rolling(n).mean() / (pdi + mdi)
+        return self._panel(
+            pdi=pdi, mdi=mdi, atr=atr, adx=adx, adxr=(adx + adx.shift(n)) / 2
+        )
+
+    @memoize
+    def vma(self, n=5):
+        """Volumn Moving Average Calculation (量能移动平均值计算)"""
+        return self._panel(volumn=self._ma(col="volumn", n=n))
+
+    @memoize
+    def vmacd(self, n=12, m=26, k=9):
+        """Volumn Moving Average Convergence Divergence Calculation (量能平滑异同移动平均计算)"""
+        diff, dea, macd = self._ema_macd("volumn", n, m, k)
+        return self._panel(diff=diff, dea=dea, macd=macd)
+
+    @memoize
+    def vstd(self, n=5):
+        return self._panel(vstd=self._md(col="volumn", n=n))
+
+    @memoize
+    def vrsi(self, n: int = 6):
+        return self._rsi_panel("volumn", n=n)
+
+    @memoize
+    def vosc(self, n=12, m=26):
+        """Volume Oscillator Indicator (成交量震荡指标)"""
+        short = self._ma(col="volumn", n=n)
+        return self._panel(vosc=(short - self._ma(col="volumn", n=m)) / short * 100)
+
+    @memoize
+    def obv(self):
+        """On Balance Volumn Indicator (平衡能量指标)"""
+        close, volumn = self._df["close"], self._df["volumn"]
+        close_diff = (close - close.shift()).to_numpy()
+        v = np.select(
+            condlist=[close_diff > 0, close_diff < 0, close_diff == 0],
+            choicelist=[volumn.to_numpy(), -volumn.to_numpy(), 0],
+        )
+        return self._panel(obv=self._cumsum(self._like(close, v)))
+
+    @memoize
+    def sar(self, af_step: float = INITIAL_AF, af_max: float = MAX_AF):
+        """SAR (Stop and Reverse) indicator, see `SARIndicatorMixin.sar`. 抛物线指标"""
+        close = self._df["close"]
+        kernel = jit.sar_panel if jit.available() else _sar_panel
+        sar, trend = kernel(
+            self._df["high"].to_numpy(),
+            self._df["low"].to_numpy(),
+            close.to_numpy(),
+            af_step=af_step,
+            af_max=af_max,
+        )
+        return self._panel(sar=self._like(close, sar), trend=self._like(close, trend))
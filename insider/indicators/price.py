@@ -1,30 +1,26 @@
-import numpy as np
-
-from insider.indicators.base import BaseMixin
+from insider.indicators.base import BaseMixin, _shared, memoize
 from insider.constants import MOVING_COLS, HIGH_LOW_COLS, ADTM_COLS
 
 
 class PriceIndicatorMixin(BaseMixin):
     """Moving Indicator Mixin (移动指标混合)"""
 
+    @memoize
     def ma(self, n=5):
         """Moving Average Calculation (移动平均值计算)"""
-        df_ma = self._df.loc[:, MOVING_COLS]
-        df_ma.loc[:, "close"] = self._ma(col="close", n=n)
-        return df_ma
+        return self._frame(MOVING_COLS, close=self._ma(col="close", n=n))
 
+    @memoize
     def md(self, n=5):
         """Moving Deviation Calculation (移动标准差值计算)"""
-        df_md = self._df.loc[:, MOVING_COLS]
-        df_md.loc[:, "close"] = self._md(col="close", n=n)
-        return df_md
+        return self._frame(MOVING_COLS, close=self._md(col="close", n=n))
 
+    @memoize
     def ema(self, n=5):
         """Exponential Moving Average Calculation (指数移动平均值计算)"""
-        df_ema = self._df.loc[:, MOVING_COLS]
-        df_ema.loc[:, "close"] = self._ema(col="close", n=n)
-        return df_ema
+        return self._frame(MOVING_COLS, close=self._ema(col="close", n=n))
 
+    @memoize
     def macd(self, n=12, m=26, k=9):
         """Moving Average Convergence Divergence Calculation (平滑异同移动平均计算)
 
@@ -33,14 +29,11 @@ class PriceIndicatorMixin(BaseMixin):
         DEA = DIF的9日加权移动平均
         MACD = 2 ×（DIF-DEA）
         """
-        df_macd = self._df.loc[:, MOVING_COLS]
-        df_macd.loc[:, "diff"] = self._ema(col="close", n=n) - self._ema(
-            col="close", n=m
-        )
-        df_macd.loc[:, "dea"] = self._ema(col="diff", n=k, df=df_macd)
-        df_macd.loc[:, "macd"] = 2 * (df_macd["diff"] - df_macd["dea"])
-        return df_macd
+        diff = self._ema(col="close", n=n) - self._ema(col="close", n=m)
+        dea = self._ema(col="diff", n=k, df={"diff": diff})
+        return self._frame(MOVING_COLS, diff=diff, dea=dea, macd=2 * (diff - dea))
 
+    @memoize
     def kdj(self, n: int = 9, smooth_type: str = "sma"):
         """
         规则
@@ -60,62 +53,62 @@ class PriceIndicatorMixin(BaseMixin):
                 "Invalid smooth average method is given, only sma and ema are allowed."
             )
 
-        df_kdj = self._df.loc[:, HIGH_LOW_COLS]
-        close_minus_low = df_kdj["close"] - df_kdj["low"].rolling(n).min()
-        high_minus_low = (
-            df_kdj["high"].rolling(n).max() - df_kdj["low"].rolling(n).min()
-        )
+        lv = self._rolling_min("low", n)
+        close_minus_low = self._column("close") - lv
+        high_minus_low = self._rolling_max("high", n) - lv
 
-        df_kdj.loc[:, "K"] = (close_minus_low / high_minus_low) * 100
-        df_kdj.loc[:, "K"] = func(col="K", n=3, df=df_kdj)
-        df_kdj.loc[:, "D"] = func(col="K", n=3, df=df_kdj)
-        df_kdj.loc[:, "J"] = 3 * df_kdj["K"] - 2 * df_kdj["D"]
+        k = func(col="K", n=3, df={"K": (close_minus_low / high_minus_low) * 100})
+        d = func(col="K", n=3, df={"K": k})
+        j = 3 * k - 2 * d
 
         # Cap it between 0 and 100 as shown in THS.
-        df_kdj.loc[:, ["K", "D", "J"]] = df_kdj.loc[:, ["K", "D", "J"]].clip(0, 100)
-        return df_kdj
+        return self._frame(
+            HIGH_LOW_COLS,
+            K=self._clip(k, 0, 100),
+            D=self._clip(d, 0, 100),
+            J=self._clip(j, 0, 100),
+        )
 
+    @memoize
     def rsi(self, n: int = 6):
         return self._rsi("close", n=n)
 
+    @memoize
     def env(self, n: int = 14):
-        df_env = self._df.loc[:, MOVING_COLS]
-
-        df_env.loc[:, "up"] = self._ma(col="close", n=n) * 1.06
-        df_env.loc[:, "down"] = self._ma(col="close", n=n) * 0.94
-        return df_env
+        ma = self._ma(col="close", n=n)
+        return self._frame(MOVING_COLS, up=ma * 1.06, down=ma * 0.94)
 
+    @memoize
     def mi(self, n=12):
         """Calculate MI indicator.
         规则
         MI = CLOSE-REF(CLOSE,1)
         """
-        df_mi = self._df.loc[:, MOVING_COLS]
-
-        ser = df_mi["close"] - df_mi["close"].shift(n)
-        df_mi.loc[:, "mi"] = self._sma(n=n, use_ser=ser)
-        return df_mi
+        close = self._column("close")
+        ser = close - self._shift(close, n)
+        return self._frame(MOVING_COLS, mi=self._sma(n=n, use_ser=ser))
 
+    @memoize
     def mike(self, n: int = 12):
         """Calculate MIKE Base indicator"""
-        df_mike = self._df.loc[:, HIGH_LOW_COLS]
-
         # typ price = avg(high + low + close)
-        typ = df_mike[["high", "low", "close"]].mean(axis=1)
+        typ = self._row_mean(["high", "low", "close"])
         # hv price = highest price in a window
-        hv = df_mike["high"].rolling(n).max()
+        hv = self._rolling_max("high", n)
         # lv price = lowest price in a window
-        lv = df_mike["low"].rolling(n).min()
-
-        df_mike.loc[:, "wr"] = typ * 2 - lv
-        df_mike.loc[:, "mr"] = typ + hv - lv
-        df_mike.loc[:, "sr"] = 2 * hv - lv
-        df_mike.loc[:, "ws"] = typ * 2 - hv
-        df_mike.loc[:, "ms"] = typ - hv + lv
-        df_mike.loc[:, "ss"] = 2 * lv - hv
-
-        return df_mike
+        lv = self._rolling_min("low", n)
+
+        return self._frame(
+            HIGH_LOW_COLS,
+            wr=typ * 2 - lv,
+            mr=typ + hv - lv,
+            sr=2 * hv - lv,
+            ws=typ * 2 - hv,
+            ms=typ - hv + lv,
+            ss=2 * lv - hv,
+        )
 
+    @memoize
     def adtm(self, n: int = 23, m: int = 8):
         """动态买卖气指数
         (https://bkso.baidu.com/item/%E5%8A%A8%E6%80%81%E4%B9%B0%E5%8D%96%E6%B0%94%E6%8C%87%E6%A0%87)
@@ -138,55 +131,49 @@ class PriceIndicatorMixin(BaseMixin):
         2.低于-0.5时为低风险区,高于+0.5时为高风险区，需注意风险。
         3.ADTM上穿ADTMMA时，买入股票；ADTM跌穿ADTMMA时，卖出股票。
         """
-        df_adtm = self._df.loc[:, ADTM_COLS]
-
-        df_adtm.loc[:, "open_diff"] = df_adtm["open"] - df_adtm["open"].shift(1)
-        df_adtm.loc[:, "high_open_diff"] = df_adtm["high"] - df_adtm["open"]
-        df_adtm.loc[:, "open_low_diff"] = df_adtm["open"] - df_adtm["low"]
-
-        df_adtm = (
-            df_adtm.assign(
-                dtm=lambda x: np.where(
-                    x["open_diff"] > 0,
-                    np.where(
-                        x["high_open_diff"] >= x["open_low_diff"],
-                        x["high_open_diff"],
-                        x["open_low_diff"],
-                    ),
-                    0,
-                )
-            )
-        ).assign(dbm=lambda x: np.where(x["open_diff"] >= 0, 0, x["open_low_diff"]))
-
-        df_adtm.loc[:, "stm"] = df_adtm["dtm"].rolling(n).sum()
-        df_adtm.loc[:, "sbm"] = df_adtm["dbm"].rolling(n).sum()
-
-        df_adtm = df_adtm.assign(
-            adtm=lambda x: np.select(
-                condlist=[
-                    x["stm"] > x["sbm"],
-                    x["stm"] < x["sbm"],
-                    x["stm"] == x["sbm"],
-                ],
-                choicelist=[
-                    (x["stm"] - x["sbm"]) / x["stm"],
-                    (x["stm"] - x["sbm"]) / x["sbm"],
-                    0,
-                ],
-            )
+        open_ = self._column("open")
+        open_diff = open_ - self._shift(open_, 1)
+        high_open_diff = self._column("high") - open_
+        open_low_diff = open_ - self._column("low")
+
+        dtm = self._where(
+            open_diff > 0,
+            self._where(high_open_diff >= open_low_diff, high_open_diff, open_low_diff),
+            0,
+        )
+        dbm = self._where(open_diff >= 0, 0, open_low_diff)
+        stm = self._rolling(dtm, n, "sum")
+        sbm = self._rolling(dbm, n, "sum")
+
+        adtm = self._where(
+            stm > sbm,
+            (stm - sbm) / stm,
+            self._where(stm < sbm, (stm - sbm) / sbm, 0),
+        )
+        adtmma = self._ma(col="adtm", n=m, df={"adtm": adtm})
+        return self._frame(
+            ADTM_COLS,
+            open_diff=open_diff,
+            high_open_diff=high_open_diff,
+            open_low_diff=open_low_diff,
+            dtm=dtm,
+            dbm=dbm,
+            stm=stm,
+            sbm=sbm,
+            adtm=adtm,
+            adtmma=adtmma,
         )
 
-        df_adtm.loc[:, "adtmma"] = self._ma(col="adtm", n=m, df=df_adtm)
-        return df_adtm
-
+    @memoize
     def rc(self, n: int = 30):
         """Calculate RC (Price rate of Change) indicator。 计算价格变化率"""
-        df_rc = self._df.loc[:, MOVING_COLS]
-        df_rc.loc[:, "rc"] = df_rc["close"] / df_rc["close"].shift(n)
-        df_rc.loc[:, "arc"] = self._sma(use_ser=df_rc["rc"].shift(1), n=n)
-
-        return df_rc
+        close = self._column("close")
+        rc = close / self._shift(close, n)
+        return self._frame(
+            MOVING_COLS, rc=rc, arc=self._sma(use_ser=self._shift(rc, 1), n=n)
+        )
 
+    @memoize
     def boll(self, n: int = 26):
         """Calculate BOLL line indicator. 计算布林线。
 
@@ -195,13 +182,13 @@ class PriceIndicatorMixin(BaseMixin):
         上轨线 = 中轨线 + 两倍的标准差
         下轨线 = 中轨线 － 两倍的标准差
         """
-        df_boll = self._df.loc[:, MOVING_COLS]
-        df_boll.loc[:, "middle"] = self._ma(col="close", n=n)
-        df_boll.loc[:, "up"] = df_boll["middle"] + 2 * self._md(col="close", n=n)
-        df_boll.loc[:, "down"] = df_boll["middle"] - 2 * self._md(col="close", n=n)
-
-        return df_boll
+        md = self._md(col="close", n=n)
+        middle = self._ma(col="close", n=n)
+        return self._frame(
+            MOVING_COLS, middle=middle, up=middle + 2 * md, down=middle - 2 * md
+        )
 
+    @memoize
     def bbiboll(self, n: int = 11, m: int = 6):
         """Calculate BBIBOLL line indicator. 计算多空布林线.
 
@@ -211,35 +198,34 @@ class PriceIndicatorMixin(BaseMixin):
         DWN = BBIBOLL - M * BBIBOLL的N日估算标准差
         参数N=11，M=6
         """
-        df_bbiboll = self._df.loc[:, MOVING_COLS]
-        df_bbiboll.loc[:, "bbiboll"] = (
+        bbiboll = (
             self._ma(col="close", n=3)
             + self._ma(col="close", n=6)
             + self._ma(col="close", n=12)
             + self._ma(col="close", n=24)
         ) / 4
-        df_bbiboll.loc[:, "upr"] = df_bbiboll["bbiboll"] + m * self._md(
-            col="bbiboll", df=df_bbiboll, n=n
+        md = self._md(col="bbiboll", df={"bbiboll": bbiboll}, n=n)
+        return self._frame(
+            MOVING_COLS, bbiboll=bbiboll, upr=bbiboll + m * md, dwn=bbiboll - m * md
         )
-        df_bbiboll.loc[:, "dwn"] = df_bbiboll["bbiboll"] - m * self._md(
-            col="bbiboll", df=df_bbiboll, n=n
+
+    @_shared
+    def _atr(self, n: int):
+        # true range and its moving average, shared by ATR and DMI
+        high, low = self._column("high"), self._column("low")
+        prev_close = self._shift(self._column("close"), 1)
+        tr = self._row_max(
+            [abs(high - low), abs(prev_close - high), abs(prev_close - low)]
         )
-        return df_bbiboll
+        return tr, self._ma(col="tr", df={"tr": tr}, n=n)
 
+    @memoize
     def atr(self, n: int = 14):
         """Average True Ranger Indicator."""
-        df_atr = self._df.loc[:, HIGH_LOW_COLS]
-        df_atr.loc[:, "tr"] = np.vstack(
-            [
-                (df_atr["high"] - df_atr["low"]).abs(),
-                (df_atr["close"].shift(1) - df_atr["high"]).abs(),
-                (df_atr["close"].shift(1) - df_atr["low"]).abs(),
-            ]
-        ).max(axis=0)
-
-        df_atr.loc[:, "atr"] = self._ma(col="tr", df=df_atr, n=n)
-        return df_atr
+        tr, atr = self._atr(n)
+        return self._frame(HIGH_LOW_COLS, tr=tr, atr=atr)
 
+    @memoize
     def cdp(self, n: int = 1):
         """CDP (Contrarian Operation Indicator) 逆势操作指标。
 
@@ -250,30 +236,19 @@ class PriceIndicatorMixin(BaseMixin):
         最低值（AL）= MA（CDP-（前日最高价-前日最低价），N）
         近低值（NL）= MA（CDP*2-前日最高价，N）
         """
-        df_cdp = self._df.loc[:, HIGH_LOW_COLS]
-
-        df_cdp.loc[:, "cdp"] = (
-            df_cdp.loc[:, ["high", "low", "close"]].shift(1).mean(axis=1)
-        )
-        df_cdp.loc[:, "ah"] = (
-            (df_cdp["cdp"] + df_cdp["high"].shift(1) - df_cdp["low"].shift(1))
-            .rolling(n)
-            .mean()
-        )
-        df_cdp.loc[:, "nh"] = (
-            (df_cdp["cdp"] * 2 - df_cdp["low"].shift(1)).rolling(n).mean()
-        )
-        df_cdp.loc[:, "al"] = (
-            (df_cdp["cdp"] - df_cdp["high"].shift(1) + df_cdp["low"].shift(1))
-            .rolling(n)
-            .mean()
-        )
-        df_cdp.loc[:, "nl"] = (
-            (df_cdp["cdp"] * 2 - df_cdp["high"].shift(1)).rolling(n).mean()
+        prev_high = self._shift(self._column("high"), 1)
+        prev_low = self._shift(self._column("low"), 1)
+        cdp = self._shift(self._row_mean(["high", "low", "close"]), 1)
+        return self._frame(
+            HIGH_LOW_COLS,
+            cdp=cdp,
+            ah=self._rolling(cdp + prev_high - prev_low, n),
+            nh=self._rolling(cdp * 2 - prev_low, n),
+            al=self._rolling(cdp - prev_high + prev_low, n),
+            nl=self._rolling(cdp * 2 - prev_high, n),
         )
 
-        return df_cdp
-
+    @memoize
     def mtm(self, n: int = 6, m: int = 5):
         """Momentum Index. （动量指标）
 
@@ -282,36 +257,32 @@ class PriceIndicatorMixin(BaseMixin):
         C = 当日的收盘价
         CN = N日前的收盘价
         """
-        df_mtm = self._df.loc[:, MOVING_COLS]
-
-        df_mtm.loc[:, "mtm"] = df_mtm["close"] - df_mtm["close"].shift(n)
-        df_mtm.loc[:, "mtmma"] = self._ma(col="mtm", df=df_mtm, n=m)
-        return df_mtm
+        close = self._column("close")
+        mtm = close - self._shift(close, n)
+        return self._frame(
+            MOVING_COLS, mtm=mtm, mtmma=self._ma(col="mtm", df={"mtm": mtm}, n=m)
+        )
 
+    @memoize
     def dmi(self, n: int = 14):
         """DMI (Directional Movement Index) 动向指标"""
-        df_dmi = self._df.loc[:, HIGH_LOW_COLS]
-
-        df_dmi.loc[:, "up"] = df_dmi["high"] - df_dmi["high"].shift(1)
-        df_dmi.loc[:, "down"] = df_dmi["low"].shift(1) - df_dmi["low"]
-
-        df_dmi = df_dmi.assign(
-            pdi=lambda x: np.where((x["up"] > x["down"]) & (x["up"] > 0), x["up"], 0)
-        ).assign(
-            mdi=lambda x: np.where(
-                (x["down"] > x["up"]) & (x["down"] > 0), x["down"], 0
-            )
+        high, low = self._column("high"), self._column("low")
+        up = high - self._shift(high, 1)
+        down = self._shift(low, 1) - low
+        pdi = self._where((up > down) & (up > 0), up, 0)
+        mdi = self._where((down > up) & (down > 0), down, 0)
+        _, atr = self._atr(n)
+
+        pdi = 100 * self._ma(col="pdi", df={"pdi": pdi}, n=n) / atr
+        mdi = 100 * self._ma(col="mdi", df={"mdi": mdi}, n=n) / atr
+        adx = 100 * self._rolling(abs(pdi - mdi), n) / (pdi + mdi)
+        return self._frame(
+            HIGH_LOW_COLS,
+            up=up,
+            down=down,
+            pdi=pdi,
+            mdi=mdi,
+            atr=atr,
+            adx=adx,
+            adxr=(adx + self._shift(adx, n)) / 2,
         )
-        df_dmi.loc[:, "atr"] = self.atr(n=n)["atr"]
-
-        df_dmi.loc[:, "pdi"] = 100 * self._ma(col="pdi", df=df_dmi, n=n) / df_dmi["atr"]
-        df_dmi.loc[:, "mdi"] = 100 * self._ma(col="mdi", df=df_dmi, n=n) / df_dmi["atr"]
-
-        df_dmi.loc[:, "adx"] = (
-            100
-            * (df_dmi["pdi"] - df_dmi["mdi"]).abs().rolling(n).mean()
-            / (df_dmi["pdi"] + df_dmi["mdi"])
-        )
-        df_dmi.loc[:, "adxr"] = (df_dmi["adx"] + df_dmi["adx"].shift(n)) / 2
-
-        return df_dmi
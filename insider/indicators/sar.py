@@ -1,11 +1,124 @@
-import pandas as pd
+import numpy as np
 
-from insider.indicators.base import BaseMixin
-from insider.constants import HIGH_LOW_COLS, INITIAL_AF, INITIAL_TREND
+from insider.indicators import jit
+from insider.indicators.base import BaseMixin, memoize
+from insider.constants import HIGH_LOW_COLS, INITIAL_AF, INITIAL_TREND, MAX_AF
+
+
+def _sar(high, low, close, af_step=INITIAL_AF, af_max=MAX_AF, trend=INITIAL_TREND):
+    """SAR kernel working on plain arrays.
+
+    The recursion is evaluated on Python lists instead of pandas objects so
+    that every step is a cheap scalar operation. Returns the SAR values and
+    the trend (True for rising) as numpy arrays.
+    """
+    high = np.asarray(high, dtype="float64").tolist()
+    low = np.asarray(low, dtype="float64").tolist()
+    n = len(high)
+
+    sar = np.asarray(close, dtype="float64").tolist()
+    trends = [trend] * n
+    if n == 0:
+        return np.array(sar, dtype="float64"), np.array(trends, dtype="bool")
+
+    af = af_step
+    start_high = high[0]
+    start_low = low[0]
+    prev_sar = sar[0]
+
+    for i in range(1, n):
+        if trend:
+            cur_sar = prev_sar + af * (start_high - prev_sar)
+            if low[i] < cur_sar:
+                trend = False
+                start_low = low[i]
+                cur_sar = start_high
+                af = af_step
+            elif high[i] > start_high:
+                start_high = high[i]
+                af = min(af + af_step, af_max)
+        else:
+            cur_sar = prev_sar + af * (start_low - prev_sar)
+            if high[i] > cur_sar:
+                trend = True
+                start_high = high[i]
+                cur_sar = start_low
+                af = af_step
+            elif low[i] < start_low:
+                start_low = low[i]
+                af = min(af + af_step, af_max)
+
+        sar[i] = cur_sar
+        trends[i] = trend
+        prev_sar = cur_sar
+
+    return np.array(sar, dtype="float64"), np.array(trends, dtype="bool")
+
+
+def _sar_panel(
+    high, low, close, af_step=INITIAL_AF, af_max=MAX_AF, trend=INITIAL_TREND
+):
+    """SAR kernel of a panel, with one column per stock.
+
+    The recursion steps through the rows once and updates all the stocks with
+    array operations. Each stock starts at its first row with data, and rows
+    without data are skipped, as if the stock was computed on its own. Returns
+    the SAR values (NaN where there is no data) and the trend as 2D arrays.
+    """
+    high = np.asarray(high, dtype="float64")
+    low = np.asarray(low, dtype="float64")
+    close = np.asarray(close, dtype="float64")
+
+    sar = np.full_like(close, np.nan)
+    trends = np.full(close.shape, trend, dtype="bool")
+    if close.size == 0:
+        return sar, trends
+
+    n_codes = close.shape[1]
+    started = np.zeros(n_codes, dtype="bool")
+    up = np.full(n_codes, trend, dtype="bool")
+    af = np.full(n_codes, af_step)
+    start_high = np.full(n_codes, np.nan)
+    start_low = np.full(n_codes, np.nan)
+    prev_sar = np.full(n_codes, np.nan)
+
+    for i in range(len(close)):
+        valid = ~(np.isnan(high[i]) | np.isnan(low[i]) | np.isnan(close[i]))
+        first = valid & ~started
+        active = valid & started
+
+        cur_sar = prev_sar + af * (np.where(up, start_high, start_low) - prev_sar)
+        to_down = active & up & (low[i] < cur_sar)
+        to_up = active & ~up & (high[i] > cur_sar)
+        new_high = active & up & ~to_down & (high[i] > start_high)
+        new_low = active & ~up & ~to_up & (low[i] < start_low)
+
+        cur_sar = np.where(to_down, start_high, np.where(to_up, start_low, cur_sar))
+        start_high = np.where(to_up | new_high, high[i], start_high)
+        start_low = np.where(to_down | new_low, low[i], start_low)
+        af = np.where(
+            to_down | to_up,
+            af_step,
+            np.where(new_high | new_low, np.minimum(af + af_step, af_max), af),
+        )
+        up = np.where(to_down, False, np.where(to_up, True, up))
+
+        # a stock starts at its first row with data, like the scalar kernel
+        cur_sar = np.where(first, close[i], cur_sar)
+        start_high = np.where(first, high[i], start_high)
+        start_low = np.where(first, low[i], start_low)
+        started |= first
+
+        prev_sar = np.where(valid, cur_sar, prev_sar)
+        sar[i] = np.where(valid, cur_sar, np.nan)
+        trends[i] = up
+
+    return sar, trends
 
 
 class SARIndicatorMixin(BaseMixin):
-    def sar(self):
+    @memoize
+    def sar(self, af_step: float = INITIAL_AF, af_max: float = MAX_AF):
         """
         规则
 
@@ -25,50 +138,20 @@ class SARIndicatorMixin(BaseMixin):
 
         若是看涨期间，计算出某日的SAR比当日或前一日的最低价高，则应以当日或前一日的最低价为某日之SAR；
         若是看跌期间，计算某日之SAR比当日或前一日的最高价低，则应以当日或前一日的最高价为某日的SAR；
+
+        Parameters:
+            af_step: initial value and step of the acceleration factor, default is 0.02.
+            加速因子的初始值及步长，默认0.02。
+            af_max: upper limit of the acceleration factor, default is 0.2. 加速因子的上限，默认0.2。
         """
-        df_sar = self._df.loc[:, HIGH_LOW_COLS]
-        trend = INITIAL_TREND
-        af = INITIAL_AF
-
-        df_sar.loc[:, "sar"] = df_sar["close"]
-        df_sar.loc[:, "trend"] = pd.Series(index=df_sar["close"].index, dtype="bool")
-
-        start_high = df_sar.loc[0, "high"]
-        start_low = df_sar.loc[0, "low"]
-
-        for i in range(1, len(df_sar)):
-
-            reverse = False
-            if trend:
-                df_sar.loc[i, "sar"] = df_sar.loc[i - 1, "sar"] + (
-                    af * (start_high - df_sar.loc[i - 1, "sar"])
-                )
-                if df_sar.loc[i, "low"] < df_sar.loc[i, "sar"]:
-                    reverse = True
-                    start_low = df_sar.loc[i, "low"]
-                    df_sar.loc[i, "sar"] = start_high
-                    af = 0.02
-                elif df_sar.loc[i, "high"] > start_high:
-                    start_high = df_sar.loc[i, "high"]
-                    af = min(af + 0.02, 0.2)
-            else:
-                df_sar.loc[i, "sar"] = df_sar.loc[i - 1, "sar"] + (
-                    af * (start_low - df_sar.loc[i - 1, "sar"])
-                )
-
-                if df_sar.loc[i, "high"] > df_sar.loc[i, "sar"]:
-                    reverse = True
-                    start_high = df_sar.loc[i, "high"]
-                    df_sar.loc[i, "sar"] = start_low
-                    af = 0.02
-                elif df_sar.loc[i, "low"] < start_low:
-                    start_low = df_sar.loc[i, "low"]
-                    af = min(af + 0.02, 0.2)
-
-            trend = trend != reverse
-            df_sar.loc[i, "trend"] = trend
-
-        df_sar.loc[:, "color"] = df_sar["trend"].apply(
-            lambda x: "red" if x else "green"
+        kernel = jit.sar if jit.available() else _sar
+        sar, trend = kernel(
+            self._df["high"].to_numpy(),
+            self._df["low"].to_numpy(),
+            self._df["close"].to_numpy(),
+            af_step=af_step,
+            af_max=af_max,
+        )
+        return self._frame(
+            HIGH_LOW_COLS, sar=sar, trend=trend, color=np.where(trend, "red", "green")
         )
-        return df_sar
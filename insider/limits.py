@@ -0,0 +1,174 @@
+"""Daily price limits (涨跌停) of A shares.
+
+A limit price is the previous close times (1 ± limit), rounded half up to 0.01
+yuan as the exchanges do. It is computed in fen with integer arithmetic on whole
+arrays, so that e.g. 11.055 is never rounded down because of a float error.
+Limits depend on the board: 10% on the main boards (5% for ST stocks), 20% on
+ChiNext and STAR Market and 30% on the Beijing Stock Exchange. ChiNext followed
+the main board rules before the reform of 2020-08-24.
+
+The first days after listing, which have no or wider limits, are not handled.
+"""
+
+from typing import Iterable, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from insider.constants import (
+    BSE_PREFIXES,
+    CHINEXT_PREFIXES,
+    CHINEXT_REFORM_DAY,
+    LIMIT_PCT,
+    STAR_PREFIXES,
+)
+
+ArrayLike = Union[float, np.ndarray, pd.Series, pd.DataFrame]
+
+
+def _board_masks(codes: Iterable[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    digits = pd.Index(codes).astype("str").str[-6:]
+    return (
+        np.asarray(digits.str.startswith(STAR_PREFIXES), dtype="bool"),
+        np.asarray(digits.str.startswith(CHINEXT_PREFIXES), dtype="bool"),
+        np.asarray(digits.str.startswith(BSE_PREFIXES), dtype="bool"),
+    )
+
+
+def board_of(codes: Iterable[str]) -> np.ndarray:
+    """Return the board of each code, one of `main`, `chinext`, `star` and `bse`.
+    股票所属板块。
+
+    Parameters:
+        codes: full codes such as `sz300750`, or the six digits only. 股票代码
+    """
+    return np.select(
+        list(_board_masks(codes)), ["star", "chinext", "bse"], default="main"
+    )
+
+
+def limit_pct(
+    codes: Iterable[str],
+    st: Union[bool, np.ndarray] = False,
+    days: Optional[Iterable] = None,
+) -> np.ndarray:
+    """Return the daily limit of each code in percent. 涨跌停幅度（百分比）。
+
+    Parameters:
+        codes: full codes such as `sz300750`, or the six digits only. 股票代码
+        st: whether the stocks are ST, a bool or an array broadcast to the result.
+            是否为ST股票
+        days: trading days, default is None which uses the current rules. If given,
+            the result is a days x codes array. 交易日期
+    """
+    star, chinext, bse = _board_masks(codes)
+    pct = np.select(
+        [star, chinext, bse],
+        [LIMIT_PCT["star"], LIMIT_PCT["chinext"], LIMIT_PCT["bse"]],
+        default=LIMIT_PCT["main"],
+    )
+    ten_pct = ~(star | chinext | bse)
+    if days is not None:
+        days = pd.DatetimeIndex(pd.to_datetime(days))
+        before_reform = (days < pd.Timestamp(CHINEXT_REFORM_DAY))[:, None]
+        ten_pct = ten_pct | (chinext & before_reform)
+        pct = np.broadcast_to(pct, ten_pct.shape)
+    pct = np.where(ten_pct, LIMIT_PCT["main"], pct)
+    return np.where(ten_pct & np.asarray(st, dtype="bool"), LIMIT_PCT["st"], pct)
+
+
+def _to_fen(price: ArrayLike) -> np.ndarray:
+    return np.rint(np.asarray(price, dtype="float64") * 100)
+
+
+def _limits_fen(prev_close: ArrayLike, pct: ArrayLike) -> Tuple[np.ndarray, np.ndarray]:
+    prev = _to_fen(prev_close)
+    # round half up in fen: floor((prev x (100 ± pct) + 50) / 100)
+    up = np.floor_divide(prev * (100 + pct) + 50, 100)
+    down = np.floor_divide(prev * (100 - pct) + 50, 100)
+    return up, down
+
+
+def limit_prices(
+    prev_close: ArrayLike, pct: ArrayLike = LIMIT_PCT["main"]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the limit-up and limit-down prices. 涨停价与跌停价。
+
+    Parameters:
+        prev_close: previous close prices. 昨日收盘价
+        pct: limits in percent, e.g. from `limit_pct`, default is 10. 涨跌停幅度
+    """
+    up, down = _limits_fen(prev_close, pct)
+    return up / 100, down / 100
+
+
+def _hits(prev_close: ArrayLike, close: ArrayLike, pct: ArrayLike) -> np.ndarray:
+    up, down = _limits_fen(prev_close, pct)
+    close = _to_fen(close)
+    prev = _to_fen(prev_close)
+    # a price too low to move by one fen is never at its limit
+    hit_up = (close == up) & (up != prev)
+    hit_down = (close == down) & (down != prev)
+    return np.where(hit_up, 1, np.where(hit_down, -1, 0)).astype("int8")
+
+
+def limit_hits(
+    df: pd.DataFrame,
+    prev_col: str = "preprice",
+    close_col: str = "price",
+    code_col: str = "code",
+    name_col: str = "name",
+) -> pd.DataFrame:
+    """Find the stocks at their limits in a full-market snapshot. 找出涨跌停的股票。
+
+    Stocks whose name contains `ST` use the ST limit.
+
+    Parameters:
+        df: snapshot with one row per stock. 全市场行情快照
+        prev_col: column of the previous close, default is `preprice`. 昨收价列
+        close_col: column of the latest price, default is `price`. 最新价列
+        code_col: column of the codes, default is `code`. 股票代码列
+        name_col: column of the names, default is `name`. 股票名称列
+
+    Returns:
+        a copy of `df` with the `limit_up` and `limit_down` prices, and `hit` which
+        is 1 at limit-up, -1 at limit-down and 0 otherwise.
+    """
+    st = False
+    if name_col in df:
+        st = df[name_col].astype(str).str.contains("ST", regex=False).to_numpy()
+    pct = limit_pct(df[code_col], st=st)
+
+    result = df.copy()
+    result["limit_up"], result["limit_down"] = limit_prices(df[prev_col], pct)
+    result["hit"] = _hits(df[prev_col], df[close_col], pct)
+    return result
+
+
+def limit_matrix(
+    close: pd.DataFrame, st: Optional[Union[pd.Series, pd.DataFrame]] = None
+) -> pd.DataFrame:
+    """Mark the limit hits over history. 历史涨跌停矩阵。
+
+    Parameters:
+        close: days x codes close prices, e.g. `StockUniverse.panel("close")`. Days
+            without a bar are NaN, and the next bar is compared with the last close
+            before them. 收盘价（日期 x 股票代码）
+        st: whether the stocks are ST, a bool Series by code or a days x codes bool
+            frame, default is None. 是否为ST股票
+
+    Returns:
+        an int8 frame of days x codes, 1 at limit-up, -1 at limit-down and 0
+        otherwise. 1为涨停，-1为跌停，0为其他
+    """
+    if st is None:
+        st = False
+    elif isinstance(st, pd.DataFrame):
+        st = st.reindex(index=close.index, columns=close.columns, fill_value=False)
+    else:
+        st = st.reindex(close.columns, fill_value=False)
+    pct = limit_pct(close.columns, st=np.asarray(st, dtype="bool"), days=close.index)
+
+    prev_close = close.ffill().shift(1)
+    hits = _hits(prev_close.to_numpy(), close.to_numpy(), pct)
+    return pd.DataFrame(hits, index=close.index, columns=close.columns)
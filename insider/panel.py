@@ -0,0 +1,81 @@
+from typing import Dict, List, Optional, Union
+
+import pandas as pd
+
+from insider.constants import PANEL_FIELDS
+from insider.indicators.panel import PanelIndicatorMixin
+from insider.limits import limit_matrix
+
+
+class StockPanel(PanelIndicatorMixin):
+    """Compute trading indicators of many stocks at once. 同时计算多只股票的交易指标。
+
+    The bars are kept as one frame of days x (field, code) columns, e.g.
+    `panel.full_data["close"]` is the close prices of all stocks, and each
+    indicator is computed for every stock with a few array operations.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        """
+        Parameters:
+            df: frame of days x (field, code) columns which includes at least the
+                fields `open`, `high`, `low`, `close` and `volumn`. 以日期为行、
+                (字段, 股票代码)为列的数据
+        """
+        if not isinstance(df.columns, pd.MultiIndex) or df.columns.nlevels != 2:
+            raise ValueError("The columns of a panel must be (field, code) pairs.")
+        missing = set(PANEL_FIELDS) - set(df.columns.get_level_values(0))
+        if missing:
+            raise ValueError(f"Fields {sorted(missing)} are missing in the panel.")
+        if not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+        self._df = df
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame]):
+        """Align the bars of several stocks by day into a panel. 按日期对齐多只股票的数据。
+
+        Parameters:
+            frames: dict of code to bars with a `day` column, e.g. the result of
+                `StockUniverse.load`. 股票代码到历史数据的字典
+        """
+        if not frames:
+            raise ValueError("At least one stock is required to build a panel.")
+        df = pd.concat(
+            {
+                code: frame.set_index(pd.to_datetime(frame["day"]))[PANEL_FIELDS]
+                for code, frame in frames.items()
+            },
+            axis=1,
+            sort=True,
+        )
+        df = df.swaplevel(axis=1).reindex(
+            columns=pd.MultiIndex.from_product([PANEL_FIELDS, list(frames)])
+        )
+        df.index.name = "day"
+        return cls(df)
+
+    @property
+    def codes(self) -> List[str]:
+        return list(self._df["close"].columns)
+
+    @property
+    def full_data(self) -> pd.DataFrame:
+        return self._df.copy(deep=not self.read_only)
+
+    def stock(self, code: str) -> pd.DataFrame:
+        """Return the bars of one stock on the days it has data. 返回单只股票的数据。"""
+        df = self._df.xs(code, axis=1, level=1).dropna(subset=["close"])
+        return df.reset_index()
+
+    def limit_hits(
+        self, st: Optional[Union[pd.Series, pd.DataFrame]] = None
+    ) -> pd.DataFrame:
+        """Mark the limit-up (1) and limit-down (-1) days of every stock, see
+        `insider.limits.limit_matrix`. 历史涨跌停矩阵。
+
+        Parameters:
+            st: whether the stocks are ST, a bool Series by code or a days x codes
+                bool frame, default is None. 是否为ST股票
+        """
+        return limit_matrix(self._df["close"], st=st)
@@ -0,0 +1,231 @@
+"""Record and replay of the ifeng `record` payloads.
+
+`record` saves the raw JSON payloads of the live endpoint into a replay
+directory, one `{code}_{ktype}.json` file per code and ktype. `Stock` reads them
+back with `replay_dir`, and `ReplayServer` serves them over HTTP in the same
+shape as the ifeng endpoint, so that `Stock` can point at it with `url`:
+
+    python -m insider.replay record replay sz002156 sh603019 --ktype D W
+    python -m insider.replay serve replay --port 8000
+
+    Stock("sz002156", url="http://127.0.0.1:8000/{ktype}/?code={code}&type=last")
+"""
+
+import argparse
+import json
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+import requests
+
+from insider.constants import KTYPE_CONVERSION, STOCK_URL
+
+# payload of the endpoint for a code it has no data about
+EMPTY_PAYLOAD = json.dumps({"record": {}}).encode()
+
+
+def payload_path(replay_dir: str, code: str, ktype: str) -> str:
+    return os.path.join(replay_dir, f"{code}_{ktype.upper()}.json")
+
+
+def load_payload(replay_dir: str, code: str, ktype: str) -> dict:
+    """Read a recorded payload. 读取录制的数据。"""
+    path = payload_path(replay_dir, code, ktype)
+    try:
+        with open(path, "rb") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        raise ValueError(f"No recorded data of {code} ({ktype}) in {replay_dir}.")
+
+
+def save_payload(replay_dir: str, code: str, ktype: str, payload: bytes):
+    os.makedirs(replay_dir, exist_ok=True)
+    path = payload_path(replay_dir, code, ktype)
+    # write to a temporary file first so that readers never see partial data
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+
+def record(
+    codes: Iterable[str],
+    replay_dir: str,
+    ktypes: Iterable[str] = ("D",),
+    url: str = STOCK_URL,
+    session: Optional[requests.Session] = None,
+) -> List[str]:
+    """Download the payloads of the codes into the replay directory. 录制股票数据。
+
+    Parameters:
+        codes: Full stock codes, (e.g. ['sz002156', 'sh603019'])，股票完整代码列表
+        replay_dir: Directory to save the payloads. 录制目录
+        ktypes: freqs to record, valid values are `D`, `W`, and `M`，股票趋势频率
+        url: URL template of the endpoint, default is the ifeng endpoint. 数据接口
+        session: requests session to reuse connections, default is None. HTTP会话
+
+    Returns:
+        Paths of the saved payloads. 录制文件路径
+    """
+    session = session or requests.Session()
+    paths = []
+    for code in codes:
+        for ktype in ktypes:
+            ktype = ktype.upper()
+            if ktype not in KTYPE_CONVERSION:
+                raise ValueError(
+                    f"Invalid ktype is given, valid inputs are {list(KTYPE_CONVERSION)}"
+                )
+            r = session.get(
+                url.format(ktype=KTYPE_CONVERSION[ktype], code=code), timeout=10
+            )
+            r.raise_for_status()
+            save_payload(replay_dir, code, ktype, r.content)
+            paths.append(payload_path(replay_dir, code, ktype))
+    return paths
+
+
+class ReplayServer:
+    """Local HTTP stand-in of the ifeng endpoint. 本地模拟的ifeng数据接口。
+
+    Payloads added with `add` are served from memory, others are read from
+    `replay_dir`. Codes without a payload get an empty `record`, like unknown
+    codes upstream. Connections are kept alive, so a pooled session measures
+    the fetch path rather than TCP handshakes.
+    """
+
+    def __init__(
+        self,
+        replay_dir: Optional[str] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: Optional[Callable[[], float]] = None,
+    ):
+        """
+        Parameters:
+            replay_dir: Directory of recorded payloads, default is None. 录制目录
+            host: Address to bind, default is 127.0.0.1. 监听地址
+            port: Port to bind, default is 0 which picks a free port. 监听端口
+            latency: Function returning the seconds to delay each response, e.g. to
+                simulate slow upstream responses, default is None. 模拟的响应延迟
+        """
+        self.replay_dir = replay_dir
+        self.latency = latency
+        self.payloads: Dict[Tuple[str, str], bytes] = {}
+        self.requested: List[Tuple[str, str]] = []
+        self._thread = None
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+
+    def _make_handler(self):
+        server = self
+        ktypes = {v: k for k, v in KTYPE_CONVERSION.items()}
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                ktype = ktypes.get(parsed.path.strip("/"))
+                code = parse_qs(parsed.query).get("code", [None])[0]
+                if ktype is None or code is None:
+                    self.send_error(404)
+                    return
+
+                server.requested.append((code, ktype))
+                body = server._payload(code, ktype)
+                if server.latency is not None:
+                    time.sleep(server.latency())
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def _payload(self, code: str, ktype: str) -> bytes:
+        payload = self.payloads.get((code, ktype))
+        if payload is not None:
+            return payload
+        if self.replay_dir:
+            try:
+                with open(payload_path(self.replay_dir, code, ktype), "rb") as f:
+                    return f.read()
+            except FileNotFoundError:
+                pass
+        return EMPTY_PAYLOAD
+
+    @property
+    def url(self) -> str:
+        """URL template to pass to `Stock`. 传给`Stock`的URL模板"""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/{{ktype}}/?code={{code}}&type=last"
+
+    def add(self, code: str, ktype: str, record: list):
+        """Serve `record` for the code and ktype from memory. 添加回放数据。"""
+        self.payloads[(code, ktype.upper())] = json.dumps({"record": record}).encode()
+
+    def serve_forever(self):
+        """Serve in the current thread until `close` is called from another one."""
+        self._server.serve_forever()
+
+    def start(self) -> "ReplayServer":
+        """Serve in a background thread. 在后台线程中启动服务。"""
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join()
+            self._thread = None
+        self._server.server_close()
+
+    def __enter__(self) -> "ReplayServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = subparsers.add_parser("record", help="record live payloads")
+    record_parser.add_argument("replay_dir")
+    record_parser.add_argument("codes", nargs="+")
+    record_parser.add_argument("--ktype", nargs="+", default=["D"])
+
+    serve_parser = subparsers.add_parser("serve", help="serve recorded payloads")
+    serve_parser.add_argument("replay_dir")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        for path in record(args.codes, args.replay_dir, ktypes=args.ktype):
+            print(path)
+    else:
+        server = ReplayServer(args.replay_dir, host=args.host, port=args.port)
+        print(f"Serving {args.replay_dir} at {server.url}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Weekly and monthly bars built from daily bars (由日线合成周线和月线).
+
+A week runs from Monday to Friday and a month is a calendar month. Only the days
+with a daily bar count, so holidays like the Spring Festival and the National Day
+weeks are skipped, and each bar is dated by the last trading day of its period as
+the exchanges do. A bar opens at the first open, closes at the last close, takes
+the highest high and the lowest low, and sums the volume.
+
+The changes and the moving averages of the fetched data are computed again on
+the new bars; other columns are dropped.
+"""
+
+import re
+
+import pandas as pd
+
+from insider.constants import BAR_AGGREGATIONS, RESAMPLE_PERIODS
+
+
+def resample_bars(df: pd.DataFrame, ktype: str) -> pd.DataFrame:
+    """Build the bars of `ktype` from daily bars. 由日线数据合成周线或月线。
+
+    Parameters:
+        df: daily bars with at least `day`, `open`, `high`, `low`, `close` and
+            `volumn`. 日线数据
+        ktype: `W` for weekly bars or `M` for monthly bars. K线类型
+    """
+    ktype = ktype.upper()
+    if ktype not in RESAMPLE_PERIODS:
+        raise ValueError(
+            f"Invalid ktype is given, valid inputs are {list(RESAMPLE_PERIODS)}"
+        )
+    if not df["day"].is_monotonic_increasing:
+        df = df.sort_values("day", kind="stable", ignore_index=True)
+
+    period = pd.to_datetime(df["day"]).dt.to_period(RESAMPLE_PERIODS[ktype])
+    aggregations = {col: how for col, how in BAR_AGGREGATIONS.items() if col in df}
+    bars = df.groupby(period, sort=False).agg(aggregations).reset_index(drop=True)
+
+    prev_close = bars["close"].shift(1)
+    if "price_change" in df and len(bars):
+        # the close before the first day, which the first bar changes from
+        prev_close.iloc[0] = df["close"].iloc[0] - df["price_change"].iloc[0]
+        bars["price_change"] = bars["close"] - prev_close
+    if "percent_change" in df:
+        bars["percent_change"] = (bars["close"] - prev_close) / prev_close * 100
+    for col in df.columns:
+        # ma5 of the close, v_ma5 of the volume
+        match = re.fullmatch(r"(v_)?ma(\d+)", col)
+        if match:
+            values = bars["volumn" if match.group(1) else "close"]
+            bars[col] = values.rolling(int(match.group(2)), min_periods=1).mean()
+    return bars[[col for col in df.columns if col in bars]]
@@ -0,0 +1,273 @@
+"""Screen a universe of stocks by conditions on their latest bars.
+
+A condition looks at the last two bars of an indicator, e.g. `CrossAbove("kdj",
+"J", "D")` is met when J crosses above D on the latest bar. `Screener` fetches
+and evaluates the codes in a process pool sized to the cores, so a full-market
+screen uses every core instead of one.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import os
+from typing import Dict, Iterable, List, Optional, Union
+
+import pandas as pd
+
+from insider.cache import BarCache
+from insider.constants import SCREENER_CHUNKSIZE
+from insider.fetch import Fetcher
+from insider.stock_insider import StockInsider
+
+Number = Union[int, float]
+
+
+class Condition:
+    """Base class of the screening conditions.
+
+    `evaluate` returns the values which triggered the condition on the latest
+    bar, or None if it is not met. Conditions are pickled to the workers, so
+    they should only hold plain attributes.
+    """
+
+    indicator: str
+    params: dict
+    name: str
+
+    def _last_bars(self, insider: StockInsider) -> pd.DataFrame:
+        # only the warm-up of the indicator is computed, see `_indicator_tail`
+        return insider._indicator_tail(self.indicator, 2, **self.params).tail(2)
+
+    def evaluate(self, insider: StockInsider) -> Optional[Dict[str, float]]:
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.name!r})"
+
+
+class CrossAbove(Condition):
+    """`col` of an indicator crosses above another column or a number.
+    指标的某一列上穿另一列或某个数值。
+
+    Met when `col` is above `other` on the latest bar but was not on the bar
+    before it.
+    """
+
+    def __init__(
+        self,
+        indicator: str,
+        col: str,
+        other: Union[str, Number],
+        name: Optional[str] = None,
+        **params,
+    ):
+        """
+        Parameters:
+            indicator: name of the indicator method, e.g. `kdj`. 指标名称
+            col: column of the indicator which crosses, e.g. `J`. 上穿的列
+            other: column or number which is crossed, e.g. `D` or 0. 被上穿的列或数值
+            name: name of the condition in the results, default is None which uses
+                e.g. `kdj.J>D`. 条件名称
+            params: parameters of the indicator, e.g. n=9. 指标参数
+        """
+        self.indicator = indicator
+        self.col = col
+        self.other = other
+        self.params = params
+        self.name = name or f"{indicator}.{col}>{other}"
+
+    def evaluate(self, insider: StockInsider) -> Optional[Dict[str, float]]:
+        df = self._last_bars(insider)
+        if len(df) < 2:
+            return None
+        value = df[self.col].to_numpy()
+        if isinstance(self.other, str):
+            other = df[self.other].to_numpy()
+        else:
+            other = [self.other] * 2
+        if value[0] <= other[0] and value[1] > other[1]:
+            values = {self.col: float(value[1])}
+            if isinstance(self.other, str):
+                values[self.other] = float(other[1])
+            return values
+        return None
+
+
+class Flip(Condition):
+    """A boolean column of an indicator changes on the latest bar, e.g. the SAR
+    trend. 指标的某一布尔列在最新K线上翻转。
+    """
+
+    def __init__(
+        self,
+        indicator: str,
+        col: str,
+        to: Optional[bool] = None,
+        name: Optional[str] = None,
+        **params,
+    ):
+        """
+        Parameters:
+            indicator: name of the indicator method, e.g. `sar`. 指标名称
+            col: boolean column, e.g. `trend`. 布尔列
+            to: only flips to this value, default is None which accepts both. 翻转方向
+            name: name of the condition in the results, default is None which uses
+                e.g. `sar.trend flip`. 条件名称
+            params: parameters of the indicator. 指标参数
+        """
+        self.indicator = indicator
+        self.col = col
+        self.to = to
+        self.params = params
+        self.name = name or f"{indicator}.{col} flip"
+
+    def evaluate(self, insider: StockInsider) -> Optional[Dict[str, float]]:
+        df = self._last_bars(insider)
+        if len(df) < 2:
+            return None
+        before, after = df[self.col].astype(bool).to_numpy()
+        if before != after and (self.to is None or after == self.to):
+            return {self.col: bool(after)}
+        return None
+
+
+KDJ_CROSS = CrossAbove("kdj", "J", "D", name="kdj_cross")
+MACD_TURNS_POSITIVE = CrossAbove("macd", "macd", 0, name="macd_positive")
+BOLL_BREAKOUT = CrossAbove("boll", "close", "up", name="boll_breakout")
+SAR_FLIP = Flip("sar", "trend", name="sar_flip")
+
+
+def _evaluate(
+    insider: StockInsider, conditions: List[Condition], require: str
+) -> Optional[dict]:
+    hits = {}
+    for condition in conditions:
+        values = condition.evaluate(insider)
+        if values is not None:
+            hits[condition.name] = values
+        elif require == "all":
+            return None
+    if not hits:
+        return None
+    return {"day": insider._df["day"].iloc[-1], **hits}
+
+
+# per-process fetcher, so that each worker reuses its connections
+_fetcher = None
+
+
+def _init_worker():
+    global _fetcher
+    _fetcher = Fetcher()
+
+
+def _screen_code(code, ktype, stock_kwargs, conditions, require):
+    try:
+        insider = StockInsider(code, ktype, fetcher=_fetcher, **stock_kwargs)
+        return code, _evaluate(insider, conditions, require), None
+    except Exception as e:
+        return code, None, e
+
+
+def _screen_frame(code, df, conditions, require):
+    try:
+        return code, _evaluate(StockInsider(code, df=df), conditions, require), None
+    except Exception as e:
+        return code, None, e
+
+
+class Screener:
+    """Screen stocks by indicator conditions in a process pool. 多进程按指标条件选股。
+
+    Each worker fetches its codes, computes the indicators on the latest bars
+    and sends back only the triggering values. A failed code is recorded in
+    `failures` instead of stopping the others.
+    """
+
+    def __init__(
+        self,
+        conditions: Iterable[Condition],
+        require: str = "all",
+        ktype: str = "D",
+        processes: Optional[int] = None,
+        chunksize: int = SCREENER_CHUNKSIZE,
+        cache: Optional[BarCache] = None,
+        url: Optional[str] = None,
+        replay_dir: Optional[str] = None,
+    ):
+        """
+        Parameters:
+            conditions: conditions to check, e.g. [KDJ_CROSS, MACD_TURNS_POSITIVE].
+                选股条件
+            require: `all` to match stocks meeting every condition, `any` for at
+                least one, default is `all`. 需满足全部还是任一条件
+            ktype: freq, valid values are `D`, `W`, and `M`，股票趋势频率
+            processes: number of worker processes, default is None which uses the
+                number of cores. 进程数
+            chunksize: number of codes sent to a worker at a time, default is 16.
+                每次分配给进程的股票数
+            cache: local bar cache shared by the workers, default is None. 本地K线数据缓存
+            url: URL template passed to `Stock`, default is None. 数据接口URL模板
+            replay_dir: replay directory passed to `Stock`, default is None. 离线回放目录
+        """
+        self.conditions = list(conditions)
+        if not self.conditions:
+            raise ValueError("At least one condition is required.")
+        if require not in ("all", "any"):
+            raise ValueError("Only all and any are allowed for require.")
+        if processes is not None and processes < 1:
+            raise ValueError("processes must be at least 1.")
+
+        self.require = require
+        self.ktype = ktype
+        self.processes = processes or os.cpu_count() or 1
+        self.chunksize = chunksize
+        self.stock_kwargs = {"cache": cache, "url": url, "replay_dir": replay_dir}
+
+        self.failures: Dict[str, Exception] = {}
+
+    def _collect(self, results) -> Dict[str, dict]:
+        matches, failures = {}, {}
+        for code, hits, error in results:
+            if error is not None:
+                failures[code] = error
+            elif hits is not None:
+                matches[code] = hits
+        self.failures = failures
+        return matches
+
+    def run(self, codes: Iterable[str]) -> Dict[str, dict]:
+        """Fetch and screen the codes. 获取数据并选股。
+
+        Returns:
+            dict of matching code to the day of its latest bar and the triggering
+            values of each met condition, in the order the codes were given.
+            符合条件的股票代码及触发条件时的指标值。
+        """
+        codes = list(dict.fromkeys(codes))
+        n = len(codes)
+        with ProcessPoolExecutor(self.processes, initializer=_init_worker) as pool:
+            results = pool.map(
+                _screen_code,
+                codes,
+                [self.ktype] * n,
+                [self.stock_kwargs] * n,
+                [self.conditions] * n,
+                [self.require] * n,
+                chunksize=self.chunksize,
+            )
+            return self._collect(results)
+
+    def run_frames(self, frames: Dict[str, pd.DataFrame]) -> Dict[str, dict]:
+        """Screen data which is already loaded, e.g. by `StockUniverse.load`.
+        对已获取的数据选股。
+        """
+        n = len(frames)
+        with ProcessPoolExecutor(self.processes) as pool:
+            results = pool.map(
+                _screen_frame,
+                list(frames),
+                list(frames.values()),
+                [self.conditions] * n,
+                [self.require] * n,
+                chunksize=self.chunksize,
+            )
+            return self._collect(results)
@@ -1,21 +1,43 @@
-from typing import Optional
+from typing import List, Optional
+import io
+import os
 import re
+import threading
 
 import requests
-from requests.exceptions import Timeout
 import pandas as pd
-import plotly.graph_objects as go
 
+from insider.cache import BarCache
+from insider.fetch import Fetcher
 from insider.constants import (
     STOCK_URL,
+    STOCK_URL_ENV,
+    REPLAY_DIR_ENV,
     KTYPE_CONVERSION,
     KTYPES,
     DAY_COL,
     NUMERIC_COLUMNS,
     MA_COLORS,
     MA_COLS,
+    PLOT_MAX_POINTS,
 )
-from insider.utils import set_layout
+from insider.downsample import ohlc_buckets
+from insider.replay import load_payload
+from insider.resample import resample_bars
+from insider.utils import format_day, freeze, go, line_trace, set_layout
+
+# fetcher of the stocks created without a fetcher or a session, built on first
+# use, so that they share its connections and its circuit breaker
+_default_fetcher = None
+_default_fetcher_lock = threading.Lock()
+
+
+def _get_default_fetcher() -> Fetcher:
+    global _default_fetcher
+    with _default_fetcher_lock:
+        if _default_fetcher is None:
+            _default_fetcher = Fetcher()
+        return _default_fetcher
 
 
 class Stock:
@@ -24,17 +46,63 @@ class Stock:
     stock price and k-lines
     """
 
-    def __init__(self, code: str, ktype: str = "D"):
+    # Traces with more points are downsampled and drawn with WebGL, None keeps
+    # every point. 超过该点数的曲线将被降采样并使用WebGL绘制
+    max_points: Optional[int] = PLOT_MAX_POINTS
+    # Keep the data in immutable arrays, which the accessors and the indicators
+    # share instead of copying. 只读模式，数据与指标结果共享内存而不复制
+    read_only: bool = False
+
+    def __init__(
+        self,
+        code: str,
+        ktype: str = "D",
+        session: Optional[requests.Session] = None,
+        cache: Optional[BarCache] = None,
+        url: Optional[str] = None,
+        replay_dir: Optional[str] = None,
+        fetcher: Optional[Fetcher] = None,
+        read_only: bool = False,
+        resample: bool = False,
+    ):
         """
         code: Full stock code，(e.g. 'sz002156')，股票完整代码
         ktype: freq, valid values are `D`, `W`, and `M`，股票趋势频率
+        session: requests session to reuse connections across stocks, default is
+            None which sends a standalone request. 可复用的HTTP会话
+        cache: local bar cache to load from and update, default is None which always
+            downloads the full history. 本地K线数据缓存
+        url: URL template with `{ktype}` and `{code}` fields, default is None which
+            uses `$INSIDER_STOCK_URL` or the ifeng endpoint. 数据接口URL模板
+        replay_dir: directory of payloads saved by `insider.replay.record` to read
+            instead of fetching, default is None which uses `$INSIDER_REPLAY_DIR`
+            if set. 离线回放目录
+        fetcher: fetch policy with retries, hedging and a circuit breaker, default is
+            None which uses the default policy with `session`, or without a
+            `session` the one shared by all such stocks. 数据获取策略
+        read_only: keep the data in read-only arrays and return views of it instead
+            of copies, default is False. 只读模式，默认关闭
+        resample: build `W` and `M` bars from the daily bars, which are fetched or
+            loaded from `cache` instead, so that one fetch per stock serves every
+            ktype, default is False. 由日线数据在本地合成周线和月线，默认关闭
         """
         self.code = self._check_code(code)
         self.stock_code = re.findall(r"\d+", self.code)[0]
         self.ktype, self.converted_ktype = self._check_ktype(ktype)
-        self.url = STOCK_URL.format(ktype=self.converted_ktype, code=self.code)
+        # the ktype of the bars fetched, cached and replayed
+        self.source_ktype = "D" if resample else self.ktype
+        url = url or os.environ.get(STOCK_URL_ENV) or STOCK_URL
+        self.url = url.format(ktype=KTYPE_CONVERSION[self.source_ktype], code=self.code)
+        self.replay_dir = replay_dir or os.environ.get(REPLAY_DIR_ENV)
+        self.session = session
+        self.fetcher = fetcher
+        self.cache = cache
+        self.read_only = read_only
 
-        self._df = self._get_stock_data()
+        df = self._load_data()
+        if self.source_ktype != self.ktype:
+            df = resample_bars(df, self.ktype)
+        self._df = freeze(df) if read_only else df
 
     def _check_code(self, code: str) -> str:
         if not code.startswith("sz") and not code.startswith("sh"):
@@ -54,37 +122,72 @@ class Stock:
 
     @property
     def full_data(self):
-        df = self._df.copy()
+        df = self._df.copy(deep=not self.read_only)
         return df
 
+    def _load_data(self):
+        if self.cache is None:
+            return self._get_stock_data()
+        if self.cache.is_fresh(self.code, self.source_ktype):
+            return self.cache.load(self.code, self.source_ktype)
+        return self.cache.update(self.code, self.source_ktype, self._get_stock_data())
+
+    def _get_payload(self) -> dict:
+        if self.replay_dir:
+            return load_payload(self.replay_dir, self.code, self.source_ktype)
+        if self.fetcher is None:
+            if self.session is None:
+                self.fetcher = _get_default_fetcher()
+            else:
+                self.fetcher = Fetcher(session=self.session)
+        return self.fetcher.get_json(self.url)
+
     def _get_stock_data(self):
-        try:
-            r = requests.get(self.url, timeout=10)
-        except Timeout:
-            raise ValueError("The request timed out. Please try again.")
+        data = self._get_payload()["record"]
+        if data:
+            return self._parse_record(data)
         else:
-            data = r.json()["record"]
-            if data:
-                df = pd.DataFrame(data, columns=DAY_COL + NUMERIC_COLUMNS)
-                df[NUMERIC_COLUMNS] = (
-                    df[NUMERIC_COLUMNS]
-                    .applymap(lambda x: x.replace(",", ""))
-                    .astype("float64")
-                )
-                self._df = df
-                return df
-            else:
-                raise ValueError(
-                    "No data about the stock is found. Please check if the stock code is correct."
-                )
+            raise ValueError(
+                "No data about the stock is found. Please check if the stock code is correct."
+            )
+
+    @staticmethod
+    def _parse_record(record: List[List[str]]) -> pd.DataFrame:
+        """Convert the `record` arrays of the payload into typed columns.
+
+        The rows are handed to the C parser of `read_csv`, which strips the
+        thousands separators and converts the numbers in bulk instead of
+        calling Python per cell.
+        """
+        text = "\n".join(map("\t".join, record))
+        cols = DAY_COL + NUMERIC_COLUMNS
+        return pd.read_csv(
+            io.StringIO(text),
+            sep="\t",
+            header=None,
+            names=cols,
+            usecols=range(len(cols)),
+            thousands=",",
+            dtype=dict.fromkeys(NUMERIC_COLUMNS, "float64"),
+            parse_dates=DAY_COL,
+        )
 
     @staticmethod
     def _choose_date(df: pd.DataFrame, start_date: str, end_date: str) -> pd.DataFrame:
+        """Slice the rows between the dates by binary search on the sorted `day`
+        column, which returns a slice of the data instead of a masked copy.
+        """
+        days = df["day"]
+        if pd.api.types.is_datetime64_any_dtype(days):
+            start_date = pd.Timestamp(start_date) if start_date else None
+            end_date = pd.Timestamp(end_date) if end_date else None
+
+        start, end = 0, len(df)
         if start_date:
-            df = df[df["day"] >= start_date]
+            start = days.searchsorted(start_date, side="left")
         if end_date:
-            df = df[df["day"] <= end_date]
-        return df
+            end = days.searchsorted(end_date, side="right")
+        return df.iloc[start:end]
 
     def show_data(
         self, start_date: Optional[str] = None, end_date: Optional[str] = None
@@ -100,16 +203,25 @@ class Stock:
             the full data.
             根据定义的起止时间而截取的历史数据，默认将会返回所有下载的数据。
         """
-        df = self._df.copy()
-        return self._choose_date(df, start_date, end_date)
+        df = self._choose_date(self._df, start_date, end_date)
+        return df.copy(deep=not self.read_only)
 
     @staticmethod
-    def _plot_stock_data(df: pd.DataFrame, head: int):
+    def _show(fig: "go.Figure", show: bool) -> Optional["go.Figure"]:
+        """Show the chart, or return it if `show` is False."""
+        if show:
+            fig.show()
+            return None
+        return fig
+
+    def _plot_stock_data(self, df: pd.DataFrame, head: int):
         if head:
             df = df.tail(head)
+        if self.max_points:
+            df = ohlc_buckets(df, self.max_points)
 
         stock_data = go.Candlestick(
-            x=df["day"],
+            x=format_day(df["day"]),
             open=df["open"],
             high=df["high"],
             low=df["low"],
@@ -120,14 +232,15 @@ class Stock:
         )
         return stock_data
 
-    @staticmethod
-    def _plot_ma_data(df: pd.DataFrame, head: int):
+    def _plot_ma_data(self, df: pd.DataFrame, head: int):
         if head:
             df = df.tail(head)
 
         ma_data = []
         for col, color in zip(MA_COLS, MA_COLORS):
-            data = go.Scatter(x=df["day"], y=df[col], name=col, marker_color=color)
+            data = line_trace(
+                df["day"], df[col], col, self.max_points, marker_color=color
+            )
             ma_data.append(data)
 
         return ma_data
@@ -138,6 +251,7 @@ class Stock:
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
         verbose: bool = True,
+        show: bool = True,
     ):
         """Plot the stock price over time. 绘出股票走势图。
 
@@ -147,9 +261,10 @@ class Stock:
             start_date: start date, default is None, 起始时间
             end_date: end date, default is None, 终止时间
             verbose: If to plot K-line or not, default is True, 是否同时绘出k线，默认是会绘出。
+            show: If to show the chart, default is True. Set it to False to return the
+            `go.Figure` instead, e.g. to export it. 是否直接显示图表，默认是True，设为False将返回图表对象。
         """
-        df = self._df.copy()
-        df = self._choose_date(df, start_date, end_date)
+        df = self._choose_date(self._df, start_date, end_date)
 
         stock_data = self._plot_stock_data(df, head)
         data = [stock_data]
@@ -162,4 +277,4 @@ class Stock:
             xaxis_rangeslider_visible=False,
             title_text=f"Stock Price Chart ({self.stock_code})",
         )
-        fig.show()
+        return self._show(fig, show)
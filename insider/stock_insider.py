@@ -1,14 +1,18 @@
 from typing import Callable, List, Optional
+import copy
 
-import plotly.graph_objects as go
 import pandas as pd
 import numpy as np
 
+from insider.external import read_external_csv
+from insider.indicators.incremental import IncrementalMixin
+from insider.indicators.lookback import lookback
 from insider.indicators.price import PriceIndicatorMixin
 from insider.indicators.volume import VolumnIndicatorMixin
 from insider.indicators.sar import SARIndicatorMixin
 from insider.stock import Stock
-from insider.utils import set_layout
+from insider.downsample import bucket_extremes, lttb, ohlc_buckets
+from insider.utils import format_day, go, line_trace, set_layout
 from insider.constants import (
     MA_N,
     MD_N,
@@ -16,53 +20,124 @@ from insider.constants import (
     RSI_N,
     MIKE_COLS,
     CDP_COLS,
-    EXTERNAL_COLS,
+    CSV_CHUNKSIZE,
 )
 
 
-class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicatorMixin):
+class StockInsider(
+    Stock,
+    PriceIndicatorMixin,
+    VolumnIndicatorMixin,
+    SARIndicatorMixin,
+    IncrementalMixin,
+):
     """Plot daily trading indicators."""
 
-    def __init__(self, code, ktype="D", df=None):
+    def __init__(
+        self,
+        code,
+        ktype="D",
+        df=None,
+        read_only=False,
+        output_format="frame",
+        backend="pandas",
+        **kwargs,
+    ):
         """
         Parameters:
             code: Full stock code，(e.g. 'sz002156')，股票完整代码
             ktype: Data frequency, valid input is `D`, `W`, or `M`. 股票数据的频率
+            read_only: Keep the data in read-only arrays, so that the data and the
+            indicators share them instead of copying, default is False. 只读模式，默认关闭
+            output_format: Type of the indicator results, `frame` for a DataFrame,
+            `arrays` for a dict of NumPy arrays or `struct` for a structured array,
+            default is `frame`. 指标结果的类型，默认DataFrame
+            backend: Library computing the indicators, `pandas`, `numpy` or `polars`,
+            default is `pandas`. 计算指标的库，默认pandas
+            kwargs: Other options passed to `Stock` when data is fetched, e.g. `session`.
+            其他传给`Stock`的参数
         """
+        self.output_format = output_format
+        self.backend = backend
         if df is not None and isinstance(df, pd.DataFrame):
+            if not df["day"].is_monotonic_increasing:
+                df = df.sort_values("day", kind="stable", ignore_index=True)
+            self.read_only = read_only
             self._df = df
             self.stock_code = code
         else:
-            super().__init__(code, ktype)
+            super().__init__(code, ktype, read_only=read_only, **kwargs)
 
     @classmethod
-    def from_external_csv_data(cls, fpath: str, code=None):
+    def from_external_csv_data(
+        cls,
+        fpath: str,
+        code=None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        sorted_by_day: bool = False,
+        engine: Optional[str] = None,
+        chunksize: int = CSV_CHUNKSIZE,
+        extra_cols: Optional[List[str]] = None,
+    ):
         """Allow the StockInsider class serve for external stock data (other than
         default Chinese stock data) to visualize stock trading indicators.
         如果你有已经下载好的或者是非中国股市股票的数据想要来计算和绘出交易指标，你可以选择
         用这个classmethod来初始化。
 
+        Only the mandatory columns (and `extra_cols`) are read, in chunks of
+        `chunksize` rows, see `insider.external.read_external_csv`.
+        只读取必需的列，并分块解析以限制内存占用。
+
         Parameters:
             fpath: the path to the external stock data in CSV. 外部数据的路径
             code: the stock code you would like to show in each visualization, the default
                 is None which will have `external data` shown as stock name.
                 股票代码，这个没有必要是真实的代码，你选择的结果将会被以股票代码的形式展示。
+            start_date: first day to load, e.g. '2019-01-01', default is None. 起始时间
+            end_date: last day to load, e.g. '2020-01-01', default is None. 终止时间
+            sorted_by_day: if the rows are sorted by day, which lets a date range be
+                loaded without parsing the rest of the file, default is False.
+                数据是否已按日期排序
+            engine: parser engine, `c`, `python` or `pyarrow`, default is None which
+                uses `c`. 解析引擎
+            chunksize: number of rows parsed at a time, default is 500,000. 每次解析的行数
+            extra_cols: other columns to load, default is None. 额外读取的列
         """
-        df = pd.read_csv(fpath)
-        if not set(EXTERNAL_COLS).issubset(df.columns):
-            raise ValueError(
-                f"{EXTERNAL_COLS} are mandatory in external data so as to plot"
-                f" all trading indicators."
-            )
+        df = read_external_csv(
+            fpath,
+            start_date=start_date,
+            end_date=end_date,
+            sorted_by_day=sorted_by_day,
+            engine=engine,
+            chunksize=chunksize,
+            extra_cols=extra_cols,
+        )
         if code is None:
             code = "external data"
         return cls(code=code, df=df)
 
-    @staticmethod
-    def _plot_line(df: pd.DataFrame, head: int, line_name: str, y: str = "close"):
+    def _indicator_tail(self, name: str, head: Optional[int], **params) -> pd.DataFrame:
+        """Compute an indicator for plotting the last `head` bars.
+
+        Only the last `head` bars plus the warm-up of the indicator are used, see
+        `insider.indicators.lookback` for the tolerance of the recursive ones. The
+        result is a DataFrame whatever the `output_format`.
+        """
+        insider = self
+        if self.output_format != "frame":
+            insider = copy.copy(self)
+            insider.output_format = "frame"
+        warmup = lookback(name, **params)
+        if head and warmup is not None and head + warmup < len(self._df):
+            insider = copy.copy(insider)
+            insider._df = self._df.iloc[-(head + warmup) :]
+        return getattr(insider, name)(**params)
+
+    def _plot_line(self, df: pd.DataFrame, head: int, line_name: str, y: str = "close"):
         if head:
             df = df.tail(head)
-        plot_data = go.Scatter(x=df["day"], y=df[y], name=line_name)
+        plot_data = line_trace(df["day"], df[y], line_name, self.max_points)
         return plot_data
 
     def _plot_moving_lines(
@@ -74,17 +149,17 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
         head: int = 90,
         ns: Optional[List] = None,
         verbose: bool = False,
+        show: bool = True,
     ):
 
         plot_data = []
         for n in ns:
-            df = func(n=n)
+            df = self._indicator_tail(func.__name__, head, n=n)
             line_name = name + str(n)
             plot_data.append(self._plot_line(df, head, line_name, y=y))
 
         if verbose:
-            df = self._df.copy()
-            verbose_data = verbose_func(df, head)
+            verbose_data = verbose_func(self._df, head)
             plot_data.append(verbose_data)
 
         layout = set_layout()
@@ -92,9 +167,9 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
         if verbose:
             fig.update_layout(xaxis_rangeslider_visible=False)
         fig.update_layout(title_text=f"{name.upper()} Chart ({self.stock_code})")
-        fig.show()
+        return self._show(fig, show)
 
-    def _plot(self, df, head, title, lines, verbose: bool = False):
+    def _plot(self, df, head, title, lines, verbose: bool = False, show: bool = True):
         """General plot functions shared across the class."""
         fig = go.Figure(layout=set_layout())
 
@@ -113,10 +188,14 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
             title_text=f"{title} Chart ({self.stock_code})",
             xaxis_rangeslider_visible=False,
         )
-        fig.show()
+        return self._show(fig, show)
 
     def plot_ma(
-        self, head: int = 90, ns: Optional[List[int]] = None, verbose: bool = False
+        self,
+        head: int = 90,
+        ns: Optional[List[int]] = None,
+        verbose: bool = False,
+        show: bool = True,
     ):
         """Plot Moving Average Indicator. 绘出MA曲线
 
@@ -127,23 +206,30 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
             选择曲线的种类，e.g. [5, 10], 默认会绘出5, 10, 20, 60日曲线
             verbose: If to include stock price or not, default is False.
             选择是否将股票价格曲线一起绘出，默认是False，将会只绘出指标曲线。
+            show: If to show the chart, default is True. Set it to False to return the
+            `go.Figure` instead, e.g. to export it. 是否直接显示图表，默认是True，设为False将返回图表对象。
         """
         if ns is None:
             ns = MA_N
 
         func = self.ma
         verbose_func = self._plot_stock_data
-        self._plot_moving_lines(
+        return self._plot_moving_lines(
             func=func,
             verbose_func=verbose_func,
             name="ma",
             head=head,
             ns=ns,
             verbose=verbose,
+            show=show,
         )
 
     def plot_md(
-        self, head: int = 90, ns: Optional[List[int]] = None, verbose: bool = False
+        self,
+        head: int = 90,
+        ns: Optional[List[int]] = None,
+        verbose: bool = False,
+        show: bool = True,
     ):
         """Plot Moving Deviation Indicator. 绘出MD曲线
 
@@ -154,23 +240,30 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
             选择曲线的种类，e.g. [5, 10], 默认会绘出5, 10, 20日曲线
             verbose: If to include stock price or not, default is False.
             选择是否将股票价格曲线一起绘出，默认是False，将会只绘出指标曲线。
+            show: If to show the chart, default is True. Set it to False to return the
+            `go.Figure` instead, e.g. to export it. 是否直接显示图表，默认是True，设为False将返回图表对象。
         """
         if ns is None:
             ns = MD_N
 
         func = self.md
         verbose_func = self._plot_stock_data
-        self._plot_moving_lines(
+        return self._plot_moving_lines(
             func=func,
             verbose_func=verbose_func,
             name="md",
             head=head,
             ns=ns,
             verbose=verbose,
+            show=show,
         )
 
     def plot_ema(
-        self, head: int = 90, ns: Optional[List[int]] = None, verbose: bool = False
+        self,
+        head: int = 90,
+        ns: Optional[List[int]] = None,
+        verbose: bool = False,
+        show: bool = True,
     ):
         """Plot Exponential Moving Average Indicator. 绘出EMA曲线
 
@@ -181,66 +274,84 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
             选择曲线的种类，e.g. [5, 10, 20, 60], 默认会绘出5, 10, 20, 60日曲线
             verbose: If to include stock price or not, default is False.
             选择是否将股票价格曲线一起绘出，默认是False，将会只绘出指标曲线。
+            show: If to show the chart, default is True. Set it to False to return the
+            `go.Figure` instead, e.g. to export it. 是否直接显示图表，默认是True，设为False将返回图表对象。
         """
         if ns is None:
             ns = EXPMA_N
 
         func = self.ema
         verbose_func = self._plot_stock_data
-        self._plot_moving_lines(
+        return self._plot_moving_lines(
             func=func,
             verbose_func=verbose_func,
             name="ema",
             head=head,
             ns=ns,
             verbose=verbose,
+            show=show,
         )
 
-    def plot_macd(self, head: int = 90):
+    def plot_macd(self, head: int = 90, show: bool = True):
         """Plot MACD (Moving Average Convergence and Divergence) Indicator. 绘出MACD曲线
 
         Parameters:
             head: The recent number of trading days to plot, default is 90, 最近交易日的天数，
             默认90，将会绘出最近90个交易日的曲线。
+            show: If to show the chart, default is True. Set it to False to return the
+            `go.Figure` instead, e.g. to export it. 是否直接显示图表，默认是True，设为False将返回图表对象。
 
         A mixed chart will be plotted, including a bar chart to visualize MACD, and line charts
         to visualize DIFF and DEA.
         将会绘出差值柱形图来表示MACD, 以及表示差离值和讯号线的线性图。
         """
-        df_macd = self.macd()
+        df_macd = self._indicator_tail("macd", head)
         if head:
             df_macd = df_macd.tail(head)
 
         df_macd.loc[:, "color"] = df_macd["macd"].apply(
             lambda x: "red" if x >= 0 else "green"
         )
+        df_bar = df_macd
+        if self.max_points:
+            df_bar = df_macd.iloc[bucket_extremes(df_macd["macd"], self.max_points)]
 
         layout = set_layout()
         fig = go.Figure(layout=layout)
 
         fig.add_trace(
             go.Bar(
-                x=df_macd["day"],
-                y=df_macd["macd"],
+                x=format_day(df_bar["day"]),
+                y=df_bar["macd"],
                 base=0,
-                marker_color=df_macd["color"],
+                marker_color=df_bar["color"],
                 name="MACD",
             )
         )
         fig.add_trace(
-            go.Scatter(
-                x=df_macd["day"], y=df_macd["dea"], marker_color="orange", name="DEA"
+            line_trace(
+                df_macd["day"],
+                df_macd["dea"],
+                "DEA",
+                self.max_points,
+                marker_color="orange",
             )
         )
         fig.add_trace(
-            go.Scatter(
-                x=df_macd["day"], y=df_macd["diff"], marker_color="black", name="DIFF"
+            line_trace(
+                df_macd["day"],
+                df_macd["diff"],
+                "DIFF",
+                self.max_points,
+                marker_color="black",
             )
         )
         fig.update_layout(title_text=f"MACD Chart ({self.stock_code})")
-        fig.show()
+        return self._show(fig, show)
 
-    def plot_kdj(self, head: int = 90, n: int = 9, smooth_type="sma"):
+    def plot_kdj(
+        self, head: int = 90, n: int = 9, smooth_type="sma", show: bool = True
+    ):
         """Plot KDJ Indicator. 绘出KDJ曲线。
 
         Parameters:
@@ -250,8 +361,10 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
             是9个交易日。
             smooth_type: The metric to calculate moving average, default is `sma`, the other
             option is `ema`. 选择计算平移平均曲线的方式，默认是SMA, 另一个选择是EMA。
+            show: If to show the chart, default is True. Set it to False to return the
+            `go.Figure` instead, e.g. to export it. 是否直接显示图表，默认是True，设为False将返回图表对象。
         """
-        df_kdj = self.kdj(n=n, smooth_type=smooth_type)
+        df_kdj = self._indicator_tail("kdj", head, n=n, smooth_type=smooth_type)
         if head:
             df_kdj = df_kdj.tail(head)
 
@@ -262,9 +375,9 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
         layout = set_layout()
         fig = go.Figure(data=plot_data, layout=layout)
         fig.update_layout(title_text=f"KDJ Chart ({self.stock_code})")
-        fig.show()
+        return self._show(fig, show)
 
-    def plot_rsi(self, head: int = 90, ns: Optional[List] = None):
+    def plot_rsi(self, head: int = 90, ns: Optional[List] = None, show: bool = True):
         """Plot RSI (Relative Strength Index) Indicator. 绘出RSI曲线。
 
         Parameters:
@@ -272,13 +385,15 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
             默认90，将会绘出最近90个交易日的曲线。
             ns: Select which trading lines to plot, default is to plot 6, 12, 24-day lines
             选择曲线的种类，e.g. [6, 12], 默认会绘出6, 12, 24日曲线
+            show: If to show the chart, default is True. Set it to False to return the
+            `go.Figure` instead, e.g. to export it. 是否直接显示图表，默认是True，设为False将返回图表对象。
         """
         if ns is None:
             ns = RSI_N
 
         func = self.rsi
         verbose_func = self._plot_stock_data
-        self._plot_moving_lines(
+        return self._plot_moving_lines(
             func=func,
             verbose_func=verbose_func,
             y="rsi",
@@ -286,9 +401,10 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
             head=head,
             ns=ns,
             verbose=False,
+            show=show,
         )
 
-    def plot_vrsi(self, head: int = 90, ns: Optional[List] = None):
+    def plot_vrsi(self, head: int = 90, ns: Optional[List] = None, show: bool = True):
         """Plot VRSI (Volumn Relative Strength Index) Indicator. 绘出VRSI曲线。
 
         Parameters:
@@ -296,13 +412,15 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
             默认90，将会绘出最近90个交易日的曲线。
             ns: Select which trading lines to plot, default is to plot 6, 12, 24-day lines
             选择曲线的种类，e.g. [6, 12], 默认会绘出6, 12, 24日曲线
+            show: If to show the chart, default is True. Set it to False to return the
+            `go.Figure` instead, e.g. to export it. 是否直接显示图表，默认是True，设为False将返回图表对象。
         """
         if ns is None:
             ns = RSI_N
 
         func = self.vrsi
         verbose_func = self._plot_stock_data
-        self._plot_moving_lines(
+        return self._plot_moving_lines(
             func=func,
             verbose_func=verbose_func,
             y="rsi",
@@ -310,20 +428,22 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
             head=head,
             ns=ns,
             verbose=False,
+            show=show,
         )
 
-    @staticmethod
-    def _plot_volumn_data(df, head):
-        df_volumn = df.copy()
+    def _plot_volumn_data(self, df, head):
+        df_volumn = df
         if head:
             df_volumn = df_volumn.tail(head)
+        if self.max_points:
+            df_volumn = ohlc_buckets(df_volumn, self.max_points)
 
         df_volumn = df_volumn.assign(
             color=lambda x: np.where(x["open"] < x["close"], "red", "green")
         )
 
         data = go.Bar(
-            x=df_volumn["day"],
+            x=format_day(df_volumn["day"]),
             y=df_volumn["volumn"],
             base=0,
             marker_color=df_volumn["color"],
@@ -331,23 +451,28 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
         )
         return data
 
-    def plot_volumn(self, head: int = 90):
+    def plot_volumn(self, head: int = 90, show: bool = True):
         """Plot Volumn over time. 绘出交易量能柱状图。
 
         Parameters:
             head: The recent number of trading days to plot, default is 90, 最近交易日的天数，
             默认90，将会绘出最近90个交易日的交易量能柱状图。
+            show: If to show the chart, default is True. Set it to False to return the
+            `go.Figure` instead, e.g. to export it. 是否直接显示图表，默认是True，设为False将返回图表对象。
         """
-        df_volumn = self._df.copy()
-        data = self._plot_volumn_data(df_volumn, head)
+        data = self._plot_volumn_data(self._df, head)
 
         layout = set_layout()
         fig = go.Figure(data=[data], layout=layout)
         fig.update_layout(title_text=f"Volumn Chart ({self.stock_code})")
-        fig.show()
+        return self._show(fig, show)
 
     def plot_vma(
-        self, head: int = 90, ns: Optional[List] = None, verbose: bool = False
+        self,
+        head: int = 90,
+        ns: Optional[List] = None,
+        verbose: bool = False,
+        show: bool = True,
     ):
         """Plot VMA over time. 绘出交易能量MA图曲线
 
@@ -358,13 +483,15 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
             选择曲线的种类，e.g. [5, 10], 默认会绘出5, 10, 20日曲线
             verbose: If to include volumn change bar chart or not, default is False.
             选择是否将能量变化柱状图一起绘出，默认是False，将会只绘出指标曲线。
+            show: If to show the chart, default is True. Set it to False to return the
+            `go.Figure` instead, e.g. to export it. 是否直接显示图表，默认是True，设为False将返回图表对象。
         """
         if ns is None:
             ns = MA_N
 
         func = self.vma
         verbose_func = self._plot_volumn_data
-        self._plot_moving_lines(
+        return self._plot_moving_lines(
             func=func,
             verbose_func=verbose_func,
             y="volumn",
@@ -372,54 +499,68 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
             head=head,
             ns=ns,
             verbose=verbose,
+            show=show,
         )
 
-    def plot_vmacd(self, head: int = 90):
+    def plot_vmacd(self, head: int = 90, show: bool = True):
         """Plot VMACD (Volumn Moving Average Convergence and Divergence)
         Indicator. 绘出VMACD曲线
 
         Parameters:
             head: The recent number of trading days to plot, default is 90, 最近交易日的天数，
             默认90，将会绘出最近90个交易日的曲线。
+            show: If to show the chart, default is True. Set it to False to return the
+            `go.Figure` instead, e.g. to export it. 是否直接显示图表，默认是True，设为False将返回图表对象。
 
         A mixed chart will be plotted, including a bar chart to visualize VMACD, and line charts
         to visualize DIFF and DEA.
         将会绘出量能差值柱形图来表示VMACD, 以及表示差离值和讯号线的线性图。
         """
-        df_vmacd = self.vmacd()
+        df_vmacd = self._indicator_tail("vmacd", head)
         if head:
             df_vmacd = df_vmacd.tail(head)
 
         df_vmacd.loc[:, "color"] = df_vmacd["macd"].apply(
             lambda x: "red" if x >= 0 else "green"
         )
+        df_bar = df_vmacd
+        if self.max_points:
+            df_bar = df_vmacd.iloc[bucket_extremes(df_vmacd["macd"], self.max_points)]
 
         layout = set_layout()
         fig = go.Figure(layout=layout)
 
         fig.add_trace(
             go.Bar(
-                x=df_vmacd["day"],
-                y=df_vmacd["macd"],
+                x=format_day(df_bar["day"]),
+                y=df_bar["macd"],
                 base=0,
-                marker_color=df_vmacd["color"],
+                marker_color=df_bar["color"],
                 name="VMACD",
             )
         )
         fig.add_trace(
-            go.Scatter(
-                x=df_vmacd["day"], y=df_vmacd["dea"], marker_color="orange", name="DEA"
+            line_trace(
+                df_vmacd["day"],
+                df_vmacd["dea"],
+                "DEA",
+                self.max_points,
+                marker_color="orange",
             )
         )
         fig.add_trace(
-            go.Scatter(
-                x=df_vmacd["day"], y=df_vmacd["diff"], marker_color="black", name="DIFF"
+            line_trace(
+                df_vmacd["day"],
+                df_vmacd["diff"],
+                "DIFF",
+                self.max_points,
+                marker_color="black",
             )
         )
         fig.update_layout(title_text=f"VMACD Chart ({self.stock_code})")
-        fig.show()
+        return self._show(fig, show)
 
-    def plot_vstd(self, head: int = 90, ns: Optional[List] = None):
+    def plot_vstd(self, head: int = 90, ns: Optional[List] = None, show: bool = True):
         """Plot VSTD chart. 绘出VSTD曲线
 
         Parameters:
@@ -427,13 +568,15 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
             默认90，将会绘出最近90个交易日的曲线。
             ns: Select which trading lines to plot, default is to plot 5, 10, 20-day lines
             选择曲线的种类，e.g. [5, 10], 默认会绘出5, 10, 20日曲线
+            show: If to show the chart, default is True. Set it to False to return the
+            `go.Figure` instead, e.g. to export it. 是否直接显示图表，默认是True，设为False将返回图表对象。
         """
         if ns is None:
             ns = MD_N
 
         func = self.vstd
         verbose_func = self._plot_volumn_data
-        self._plot_moving_lines(
+        return self._plot_moving_lines(
             func=func,
             verbose_func=verbose_func,
             y="vstd",
@@ -441,9 +584,12 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
             head=head,
             ns=ns,
             verbose=False,
+            show=show,
         )
 
-    def plot_env(self, head: int = 90, n: int = 14, verbose: bool = False):
+    def plot_env(
+        self, head: int = 90, n: int = 14, verbose: bool = False, show: bool = True
+    ):
         """Plot ENV indicator. 绘出ENV曲线。
 
         Parameters:
@@ -453,24 +599,35 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
             是14个交易日。
             verbose: If to include stock price or not, default is False.
             选择是否将股票价格曲线一起绘出，默认是False，将会只绘出指标曲线。
+            show: If to show the chart, default is True. Set it to False to return the
+            `go.Figure` instead, e.g. to export it. 是否直接显示图表，默认是True，设为False将返回图表对象。
         """
 
-        df_env = self.env(n=n)
-        self._plot(
-            df=df_env, head=head, title="ENV", lines=["up", "down"], verbose=verbose
+        df_env = self._indicator_tail("env", head, n=n)
+        return self._plot(
+            df=df_env,
+            head=head,
+            title="ENV",
+            lines=["up", "down"],
+            verbose=verbose,
+            show=show,
         )
 
-    def plot_vosc(self, head: int = 90):
+    def plot_vosc(self, head: int = 90, show: bool = True):
         """Plot Volumn Oscillator Indicator 绘出成交量震荡指标
 
         Parameters:
             head: The recent number of trading days to plot, default is 90, 最近交易日的天数，
             默认90，将会绘出最近90个交易日的曲线。
+            show: If to show the chart, default is True. Set it to False to return the
+            `go.Figure` instead, e.g. to export it. 是否直接显示图表，默认是True，设为False将返回图表对象。
         """
-        df_vosc = self.vosc()
-        self._plot(df=df_vosc, head=head, title="VOSC", lines=["vosc"])
+        df_vosc = self._indicator_tail("vosc", head)
+        return self._plot(
+            df=df_vosc, head=head, title="VOSC", lines=["vosc"], show=show
+        )
 
-    def plot_mi(self, head: int = 90, n: int = 12):
+    def plot_mi(self, head: int = 90, n: int = 12, show: bool = True):
         """Plot Momentum Indicator. 绘出动量指标
 
         Parameters:
@@ -478,9 +635,11 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
             默认90，将会绘出最近90个交易日的曲线。
             n: The size of moving average period for K, default is 12. 平移平均曲线的窗口大小，默认
             是12个交易日。
+            show: If to show the chart, default is True. Set it to False to return the
+            `go.Figure` instead, e.g. to export it. 是否直接显示图表，默认是True，设为False将返回图表对象。
         """
-        df_mi = self.mi(n=n)
-        self._plot(df=df_mi, head=head, title="MI", lines=["mi"])
+        df_mi = self._indicator_tail("mi", head, n=n)
+        return self._plot(df=df_mi, head=head, title="MI", lines=["mi"], show=show)
 
     def plot_mike(
         self,
@@ -488,6 +647,7 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
         n: int = 12,
         ns: Optional[List] = None,
         verbose: bool = False,
+        show: bool = True,
     ):
         """Plot Mike Base Indicator. 绘出Mike指标
 
@@ -508,6 +668,8 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
             选择压力线来绘出，默认会绘出所有六条压力线。
             verbose: If to include stock price or not, default is False.
             选择是否将股票价格曲线一起绘出，默认是False，将会只绘出指标曲线。
+            show: If to show the chart, default is True. Set it to False to return the
+            `go.Figure` instead, e.g. to export it. 是否直接显示图表，默认是True，设为False将返回图表对象。
         """
         if ns is None:
             ns = MIKE_COLS
@@ -520,30 +682,38 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
                     "Invalid input for ns, valid values are wr, sr, ws, ms and ss."
                 )
 
-        df_mike = self.mike(n=n)
-        self._plot(df=df_mike, head=head, title="MIKE", lines=ns, verbose=verbose)
+        df_mike = self._indicator_tail("mike", head, n=n)
+        return self._plot(
+            df=df_mike, head=head, title="MIKE", lines=ns, verbose=verbose, show=show
+        )
 
-    def plot_adtm(self, head: int = 90):
+    def plot_adtm(self, head: int = 90, show: bool = True):
         """Plot ADTM(23,8) indicator. 绘出动态买卖气指标 (ADTM(23, 8))
 
         Parameters:
             head: The recent number of trading days to plot, default is 90, 最近交易日的天数，
             默认90，将会绘出最近90个交易日的曲线。
+            show: If to show the chart, default is True. Set it to False to return the
+            `go.Figure` instead, e.g. to export it. 是否直接显示图表，默认是True，设为False将返回图表对象。
         """
-        df_adtm = self.adtm()
-        self._plot(df=df_adtm, head=head, title="ADTM", lines=["adtm", "adtmma"])
+        df_adtm = self._indicator_tail("adtm", head)
+        return self._plot(
+            df=df_adtm, head=head, title="ADTM", lines=["adtm", "adtmma"], show=show
+        )
 
-    def plot_obv(self, head: int = 90):
+    def plot_obv(self, head: int = 90, show: bool = True):
         """Plot OBV (On Balance Volumn) Indicator。绘出能量指标
 
         Parameters:
             head: The recent number of trading days to plot, default is 90, 最近交易日的天数，
             默认90，将会绘出最近90个交易日的曲线。
+            show: If to show the chart, default is True. Set it to False to return the
+            `go.Figure` instead, e.g. to export it. 是否直接显示图表，默认是True，设为False将返回图表对象。
         """
-        df_obv = self.obv()
-        self._plot(df=df_obv, head=head, title="OBV", lines=["obv"])
+        df_obv = self._indicator_tail("obv", head)
+        return self._plot(df=df_obv, head=head, title="OBV", lines=["obv"], show=show)
 
-    def plot_rc(self, head: int = 90, n: int = 30):
+    def plot_rc(self, head: int = 90, n: int = 30, show: bool = True):
         """Plot RC (Price rate of Change) Indicator 绘出价格变化率指标
 
         Parameters:
@@ -551,11 +721,15 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
             默认90，将会绘出最近90个交易日的曲线。
             n: The size of moving average period for K, default is 30. 平移平均曲线的窗口大小，默认
             是30个交易日。
+            show: If to show the chart, default is True. Set it to False to return the
+            `go.Figure` instead, e.g. to export it. 是否直接显示图表，默认是True，设为False将返回图表对象。
         """
-        df_rc = self.rc(n=n)
-        self._plot(df=df_rc, head=head, title="RC", lines=["arc"])
+        df_rc = self._indicator_tail("rc", head, n=n)
+        return self._plot(df=df_rc, head=head, title="RC", lines=["arc"], show=show)
 
-    def plot_boll(self, head: int = 90, n: int = 26, verbose: bool = False):
+    def plot_boll(
+        self, head: int = 90, n: int = 26, verbose: bool = False, show: bool = True
+    ):
         """Plot BOLL line indicator 绘出布林线。
 
         Parameters:
@@ -565,18 +739,26 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
             是26个交易日。
             verbose: If to include stock price or not, default is False.
             选择是否将股票价格曲线一起绘出，默认是False，将会只绘出指标曲线。
+            show: If to show the chart, default is True. Set it to False to return the
+            `go.Figure` instead, e.g. to export it. 是否直接显示图表，默认是True，设为False将返回图表对象。
         """
-        df_boll = self.boll(n=n)
-        self._plot(
+        df_boll = self._indicator_tail("boll", head, n=n)
+        return self._plot(
             df=df_boll,
             head=head,
             title="BOLL",
             lines=["up", "middle", "down"],
             verbose=verbose,
+            show=show,
         )
 
     def plot_bbiboll(
-        self, head: int = 90, n: int = 11, m: int = 6, verbose: bool = False
+        self,
+        head: int = 90,
+        n: int = 11,
+        m: int = 6,
+        verbose: bool = False,
+        show: bool = True,
     ):
         """Plot BOLL line indicator 绘出布林线。
 
@@ -588,17 +770,20 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
             m: The number to decide the width of up/down lines. 上下压力线的带宽倍数。
             verbose: If to include stock price or not, default is False.
             选择是否将股票价格曲线一起绘出，默认是False，将会只绘出指标曲线。
+            show: If to show the chart, default is True. Set it to False to return the
+            `go.Figure` instead, e.g. to export it. 是否直接显示图表，默认是True，设为False将返回图表对象。
         """
-        df_boll = self.bbiboll(n=n, m=m)
-        self._plot(
+        df_boll = self._indicator_tail("bbiboll", head, n=n, m=m)
+        return self._plot(
             df=df_boll,
             head=head,
             title="BBIBOLL",
             lines=["upr", "bbiboll", "dwn"],
             verbose=verbose,
+            show=show,
         )
 
-    def plot_atr(self, head: int = 90, n: int = 14):
+    def plot_atr(self, head: int = 90, n: int = 14, show: bool = True):
         """Plot Average True Ranger indicator. 绘出真实变化率曲线
 
         Parameters:
@@ -606,9 +791,13 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
             默认90，将会绘出最近90个交易日的曲线。
             n: The size of moving average period for K, default is 14. 平移平均曲线的窗口大小，默认
             是14个交易日。
+            show: If to show the chart, default is True. Set it to False to return the
+            `go.Figure` instead, e.g. to export it. 是否直接显示图表，默认是True，设为False将返回图表对象。
         """
-        df_atr = self.atr(n=n)
-        self._plot(df=df_atr, head=head, title="ATR", lines=["tr", "atr"])
+        df_atr = self._indicator_tail("atr", head, n=n)
+        return self._plot(
+            df=df_atr, head=head, title="ATR", lines=["tr", "atr"], show=show
+        )
 
     def plot_cdp(
         self,
@@ -616,6 +805,7 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
         n: int = 1,
         ns: Optional[List] = None,
         verbose: bool = False,
+        show: bool = True,
     ):
         """Plot Contrarian Operation Indicator. 绘出逆势操作曲线
 
@@ -635,6 +825,8 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
             选择压力线来绘出，默认会绘出所有五条条压力线。
             verbose: If to include stock price or not, default is False.
             选择是否将股票价格曲线一起绘出，默认是False，将会只绘出指标曲线。
+            show: If to show the chart, default is True. Set it to False to return the
+            `go.Figure` instead, e.g. to export it. 是否直接显示图表，默认是True，设为False将返回图表对象。
         """
         if ns is None:
             ns = CDP_COLS
@@ -647,10 +839,12 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
                     "Invalid input for ns, valid values are ah, al, cdp, nh, nl."
                 )
 
-        df_cdp = self.cdp(n=n)
-        self._plot(df=df_cdp, head=head, title="CDP", lines=ns, verbose=verbose)
+        df_cdp = self._indicator_tail("cdp", head, n=n)
+        return self._plot(
+            df=df_cdp, head=head, title="CDP", lines=ns, verbose=verbose, show=show
+        )
 
-    def plot_sar(self, head: int = 90, verbose: bool = False):
+    def plot_sar(self, head: int = 90, verbose: bool = False, show: bool = True):
         """Plot Stop And Reverse (SAR) indicator. 绘出止损反转指标
 
         Parameters:
@@ -658,16 +852,23 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
             默认90，将会绘出最近90个交易日的曲线。
             verbose: If to include stock price or not, default is False.
             选择是否将股票价格曲线一起绘出，默认是False，将会只绘出指标曲线。
+            show: If to show the chart, default is True. Set it to False to return the
+            `go.Figure` instead, e.g. to export it. 是否直接显示图表，默认是True，设为False将返回图表对象。
         """
-        df_sar = self.sar()
+        df_sar = self._indicator_tail("sar", head)
 
         if head:
             df_sar = df_sar.tail(head)
 
+        scatter = go.Scatter
+        if self.max_points and len(df_sar) > self.max_points:
+            df_sar = df_sar.iloc[lttb(df_sar["sar"], self.max_points)]
+            scatter = go.Scattergl
+
         fig = go.Figure(layout=set_layout())
         fig.add_trace(
-            go.Scatter(
-                x=df_sar["day"],
+            scatter(
+                x=format_day(df_sar["day"]),
                 y=df_sar["sar"],
                 marker=dict(color=df_sar["color"], size=3),
                 mode="markers",
@@ -682,19 +883,23 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
             title_text=f"SAR Chart ({self.stock_code})",
             xaxis_rangeslider_visible=False,
         )
-        fig.show()
+        return self._show(fig, show)
 
-    def plot_mtm(self, head: int = 90):
+    def plot_mtm(self, head: int = 90, show: bool = True):
         """Plot MTM indicator. 绘出动量指标
 
         Parameters:
             head: The recent number of trading days to plot, default is 90, 最近交易日的天数，
             默认90，将会绘出最近90个交易日的曲线。
+            show: If to show the chart, default is True. Set it to False to return the
+            `go.Figure` instead, e.g. to export it. 是否直接显示图表，默认是True，设为False将返回图表对象。
         """
-        df_mtm = self.mtm()
-        self._plot(df=df_mtm, head=head, title="MTM", lines=["mtm", "mtmma"])
+        df_mtm = self._indicator_tail("mtm", head)
+        return self._plot(
+            df=df_mtm, head=head, title="MTM", lines=["mtm", "mtmma"], show=show
+        )
 
-    def plot_dmi(self, head: int = 90, n: int = 14):
+    def plot_dmi(self, head: int = 90, n: int = 14, show: bool = True):
         """Plot DMI (Directional Movement Index) indicator. 绘出动向指标
 
             Parameters:
@@ -702,9 +907,15 @@ class StockInsider(Stock, PriceIndicatorMixin, VolumnIndicatorMixin, SARIndicato
             默认90，将会绘出最近90个交易日的曲线。
             n: The size of moving average period for K, default is 14. 平移平均曲线的窗口大小，默认
             是14个交易日。
+            show: If to show the chart, default is True. Set it to False to return the
+            `go.Figure` instead, e.g. to export it. 是否直接显示图表，默认是True，设为False将返回图表对象。
         """
-        df_dmi = self.dmi(n=n)
+        df_dmi = self._indicator_tail("dmi", head, n=n)
 
-        self._plot(
-            df=df_dmi, head=head, title="DMI", lines=["pdi", "mdi", "adx", "adxr"]
+        return self._plot(
+            df=df_dmi,
+            head=head,
+            title="DMI",
+            lines=["pdi", "mdi", "adx", "adxr"],
+            show=show,
         )
@@ -0,0 +1,128 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, Optional
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from insider.cache import BarCache
+from insider.constants import UNIVERSE_MAX_WORKERS
+from insider.fetch import Fetcher
+from insider.panel import StockPanel
+from insider.stock import Stock
+
+
+class StockUniverse:
+    """Load the historical data of many stocks concurrently. 并发获取多只股票的历史数据。
+
+    All requests go through one pooled `requests.Session` and a bounded thread
+    pool, a failed code is recorded in `failures` instead of stopping the others.
+    """
+
+    def __init__(
+        self,
+        codes: Iterable[str],
+        ktype: str = "D",
+        max_workers: int = UNIVERSE_MAX_WORKERS,
+        session: Optional[requests.Session] = None,
+        cache: Optional[BarCache] = None,
+        url: Optional[str] = None,
+        replay_dir: Optional[str] = None,
+        fetcher: Optional[Fetcher] = None,
+        resample: bool = False,
+    ):
+        """
+        Parameters:
+            codes: Full stock codes, (e.g. ['sz002156', 'sh603019'])，股票完整代码列表
+            ktype: freq, valid values are `D`, `W`, and `M`，股票趋势频率
+            max_workers: Maximum number of concurrent requests, default is 16. 最大并发请求数
+            session: requests session to share, default is None which creates a session
+                with a connection pool sized to `max_workers`. 共享的HTTP会话
+            cache: local bar cache shared by all codes, default is None. 本地K线数据缓存
+            url: URL template passed to `Stock`, default is None. 数据接口URL模板
+            replay_dir: replay directory passed to `Stock`, default is None. 离线回放目录
+            fetcher: fetch policy shared by all codes, default is None which creates one
+                with `session`, its `stats` hold the request latencies. 数据获取策略
+            resample: build `W` and `M` bars from the daily bars, see `Stock`,
+                default is False. 由日线数据在本地合成周线和月线
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1.")
+
+        self.codes = list(dict.fromkeys(codes))
+        self.ktype = ktype
+        self.max_workers = max_workers
+        self.session = (
+            session if session is not None else self._make_session(max_workers)
+        )
+        self.fetcher = fetcher if fetcher is not None else Fetcher(session=self.session)
+        self.cache = cache
+        self.url = url
+        self.replay_dir = replay_dir
+        self.resample = resample
+
+        self.data: Dict[str, pd.DataFrame] = {}
+        self.failures: Dict[str, Exception] = {}
+
+    @staticmethod
+    def _make_session(pool_size: int) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _load_one(self, code: str) -> pd.DataFrame:
+        return Stock(
+            code,
+            ktype=self.ktype,
+            session=self.session,
+            cache=self.cache,
+            url=self.url,
+            replay_dir=self.replay_dir,
+            fetcher=self.fetcher,
+            resample=self.resample,
+        ).full_data
+
+    def load(self) -> Dict[str, pd.DataFrame]:
+        """Fetch all codes and return a dict of code to DataFrame. 获取所有股票数据。
+
+        Codes that fail are left out of the returned dict and their exceptions
+        are kept in `failures`.
+        """
+        data, failures = {}, {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(self._load_one, code): code for code in self.codes
+            }
+            for future in as_completed(futures):
+                code = futures[future]
+                try:
+                    data[code] = future.result()
+                except Exception as e:
+                    failures[code] = e
+
+        # keep the order in which codes were given
+        self.data = {code: data[code] for code in self.codes if code in data}
+        self.failures = {
+            code: failures[code] for code in self.codes if code in failures
+        }
+        return self.data
+
+    def to_panel(self) -> StockPanel:
+        """Return the loaded stocks as a `StockPanel` to compute indicators of all
+        stocks at once. 返回可同时计算所有股票指标的`StockPanel`。
+        """
+        if not self.data:
+            raise ValueError("No data is loaded yet, please call `load` first.")
+        return StockPanel.from_frames(self.data)
+
+    def panel(self, col: str = "close") -> pd.DataFrame:
+        """Return one column of all loaded stocks aligned by day (days x codes).
+        以日期为行、股票代码为列返回某一列数据。
+        """
+        if not self.data:
+            raise ValueError("No data is loaded yet, please call `load` first.")
+        return pd.DataFrame(
+            {code: df.set_index("day")[col] for code, df in self.data.items()}
+        ).sort_index()
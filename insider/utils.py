@@ -1,29 +1,119 @@
-import plotly.graph_objects as go
+from typing import Optional
+import importlib
+
+import numpy as np
+import pandas as pd
+
+from insider.constants import LIMIT_PCT
+from insider.downsample import lttb
+from insider.limits import limit_hits, limit_prices
+
+
+class LazyModule:
+    """Module which is only imported when one of its attributes is first used, so
+    that the compute path never pays the import of plotly.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def __getattr__(self, attr: str):
+        if self._module is None:
+            self._module = importlib.import_module(self._name)
+        return getattr(self._module, attr)
+
+
+go = LazyModule("plotly.graph_objects")
 
 
 def set_layout():
-    layout = go.Layout(xaxis=dict(type="category", tickangle=270))
+    # downsampled traces keep different days, so order the days by value
+    layout = go.Layout(
+        xaxis=dict(type="category", tickangle=270, categoryorder="category ascending")
+    )
     return layout
 
 
-def calculate_surged_limit(p):
-    """Calculate the price if upper surged limit is reached."""
-    surged = round(p * 1.1, 2)
-    return surged
+def line_trace(
+    day: pd.Series, y: pd.Series, name: str, max_points: Optional[int] = None, **kwargs
+):
+    """Line of `y` over the trading days. Above `max_points` points, the line is
+    downsampled with `lttb` and drawn with WebGL.
+    """
+    if max_points and len(y) > max_points:
+        idx = lttb(y, max_points)
+        return go.Scattergl(
+            x=format_day(day.iloc[idx]), y=y.iloc[idx], name=name, **kwargs
+        )
+    return go.Scatter(x=format_day(day), y=y, name=name, **kwargs)
+
+
+def format_day(ser: pd.Series) -> pd.Series:
+    """Format trading days as labels of the category x-axis, the time is only
+    shown for intraday data.
+    """
+    if not pd.api.types.is_datetime64_any_dtype(ser):
+        return ser
+    if (ser == ser.dt.normalize()).all():
+        return ser.dt.strftime("%Y-%m-%d")
+    return ser.dt.strftime("%Y-%m-%d %H:%M")
+
+
+def _is_frozen(values: np.ndarray) -> bool:
+    # views of a read-only array are read-only as well, while pandas hands out
+    # read-only views of writable blocks, so check the array owning the memory
+    while isinstance(values.base, np.ndarray):
+        values = values.base
+    return not values.flags.writeable
+
+
+def freeze(df: pd.DataFrame) -> pd.DataFrame:
+    """Return a frame of `df` whose numpy columns are read-only arrays of their
+    own, so that it can be shared without copies. Columns which are frozen
+    already, e.g. of a slice of a frozen frame, are kept as they are, and so are
+    the columns of other dtypes.
+
+    Parameters:
+        df: data to freeze. 需要冻结的数据
+    """
+    columns = {}
+    for i in range(df.shape[1]):
+        ser = df.iloc[:, i]
+        if isinstance(ser.dtype, np.dtype):
+            values = ser.to_numpy()
+            if not _is_frozen(values):
+                values = values.copy()
+                values.flags.writeable = False
+                ser = pd.Series(values, index=df.index, copy=False)
+        columns[i] = ser
+    frozen = pd.DataFrame(columns, index=df.index, copy=False)
+    frozen.columns = df.columns
+    return frozen
+
+
+def calculate_surged_limit(p, pct=LIMIT_PCT["main"]):
+    """Calculate the price if upper surged limit is reached, see
+    `insider.limits.limit_prices`.
+    """
+    return limit_prices(p, pct)[0]
 
 
 def reach_surged_limit(
     df, year_month_day: str, preprice_col: str = "preprice", close_col: str = "price"
 ):
-    """Check"""
-    df["calculated_surged_price"] = df[preprice_col].apply(
-        lambda x: calculate_surged_limit(x)
-    )
-    df[year_month_day] = (
-        (df["calculated_surged_price"] == df[close_col])
-        & (df[preprice_col] != df[close_col])
-    ).astype(int)
-
-    cols = ["code", "name"]
-    cols = cols.append(year_month_day)
-    return df[cols]
+    """Check which stocks of a snapshot closed at their limit-up price, using the
+    limits of their boards, see `insider.limits.limit_hits`.
+
+    Parameters:
+        df: snapshot with `code`, `name` and the price columns. 全市场行情快照
+        year_month_day: name of the column of the result, e.g. `20240510`. 结果列名
+        preprice_col: column of the previous close, default is `preprice`. 昨收价列
+        close_col: column of the latest price, default is `price`. 最新价列
+
+    Returns:
+        `code`, `name` and `year_month_day`, which is 1 at limit-up and 0 otherwise.
+    """
+    hits = limit_hits(df, prev_col=preprice_col, close_col=close_col)
+    df[year_month_day] = (hits["hit"] == 1).astype(int)
+    return df[["code", "name", year_month_day]]
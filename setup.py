@@ -18,8 +18,13 @@ setup(
     author_email="kaiqidong1991@gmail.com",
     licnese="MIT License",
     keywords=__keywords__,
-    packages=find_packages(exclude=["test*"]),
+    packages=find_packages(exclude=["test*", "benchmarks*"]),
     install_requires=["numpy>=1.18.3", "plotly>=4.6.0", "pandas>=1.0.3", "requests>=2.23.0"],
+    extras_require={
+        "export": ["kaleido>=1.0.0"],
+        "jit": ["numba>=0.57"],
+        "polars": ["polars>=1.21"],
+    },
     tests_require=["pytest"],
     classifiers=[
         "Development Status :: 3 - Alpha",
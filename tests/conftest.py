@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import insider.stock
+from insider.replay import ReplayServer
+
+
+def _make_ohlcv(n: int = 500, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    close = 10 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+    open_ = close * (1 + rng.normal(0, 0.01, n))
+    high = np.maximum(open_, close) * (1 + rng.uniform(0, 0.02, n))
+    low = np.minimum(open_, close) * (1 - rng.uniform(0, 0.02, n))
+    volumn = rng.integers(100_000, 10_000_000, n).astype("float64")
+    day = pd.bdate_range("2000-01-03", periods=n).strftime("%Y-%m-%d")
+    return pd.DataFrame(
+        {
+            "day": day,
+            "open": open_,
+            "high": high,
+            "close": close,
+            "low": low,
+            "volumn": volumn,
+        }
+    )
+
+
+@pytest.fixture
+def make_ohlcv():
+    """Factory of synthetic OHLCV frames shaped like the fetched stock data."""
+    return _make_ohlcv
+
+
+def _make_record(n: int = 50, seed: int = 0) -> list:
+    """Build an ifeng-like `record` payload with comma formatted numbers."""
+    df = _make_ohlcv(n, seed)
+    record = []
+    for row in df.itertuples(index=False):
+        values = [row.open, row.high, row.close, row.low, row.volumn * 100]
+        values += [row.close - row.open, 0.1, row.close, row.close, row.close]
+        values += [row.volumn, row.volumn, row.volumn]
+        record.append([row.day] + [f"{v:,.2f}" for v in values])
+    return record
+
+
+@pytest.fixture
+def stock_server(monkeypatch):
+    """Local stand-in for the ifeng endpoint that `Stock` fetches from."""
+    with ReplayServer() as server:
+        monkeypatch.setattr(insider.stock, "STOCK_URL", server.url)
+        # a fresh default fetcher, whose breaker has not seen the other tests
+        monkeypatch.setattr(insider.stock, "_default_fetcher", None)
+        server.make_record = _make_record
+        yield server
@@ -0,0 +1,114 @@
+import importlib.util
+import subprocess
+import sys
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from insider.panel import StockPanel
+from insider.stock_insider import StockInsider
+
+INDICATORS = [
+    ("ma", {}),
+    ("md", {}),
+    ("ema", {}),
+    ("macd", {}),
+    ("kdj", {}),
+    ("kdj", {"smooth_type": "ema"}),
+    ("rsi", {}),
+    ("env", {}),
+    ("mi", {}),
+    ("mike", {}),
+    ("adtm", {}),
+    ("rc", {}),
+    ("boll", {}),
+    ("bbiboll", {}),
+    ("atr", {}),
+    ("cdp", {"n": 3}),
+    ("mtm", {}),
+    ("dmi", {}),
+    ("vma", {}),
+    ("vmacd", {}),
+    ("vstd", {}),
+    ("vrsi", {}),
+    ("vosc", {}),
+    ("obv", {}),
+    ("sar", {}),
+]
+
+
+@pytest.fixture(params=["numpy", "polars"])
+def backend(request):
+    if request.param == "polars":
+        pytest.importorskip("polars")
+    return request.param
+
+
+@pytest.fixture
+def df(make_ohlcv):
+    df = make_ohlcv(1000)
+    df.loc[[100, 101, 400], "close"] = np.nan
+    df.loc[600, "high"] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("name, params", INDICATORS)
+def test_backend_matches_pandas(df, backend, name, params):
+    if backend == "polars" and params.get("smooth_type") == "ema":
+        # pandas weights the value after a gap differently with a span of 3
+        df = df.dropna(ignore_index=True)
+    expected = getattr(StockInsider("sh600000", df=df), name)(**params)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        result = getattr(StockInsider("sh600000", df=df, backend=backend), name)(
+            **params
+        )
+    pd.testing.assert_frame_equal(result, expected, rtol=1e-9, atol=1e-6)
+
+
+def test_backend_with_output_format(df, backend):
+    si = StockInsider("sh600000", df=df, backend=backend, output_format="arrays")
+    expected = StockInsider("sh600000", df=df).dmi()
+    result = si.dmi()
+    assert list(result) == list(expected.columns)
+    np.testing.assert_allclose(result["adx"], expected["adx"], rtol=1e-9)
+
+    si.set_read_only()
+    assert not si.dmi()["adx"].flags.writeable
+
+
+def test_backend_is_switched(df):
+    si = StockInsider("sh600000", df=df)
+    expected = si.macd()
+    si.backend = "numpy"
+    pd.testing.assert_frame_equal(si.macd(), expected)
+    assert ("macd", "frame", "numpy") in {key[:3] for key in si._indicator_cache}
+
+    si.backend = "cupy"
+    with pytest.raises(ValueError, match="Invalid backend"):
+        si.macd()
+
+
+def test_panel_stays_on_pandas(make_ohlcv):
+    frames = {"sh600000": make_ohlcv(200), "sz000001": make_ohlcv(200, seed=1)}
+    panel = StockPanel.from_frames(frames)
+    assert panel.backend == "pandas"
+    assert isinstance(panel.macd(), pd.DataFrame)
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("polars") is not None, reason="polars is installed"
+)
+def test_polars_backend_requires_polars(df):
+    with pytest.raises(ImportError, match="polars"):
+        StockInsider("sh600000", df=df, backend="polars").ma()
+
+
+def test_backends_do_not_import_polars():
+    code = (
+        "import sys; import insider.stock_insider; "
+        "assert 'polars' not in sys.modules"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
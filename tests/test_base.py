@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from insider.stock_insider import StockInsider
+
+
+@pytest.mark.parametrize("kind", ["min", "max"])
+def test_rolling_extrema_matches_pandas(make_ohlcv, kind):
+    df = make_ohlcv(300)
+    df.loc[[10, 150], "low"] = np.nan
+    si = StockInsider("test", df=df)
+
+    ns = [1, 2, 3, 9, 12, 33, 400]
+    result = si._rolling_extrema("low", ns, kind=kind)
+    for n in ns:
+        expected = getattr(df["low"].rolling(n), kind)()
+        pd.testing.assert_series_equal(result[n], expected)
+
+
+def test_rolling_extrema_shared_between_indicators(make_ohlcv):
+    df = make_ohlcv(300)
+    si = StockInsider("test", df=df)
+    si.kdj(n=9)
+    si.mike(n=12)
+
+    tables = [key for key in si._indicator_cache if key[0] == "_extrema_table"]
+    assert sorted(tables) == [
+        ("_extrema_table", "high", "max"),
+        ("_extrema_table", "low", "min"),
+    ]
+
+    typ = df[["high", "low", "close"]].mean(axis=1)
+    hv, lv = df["high"].rolling(12).max(), df["low"].rolling(12).min()
+    np.testing.assert_allclose(si.mike(n=12)["wr"], typ * 2 - lv)
+    np.testing.assert_allclose(si.mike(n=12)["ss"], 2 * lv - hv)
+
+
+def test_rolling_extrema_invalid_kind(make_ohlcv):
+    si = StockInsider("test", df=make_ohlcv(10))
+    with pytest.raises(ValueError, match="Only min and max"):
+        si._rolling_extrema("low", [3], kind="mean")
@@ -0,0 +1,81 @@
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+import pandas as pd
+import pytest
+
+from insider.cache import BarCache
+from insider.stock import Stock
+
+
+@pytest.mark.parametrize("fmt", ["parquet", "pickle"])
+def test_cache_roundtrip(tmp_path, make_ohlcv, fmt):
+    if fmt == "parquet":
+        pytest.importorskip("pyarrow")
+    cache = BarCache(str(tmp_path), fmt=fmt)
+    df = make_ohlcv(20)
+
+    assert cache.load("sh600000", "D") is None
+    assert not cache.is_fresh("sh600000", "D")
+
+    cache.save("sh600000", "D", df)
+    assert cache.is_fresh("sh600000", "D")
+    pd.testing.assert_frame_equal(cache.load("sh600000", "D"), df)
+
+
+def test_cache_invalid_format(tmp_path):
+    with pytest.raises(ValueError, match="Invalid cache format"):
+        BarCache(str(tmp_path), fmt="csv")
+
+
+def test_cache_update_appends_new_days(tmp_path, make_ohlcv):
+    cache = BarCache(str(tmp_path), fmt="pickle")
+    df = make_ohlcv(30)
+    cache.save("sh600000", "D", df.head(20))
+
+    # upstream only returns a recent window which overlaps the cached history
+    merged = cache.update("sh600000", "D", df.iloc[10:])
+    pd.testing.assert_frame_equal(merged, df)
+    pd.testing.assert_frame_equal(cache.load("sh600000", "D"), df)
+
+
+def test_cache_update_refreshes_overlapping_days(tmp_path, make_ohlcv):
+    cache = BarCache(str(tmp_path), fmt="pickle")
+    df = make_ohlcv(30)
+    # the last bar was cached during the session, before the close
+    intraday = df.head(20).copy()
+    intraday.loc[19, ["close", "volumn"]] = [1.0, 10.0]
+    cache.save("sh600000", "D", intraday)
+
+    merged = cache.update("sh600000", "D", df.iloc[15:])
+    pd.testing.assert_frame_equal(merged, df)
+    assert cache.update("sh600000", "D", df.iloc[:0]).equals(df)
+
+
+def test_concurrent_saves_of_one_key(tmp_path, make_ohlcv):
+    cache = BarCache(str(tmp_path), fmt="pickle")
+    frames = [make_ohlcv(2000, seed=seed) for seed in range(8)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(lambda df: cache.save("sh600000", "D", df), frames))
+
+    loaded = cache.load("sh600000", "D")
+    assert any(loaded.equals(df) for df in frames)
+    assert os.listdir(tmp_path) == [os.path.basename(cache.path("sh600000", "D"))]
+
+
+def test_stock_uses_cache(tmp_path, stock_server):
+    stock_server.add("sh600000", "D", stock_server.make_record(20))
+    cache = BarCache(str(tmp_path), fmt="pickle")
+
+    first = Stock("sh600000", cache=cache)
+    second = Stock("sh600000", cache=cache)
+    assert stock_server.requested == [("sh600000", "D")]
+    pd.testing.assert_frame_equal(first.full_data, second.full_data)
+
+    # an expired entry is refreshed and topped up with the new trading days
+    stock_server.add("sh600000", "D", stock_server.make_record(25))
+    os.utime(cache.path("sh600000", "D"), (0, 0))
+    third = Stock("sh600000", cache=cache)
+    assert stock_server.requested == [("sh600000", "D")] * 2
+    assert len(third.full_data) == 25
+    assert cache.is_fresh("sh600000", "D")
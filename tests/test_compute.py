@@ -0,0 +1,113 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from insider.indicators.backends import PandasBackend
+from insider.panel import StockPanel
+from insider.stock_insider import StockInsider
+
+INDICATORS = [
+    "ma",
+    ("ma", {"n": 14}),
+    "ema",
+    "macd",
+    "kdj",
+    ("kdj", {"n": 14, "smooth_type": "ema"}),
+    "rsi",
+    ("env", {"n": 14}),
+    "mi",
+    "mike",
+    "adtm",
+    "rc",
+    ("boll", {"n": 14}),
+    "bbiboll",
+    "atr",
+    "cdp",
+    "mtm",
+    "dmi",
+    "vmacd",
+    "vrsi",
+    "obv",
+    "sar",
+]
+
+
+@pytest.fixture
+def df(make_ohlcv):
+    df = make_ohlcv(500)
+    df.loc[40, "close"] = np.nan
+    return df
+
+
+def test_compute_matches_indicators(df):
+    si = StockInsider("sh600000", df=df)
+    result = si.compute(INDICATORS)
+
+    assert list(result.columns[:5]) == ["day", "close", "high", "low", "volumn"]
+    for item in INDICATORS:
+        name, params = (item, {}) if isinstance(item, str) else item
+        expected = getattr(si, name)(**params)
+        label = name
+        if params:
+            label += "(" + ",".join(f"{k}={v}" for k, v in params.items()) + ")"
+        cols = [col for col in result.columns if col.startswith(label + ".")]
+        assert cols
+        for col in cols:
+            pd.testing.assert_series_equal(
+                result[col], expected[col[len(label) + 1 :]], check_names=False
+            )
+    assert "kdj(n=14,smooth_type=ema).J" in result
+    assert "ma(n=14).close" in result and "ma.close" in result
+
+
+def test_shared_operations_run_once(df, monkeypatch):
+    calls = []
+    rolling = PandasBackend.rolling
+
+    def count(backend, x, n, how):
+        calls.append((n, how))
+        return rolling(backend, x, n, how)
+
+    monkeypatch.setattr(PandasBackend, "rolling", count)
+    si = StockInsider("sh600000", df=df)
+    si.compute([("ma", {"n": 14}), ("env", {"n": 14}), ("boll", {"n": 14})])
+    assert calls.count((14, "mean")) == 1
+
+    calls.clear()
+    si.ma(n=14), si.env(n=14), si.boll(n=14)
+    assert calls.count((14, "mean")) == 3
+
+
+@pytest.mark.parametrize("backend", ["numpy", "polars"])
+def test_compute_with_backend_and_format(df, backend):
+    if backend == "polars":
+        pytest.importorskip("polars")
+    expected = StockInsider("sh600000", df=df).compute(["macd", "dmi"])
+    si = StockInsider("sh600000", df=df, backend=backend, output_format="arrays")
+    result = si.compute(["macd", "dmi"])
+
+    assert list(result) == list(expected.columns)
+    np.testing.assert_allclose(result["dmi.adx"], expected["dmi.adx"], rtol=1e-9)
+    result["dmi.adx"][:] = 0
+    assert not (si.compute(["dmi"])["dmi.adx"] == 0).all()
+
+
+def test_compute_on_panel(make_ohlcv):
+    frames = {"sh600000": make_ohlcv(300), "sz000001": make_ohlcv(300, seed=1)}
+    panel = StockPanel.from_frames(frames)
+    result = panel.compute(["macd", ("ma", {"n": 10})])
+
+    pd.testing.assert_frame_equal(
+        result["ma(n=10).close"], panel.ma(n=10)["close"], check_names=False
+    )
+    pd.testing.assert_frame_equal(
+        result["macd.dea"], panel.macd()["dea"], check_names=False
+    )
+
+
+@pytest.mark.parametrize("name", ["plot_kdj", "compute", "_frame", "nothing"])
+def test_compute_rejects_non_indicators(df, name):
+    si = StockInsider("sh600000", df=df)
+    with pytest.raises(ValueError, match="is not an indicator"):
+        si.compute(["ma", name])
+    assert "_shared" not in si.__dict__
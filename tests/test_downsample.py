@@ -0,0 +1,87 @@
+import numpy as np
+import plotly.graph_objects as go
+import pytest
+
+from insider.constants import MA_COLS
+from insider.downsample import bucket_extremes, lttb, ohlc_buckets
+from insider.stock_insider import StockInsider
+
+
+def test_lttb_keeps_shape():
+    y = np.sin(np.linspace(0, 20, 10_000))
+    y[4321] = 5
+    y[:10] = np.nan
+
+    idx = lttb(y, 200)
+    assert len(idx) == 200
+    assert idx[0] == 10 and idx[-1] == len(y) - 1
+    assert np.all(np.diff(idx) > 0)
+    assert 4321 in idx
+    assert np.isclose(y[idx].min(), -1, atol=0.01)
+
+    np.testing.assert_array_equal(lttb(y[:100], 200), np.arange(10, 100))
+    with pytest.raises(ValueError, match="At least 3"):
+        lttb(y, 2)
+
+
+def test_bucket_extremes():
+    y = np.array([1, -5, 2, np.nan, 3, -1, 0.5, 4])
+    np.testing.assert_array_equal(bucket_extremes(y, 4), [1, 2, 4, 7])
+    np.testing.assert_array_equal(bucket_extremes(y, 10), np.arange(8))
+
+
+def test_ohlc_buckets(make_ohlcv):
+    df = make_ohlcv(1000)
+    merged = ohlc_buckets(df, 100)
+
+    assert len(merged) == 100
+    first = df.iloc[:10]
+    assert merged.loc[0, "day"] == first["day"].iloc[0]
+    assert merged.loc[0, "open"] == first["open"].iloc[0]
+    assert merged.loc[0, "high"] == first["high"].max()
+    assert merged.loc[0, "low"] == first["low"].min()
+    assert merged.loc[0, "close"] == first["close"].iloc[-1]
+    assert merged["volumn"].sum() == df["volumn"].sum()
+    assert ohlc_buckets(df, 2000) is df
+
+
+@pytest.fixture
+def long_insider(make_ohlcv):
+    def make(n):
+        df = make_ohlcv(n)
+        for col in MA_COLS:
+            df[col] = df["close"]
+        return StockInsider("sh600000", df=df)
+
+    return make
+
+
+@pytest.mark.parametrize(
+    "name", ["plot", "plot_ma", "plot_macd", "plot_sar", "plot_volumn", "plot_boll"]
+)
+def test_long_history_is_downsampled(long_insider, name):
+    insider = long_insider(20_000)
+    insider.max_points = 500
+    fig = getattr(insider, name)(head=None, show=False)
+
+    for trace in fig.data:
+        assert len(trace.x) <= 500
+        if isinstance(trace, go.Scatter):
+            pytest.fail("long lines must be drawn with WebGL")
+
+    insider.max_points = None
+    fig = getattr(insider, name)(head=None, show=False)
+    assert max(len(trace.x) for trace in fig.data) == 20_000
+
+
+def test_payload_stays_flat(long_insider):
+    sizes = [
+        len(long_insider(n).plot_ma(head=None, show=False).to_json())
+        for n in (10_000, 50_000)
+    ]
+    assert sizes[1] < 1.1 * sizes[0]
+
+    # short charts are unchanged
+    fig = long_insider(500).plot_macd(show=False)
+    assert all(len(trace.x) == 90 for trace in fig.data)
+    assert isinstance(fig.data[1], go.Scatter)
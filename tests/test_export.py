@@ -0,0 +1,103 @@
+import importlib.util
+import os
+import subprocess
+import sys
+
+import plotly.graph_objects as go
+import pytest
+
+from insider.constants import MA_COLS
+from insider.export import ChartExporter
+from insider.stock_insider import StockInsider
+
+PLOTS = sorted(name for name in dir(StockInsider) if name.startswith("plot"))
+
+
+@pytest.fixture
+def make_bars(make_ohlcv):
+    """Bars with the moving averages which come with the fetched data."""
+
+    def make(n: int = 200, seed: int = 0):
+        df = make_ohlcv(n, seed)
+        for col in MA_COLS:
+            df[col] = df["close"].rolling(int(col[2:]), min_periods=1).mean()
+        return df
+
+    return make
+
+
+@pytest.mark.parametrize("name", PLOTS)
+def test_plot_returns_figure(make_bars, name):
+    insider = StockInsider("sh600000", df=make_bars())
+    fig = getattr(insider, name)(show=False)
+    assert isinstance(fig, go.Figure)
+    assert fig.data
+    assert "sh600000" in fig.layout.title.text
+
+
+def test_plot_shows_by_default(make_ohlcv, monkeypatch):
+    shown = []
+    monkeypatch.setattr(go.Figure, "show", lambda fig: shown.append(fig))
+    insider = StockInsider("sh600000", df=make_ohlcv(200))
+
+    assert insider.plot_macd() is None
+    assert insider.plot_boll(verbose=True) is None
+    assert len(shown) == 2
+
+
+def test_export_html(make_bars, tmp_path):
+    frames = {"sh600000": make_bars(200, seed=1), "sz000001": make_bars(150, seed=2)}
+    jobs = [
+        ("sh600000", "price"),
+        ("sh600000", "ma", {"ns": [5, 10]}),
+        ("sz000001", "macd"),
+        ("sz000001", "mike", {"ns": ["xx"]}),
+    ]
+    exporter = ChartExporter(str(tmp_path), fmt="html", processes=2, chunksize=1)
+    paths = exporter.export(jobs, frames=frames)
+
+    assert sorted(os.path.basename(path) for path in paths) == [
+        "sh600000_ma_ns-510.html",
+        "sh600000_price.html",
+        "sz000001_macd.html",
+    ]
+    assert all(os.path.getsize(path) > 0 for path in paths)
+    assert list(exporter.failures) == ["sz000001_mike_ns-xx"]
+    assert isinstance(exporter.failures["sz000001_mike_ns-xx"], ValueError)
+
+
+def test_export_fetches_once_per_code(stock_server, tmp_path):
+    stock_server.add("sh600000", "D", stock_server.make_record(120))
+    exporter = ChartExporter(
+        str(tmp_path), fmt="html", processes=1, url=stock_server.url
+    )
+    paths = exporter.export(
+        [("sh600000", "kdj"), ("sh600000", "sar"), ("sh600001", "kdj")]
+    )
+
+    assert len(paths) == 2
+    assert list(exporter.failures) == ["sh600001_kdj"]
+    assert sorted(stock_server.requested) == [("sh600000", "D"), ("sh600001", "D")]
+
+
+def test_invalid_export(tmp_path):
+    with pytest.raises(ValueError, match="Invalid format"):
+        ChartExporter(str(tmp_path), fmt="jpg")
+    with pytest.raises(ValueError, match="No chart of foo"):
+        ChartExporter(str(tmp_path), fmt="html").export([("sh600000", "foo")])
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("kaleido") is not None, reason="kaleido is installed"
+)
+def test_image_export_requires_kaleido(tmp_path):
+    with pytest.raises(ImportError, match="kaleido"):
+        ChartExporter(str(tmp_path), fmt="png")
+
+
+def test_compute_path_does_not_import_plotly():
+    code = (
+        "import sys; import insider.stock_insider; "
+        "assert not [m for m in sys.modules if m.startswith('plotly')]"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
@@ -0,0 +1,113 @@
+import importlib.util
+
+import pandas as pd
+import pytest
+
+from insider.external import read_external_csv
+from insider.stock_insider import StockInsider
+
+
+@pytest.fixture
+def external_csv(tmp_path, make_ohlcv):
+    df = make_ohlcv(300)
+    df["extra"] = "x"
+    df["turnover"] = df["close"] * df["volumn"]
+    fpath = tmp_path / "external.csv"
+    df.to_csv(fpath, index=False)
+    return str(fpath), df
+
+
+def test_reads_typed_mandatory_columns(external_csv):
+    fpath, df = external_csv
+    loaded = read_external_csv(fpath, chunksize=64)
+
+    assert list(loaded.columns) == ["day", "open", "high", "close", "low", "volumn"]
+    assert pd.api.types.is_datetime64_any_dtype(loaded["day"])
+    assert (loaded.dtypes.drop("day") == "float64").all()
+    pd.testing.assert_series_equal(loaded["close"], df["close"])
+    assert (loaded["day"] == pd.to_datetime(df["day"])).all()
+
+
+def test_extra_cols(external_csv):
+    fpath, df = external_csv
+    loaded = read_external_csv(fpath, extra_cols=["turnover"])
+    pd.testing.assert_series_equal(loaded["turnover"], df["turnover"])
+
+    with pytest.raises(ValueError, match="not found"):
+        read_external_csv(fpath, extra_cols=["missing"])
+
+
+@pytest.mark.parametrize("sorted_by_day", [True, False])
+@pytest.mark.parametrize(
+    "start_date, end_date",
+    [
+        ("2000-03-01", "2000-06-30"),
+        (None, "2000-02-01"),
+        ("2000-12-01", None),
+        ("1999-01-01", "1999-12-31"),
+        ("2010-01-01", None),
+    ],
+)
+def test_date_range(external_csv, sorted_by_day, start_date, end_date):
+    fpath, df = external_csv
+    loaded = read_external_csv(
+        fpath,
+        start_date=start_date,
+        end_date=end_date,
+        sorted_by_day=sorted_by_day,
+        chunksize=50,
+    )
+
+    full = read_external_csv(fpath)
+    expected = StockInsider._choose_date(full, start_date, end_date)
+    pd.testing.assert_frame_equal(loaded, expected.reset_index(drop=True))
+
+
+@pytest.mark.skipif(
+    importlib.util.find_spec("pyarrow") is None, reason="pyarrow is not installed"
+)
+def test_pyarrow_engine(external_csv):
+    fpath, _ = external_csv
+    pd.testing.assert_frame_equal(
+        read_external_csv(fpath, "2000-03-01", sorted_by_day=True, engine="pyarrow"),
+        read_external_csv(fpath, "2000-03-01", sorted_by_day=True),
+    )
+
+
+def test_invalid_input(tmp_path, external_csv):
+    fpath, _ = external_csv
+    with pytest.raises(ValueError, match="engine"):
+        read_external_csv(fpath, engine="fast")
+
+    fpath = tmp_path / "partial.csv"
+    pd.DataFrame({"day": ["2020-01-01"], "close": [1.0]}).to_csv(fpath, index=False)
+    with pytest.raises(ValueError, match="mandatory"):
+        StockInsider.from_external_csv_data(str(fpath))
+
+
+def test_from_external_csv_data(external_csv):
+    fpath, _ = external_csv
+    si = StockInsider.from_external_csv_data(
+        fpath, code="AAPL", start_date="2000-06-01", sorted_by_day=True
+    )
+    assert si.stock_code == "AAPL"
+    assert si.full_data["day"].iloc[0] == pd.Timestamp("2000-06-01")
+    assert len(si.macd()) == len(si.full_data)
+
+
+def test_plot_columns_are_loaded(tmp_path, make_ohlcv):
+    df = make_ohlcv(100)
+    for n in [5, 10, 20]:
+        df[f"ma{n}"] = df["close"].rolling(n, min_periods=1).mean()
+    df["extra"] = "x"
+    fpath = tmp_path / "external.csv"
+    df.to_csv(fpath, index=False)
+
+    si = StockInsider.from_external_csv_data(str(fpath))
+    assert "extra" not in si.full_data
+    pd.testing.assert_series_equal(si.full_data["ma20"], df["ma20"])
+    fig = si.plot(verbose=True, show=False)
+    assert [trace.name for trace in fig.data[1:]] == ["ma5", "ma10", "ma20"]
+
+    empty = read_external_csv(str(fpath), start_date="2010-01-01")
+    assert empty.empty and empty["ma5"].dtype == "float64"
@@ -0,0 +1,190 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from insider.fetch import CircuitBreaker, CircuitOpenError, FetchError, Fetcher
+from insider.stock import Stock
+
+
+@pytest.fixture
+def flaky_server():
+    """Server answering with the scripted (delay, status, body) responses in turn,
+    and a valid payload once the script is used up.
+    """
+    script = []
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            with lock:
+                delay, status, body = script.pop(0) if script else (0, 200, b"{}")
+            time.sleep(delay)
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    server.script = script
+    server.url = f"http://127.0.0.1:{server.server_port}/"
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+def test_retries_transient_failures(flaky_server):
+    flaky_server.script.extend([(0, 503, b""), (0, 200, b"not json")])
+    fetcher = Fetcher(retries=2, backoff=0)
+
+    assert fetcher.get_json(flaky_server.url) == {}
+    assert fetcher.stats.counts["requests"] == 3
+    assert fetcher.stats.counts["retries"] == 2
+
+
+def test_gives_up_after_retries(flaky_server):
+    flaky_server.script.extend([(0, 500, b"")] * 2)
+    fetcher = Fetcher(retries=1, backoff=0)
+
+    with pytest.raises(FetchError, match="after 2 attempts"):
+        fetcher.get_json(flaky_server.url)
+    assert fetcher.stats.counts["failures"] == 1
+
+
+def test_client_errors_are_not_retried(flaky_server):
+    flaky_server.script.append((0, 404, b""))
+    fetcher = Fetcher(retries=2, backoff=0)
+
+    with pytest.raises(FetchError, match="404"):
+        fetcher.get_json(flaky_server.url)
+    assert fetcher.stats.counts["requests"] == 1
+    assert fetcher.breaker.state == "closed"
+
+
+def test_timeout(flaky_server):
+    flaky_server.script.append((0.5, 200, b"{}"))
+    fetcher = Fetcher(timeout=0.1, retries=0)
+
+    with pytest.raises(ValueError, match="timed out"):
+        fetcher.get_json(flaky_server.url)
+
+
+def test_circuit_breaker(flaky_server):
+    flaky_server.script.extend([(0, 500, b"")] * 2)
+    fetcher = Fetcher(retries=0, breaker=CircuitBreaker(threshold=2, reset_timeout=0.2))
+
+    for _ in range(2):
+        with pytest.raises(FetchError):
+            fetcher.get_json(flaky_server.url)
+    assert fetcher.breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        fetcher.get_json(flaky_server.url)
+    assert fetcher.stats.counts["requests"] == 2
+    assert fetcher.stats.counts["rejected"] == 1
+
+    # a successful trial request closes the breaker again
+    time.sleep(0.2)
+    assert fetcher.breaker.state == "half-open"
+    assert fetcher.get_json(flaky_server.url) == {}
+    assert fetcher.breaker.state == "closed"
+
+
+def test_breaker_reopens_after_broken_trial(flaky_server):
+    class BrokenSession(requests.Session):
+        broken = True
+
+        def get(self, *args, **kwargs):
+            if self.broken:
+                raise requests.exceptions.ChunkedEncodingError("connection broken")
+            return super().get(*args, **kwargs)
+
+    session = BrokenSession()
+    breaker = CircuitBreaker(threshold=1, reset_timeout=0.2)
+    fetcher = Fetcher(session=session, retries=0, breaker=breaker)
+    with pytest.raises(FetchError, match="connection broken"):
+        fetcher.get_json(flaky_server.url)
+    assert breaker.state == "open"
+
+    # the broken trial opens the breaker again instead of leaving it stuck
+    time.sleep(0.2)
+    with pytest.raises(FetchError, match="connection broken"):
+        fetcher.get_json(flaky_server.url)
+    assert breaker.state == "open"
+
+    time.sleep(0.2)
+    session.broken = False
+    assert fetcher.get_json(flaky_server.url) == {}
+    assert breaker.state == "closed"
+
+
+def test_trial_is_released_on_unexpected_errors(flaky_server):
+    class FailingSession(requests.Session):
+        def get(self, *args, **kwargs):
+            raise KeyError("unexpected")
+
+    breaker = CircuitBreaker(threshold=1, reset_timeout=0)
+    breaker.record_failure()
+    fetcher = Fetcher(session=FailingSession(), retries=0, breaker=breaker)
+    with pytest.raises(KeyError):
+        fetcher.get_json(flaky_server.url)
+    assert breaker.allow()
+
+
+def test_hedged_request(flaky_server):
+    fetcher = Fetcher(hedge_percentile=90)
+    for _ in range(20):
+        fetcher.get_json(flaky_server.url)
+
+    # the slow first response is overtaken by the hedged duplicate
+    flaky_server.script.append((1, 200, b"{}"))
+    start = time.perf_counter()
+    assert fetcher.get_json(flaky_server.url) == {}
+    assert time.perf_counter() - start < 0.5
+    assert fetcher.stats.counts["hedges"] == 1
+    assert fetcher.stats.counts["hedge_wins"] == 1
+    fetcher.close()
+
+
+def test_latency_summary(flaky_server):
+    fetcher = Fetcher()
+    assert fetcher.stats.percentile(50) is None
+    for _ in range(5):
+        fetcher.get_json(flaky_server.url)
+
+    summary = fetcher.stats.summary()
+    assert summary["requests"] == 5
+    assert 0 < summary["p50"] <= summary["p99"] <= summary["max"]
+
+
+def test_invalid_policy():
+    with pytest.raises(ValueError):
+        Fetcher(retries=-1)
+    with pytest.raises(ValueError):
+        Fetcher(hedge_percentile=100)
+
+
+def test_stock_uses_fetcher(stock_server):
+    stock_server.add("sz002156", "D", stock_server.make_record(10))
+    fetcher = Fetcher()
+
+    Stock("sz002156", fetcher=fetcher)
+    assert fetcher.stats.counts["requests"] == 1
+
+
+def test_stocks_share_the_default_fetcher(stock_server):
+    stock_server.add("sz002156", "D", stock_server.make_record(10))
+    first, second = Stock("sz002156"), Stock("sz002156")
+
+    assert first.fetcher is second.fetcher
+    assert first.fetcher.stats.counts["requests"] == 2
+    session = requests.Session()
+    third = Stock("sz002156", session=session)
+    assert third.fetcher is not first.fetcher and third.fetcher.session is session
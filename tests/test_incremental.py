@@ -0,0 +1,133 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from insider.indicators.incremental import _ema
+from insider.stock_insider import StockInsider
+
+INDICATORS = [
+    ("ma", {"n": 5}),
+    ("md", {"n": 10}),
+    ("ema", {"n": 20}),
+    ("macd", {}),
+    ("kdj", {"n": 9}),
+    ("kdj", {"n": 9, "smooth_type": "ema"}),
+    ("rsi", {"n": 6}),
+    ("env", {}),
+    ("mi", {}),
+    ("mike", {}),
+    ("adtm", {}),
+    ("rc", {}),
+    ("boll", {}),
+    ("bbiboll", {}),
+    ("atr", {}),
+    ("cdp", {"n": 3}),
+    ("mtm", {}),
+    ("dmi", {}),
+    ("vma", {"n": 10}),
+    ("vmacd", {}),
+    ("vstd", {}),
+    ("vrsi", {"n": 12}),
+    ("vosc", {}),
+    ("obv", {}),
+    ("sar", {}),
+]
+
+
+@pytest.mark.parametrize("name, params", INDICATORS)
+def test_append_bar_matches_full_recompute(make_ohlcv, name, params):
+    df = make_ohlcv(300)
+    history, new_bars = df.iloc[:250], df.iloc[250:]
+
+    si = StockInsider("test", df=history.copy())
+    key = si.track(name, **params)
+    for bar in new_bars.to_dict("records"):
+        latest = si.append_bar(**bar)[key]
+
+    assert len(si.full_data) == len(df)
+    expected = getattr(StockInsider("test", df=df), name)(**params).iloc[-1]
+    for col, value in latest.items():
+        if isinstance(value, str):
+            assert value == expected[col]
+        else:
+            np.testing.assert_allclose(value, expected[col], rtol=1e-9, err_msg=col)
+
+
+@pytest.mark.parametrize("name, params", INDICATORS)
+def test_append_bar_with_nan_volumn(make_ohlcv, name, params):
+    df = make_ohlcv(300)
+    df.loc[[260, 270], "volumn"] = np.nan
+
+    si = StockInsider("test", df=df.iloc[:250].copy())
+    key = si.track(name, **params)
+    values = [si.append_bar(**bar)[key] for bar in df.iloc[250:].to_dict("records")]
+
+    expected = getattr(StockInsider("test", df=df), name)(**params).iloc[250:]
+    for col in values[0]:
+        result = [latest[col] for latest in values]
+        if isinstance(result[0], str):
+            assert result == expected[col].tolist()
+        else:
+            np.testing.assert_allclose(result, expected[col], rtol=1e-9, err_msg=col)
+
+
+def test_append_bar_tracks_warm_up(make_ohlcv):
+    df = make_ohlcv(10)
+    si = StockInsider("test", df=df.iloc[:2].copy())
+    key = si.track("ma", n=5)
+
+    values = [
+        si.append_bar(**bar)[key]["close"] for bar in df.iloc[2:].to_dict("records")
+    ]
+    np.testing.assert_allclose(values, si.ma(5)["close"].iloc[2:])
+    assert np.isnan(values[:2]).all()
+
+
+def test_track_invalid_indicator(make_ohlcv):
+    si = StockInsider("test", df=make_ohlcv(10))
+    with pytest.raises(ValueError, match="Invalid indicator is given"):
+        si.track("foo")
+
+    key = si.track("obv")
+    si.untrack(key)
+    assert si.append_bar("2000-02-01", 1.0, 1.0, 1.0, 1.0, 1.0) == {}
+
+
+@pytest.mark.parametrize("n", [3, 5])
+def test_ema_after_nan_gap(make_ohlcv, n):
+    df = make_ohlcv(20)
+    df.loc[[3, 10, 11], "close"] = np.nan
+    si = StockInsider("test", df=df.iloc[:1].copy())
+    key = si.track("ema", n=n)
+
+    values = [
+        si.append_bar(**bar)[key]["close"] for bar in df.iloc[1:].to_dict("records")
+    ]
+    expected = StockInsider("test", df=df).ema(n)["close"].iloc[1:]
+    np.testing.assert_allclose(values, expected, rtol=1e-12)
+
+
+def test_ema_span_3_pandas_quirk():
+    ema = _ema(3)
+    values = [ema.update(x) for x in [1.0, np.nan, np.nan, 4.0]]
+    assert values == [1.0, 1.0, 1.0, 3.625]
+
+
+def test_append_bar_concatenates_once(make_ohlcv, monkeypatch):
+    df = make_ohlcv(60)
+    si = StockInsider("test", df=df.iloc[:50].copy())
+    assert si.ma(5)["close"].iloc[-1] == df["close"].iloc[45:50].mean()
+
+    calls = []
+    concat = pd.concat
+    monkeypatch.setattr(
+        pd, "concat", lambda *a, **k: calls.append(1) or concat(*a, **k)
+    )
+    for bar in df.iloc[50:].to_dict("records"):
+        si.append_bar(**bar)
+    assert si.ma(5)["close"].iloc[-1] == df["close"].iloc[55:].mean()
+    assert len(calls) == 1
+
+    pd.testing.assert_frame_equal(si.full_data, df)
+    si.append_bar("2000-03-01", 1.0, 1.0, 1.0, 1.0, 1.0)
+    assert len(si.full_data) == 61
@@ -0,0 +1,94 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from insider.constants import JIT_ENV
+from insider.indicators import jit
+from insider.indicators.sar import _sar, _sar_panel
+from insider.panel import StockPanel
+from insider.stock_insider import StockInsider
+
+pytest.importorskip("numba")
+
+
+def assert_exact(actual, expected):
+    if isinstance(expected, pd.DataFrame):
+        pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+    else:
+        pd.testing.assert_series_equal(actual, expected, check_exact=True)
+
+
+@pytest.fixture
+def long_series():
+    rng = np.random.default_rng(1)
+    ser = pd.Series(rng.normal(size=100_000)).cumsum()
+    ser[rng.integers(0, len(ser), 1000)] = np.nan
+    return ser
+
+
+@pytest.fixture
+def panel_frame():
+    # stocks listed on different days, with suspended days in between
+    rng = np.random.default_rng(2)
+    frame = pd.DataFrame(rng.normal(size=(2000, 40))).cumsum()
+    frame.iloc[:300, ::3] = np.nan
+    frame.iloc[1000:1010, 1::4] = np.nan
+    return frame
+
+
+@pytest.mark.parametrize("span", [3, 5, 12, 26])
+def test_ema_matches_pandas(long_series, panel_frame, span):
+    for data in (long_series, panel_frame):
+        expected = data.ewm(span=span, adjust=False, min_periods=0).mean()
+        assert_exact(jit.ewm_mean(data, span=span), expected)
+
+
+@pytest.mark.parametrize("n", [3, 6, 14])
+def test_sma_matches_pandas(long_series, panel_frame, n):
+    for data in (long_series.fillna(0), panel_frame.fillna(0)):
+        expected = data.ewm(alpha=1 / n, adjust=False, min_periods=0).mean()
+        assert_exact(jit.ewm_mean(data, alpha=1 / n), expected)
+
+    with pytest.raises(ValueError, match="span must be at least 1"):
+        jit.ewm_mean(long_series, span=0)
+
+
+def test_cumsum_matches_pandas(long_series, panel_frame):
+    for data in (long_series, panel_frame):
+        assert_exact(jit.cumsum(data), data.expanding(1).sum())
+
+
+def test_sar_matches_python(make_ohlcv):
+    df = make_ohlcv(20_000)
+    cols = [df[col].to_numpy() for col in ("high", "low", "close")]
+    for params in ({}, {"af_step": 0.01, "af_max": 0.1}):
+        for actual, expected in zip(jit.sar(*cols, **params), _sar(*cols, **params)):
+            np.testing.assert_array_equal(actual, expected)
+
+    frames = {f"sz{i:06d}": make_ohlcv(3000, seed=i).iloc[i * 50 :] for i in range(20)}
+    frames["sz000003"] = frames["sz000003"].drop(index=range(1500, 1520))
+    panel = StockPanel.from_frames(frames).full_data
+    cols = [panel[col].to_numpy() for col in ("high", "low", "close")]
+    for actual, expected in zip(jit.sar_panel(*cols), _sar_panel(*cols)):
+        np.testing.assert_array_equal(actual, expected)
+
+
+@pytest.mark.parametrize(
+    "name", ["ema", "macd", "kdj", "rsi", "mi", "rc", "obv", "sar"]
+)
+def test_indicators_fall_back_to_pandas(make_ohlcv, monkeypatch, name):
+    df = make_ohlcv(500)
+    df.loc[100, "close"] = np.nan
+    frames = {"sh600000": df, "sz000001": make_ohlcv(500, seed=1).iloc[200:]}
+
+    compiled = getattr(StockInsider("sh600000", df=df), name)()
+    compiled_panel = getattr(StockPanel.from_frames(frames), name)()
+
+    monkeypatch.setenv(JIT_ENV, "0")
+    assert not jit.available()
+    pd.testing.assert_frame_equal(
+        compiled, getattr(StockInsider("sh600000", df=df), name)()
+    )
+    pd.testing.assert_frame_equal(
+        compiled_panel, getattr(StockPanel.from_frames(frames), name)()
+    )
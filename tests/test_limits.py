@@ -0,0 +1,85 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from insider.limits import board_of, limit_hits, limit_matrix, limit_pct, limit_prices
+from insider.panel import StockPanel
+from insider.utils import reach_surged_limit
+
+
+def _reference(prev: float, pct: int, sign: int) -> float:
+    price = Decimal(f"{prev:.2f}") * (100 + sign * pct) / 100
+    return float(price.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
+
+
+@pytest.mark.parametrize("pct", [5, 10, 20, 30])
+def test_limit_prices_round_half_up(pct):
+    prev = np.round(np.random.default_rng(pct).uniform(0.1, 2000, 20_000), 2)
+    up, down = limit_prices(prev, pct)
+    np.testing.assert_array_equal(up, [_reference(p, pct, 1) for p in prev])
+    np.testing.assert_array_equal(down, [_reference(p, pct, -1) for p in prev])
+    # 10.05 x 1.1 = 11.055 is rounded up
+    assert limit_prices(10.05, 10)[0] == 11.06
+
+
+def test_board_limits():
+    codes = ["sh600000", "sz000001", "sz300750", "sh688981", "bj830799", "002156"]
+    assert list(board_of(codes)) == ["main", "main", "chinext", "star", "bse", "main"]
+
+    st = [True, False, True, True, False, False]
+    assert list(limit_pct(codes, st=st)) == [5, 10, 20, 20, 30, 10]
+
+    # ChiNext used the main board limits before the reform
+    pct = limit_pct(codes, st=st, days=["2020-08-21", "2020-08-24"])
+    np.testing.assert_array_equal(
+        pct, [[5, 10, 5, 20, 30, 10], [5, 10, 20, 20, 30, 10]]
+    )
+
+
+def test_limit_hits_snapshot():
+    df = pd.DataFrame(
+        {
+            "code": ["sh600000", "sz300750", "sz000002", "sh688981", "sh600001"],
+            "name": ["浦发银行", "宁德时代", "*ST万科", "中芯国际", "邯郸钢铁"],
+            "preprice": [10.05, 200.00, 3.33, 50.00, 0.04],
+            "price": [11.06, 220.00, 3.16, 40.00, 0.04],
+        }
+    )
+    result = limit_hits(df)
+    assert list(result["hit"]) == [1, 0, -1, -1, 0]
+    assert list(result["limit_up"]) == [11.06, 240.00, 3.50, 60.00, 0.04]
+    assert "hit" not in df
+
+    flags = reach_surged_limit(df, "20240510")
+    assert list(flags.columns) == ["code", "name", "20240510"]
+    assert list(flags["20240510"]) == [1, 0, 0, 0, 0]
+
+
+def test_limit_matrix():
+    close = pd.DataFrame(
+        {
+            "sh600000": [10.00, 11.00, np.nan, 12.10, 10.89],
+            "sz300750": [10.00, 11.00, 13.20, 13.20, 10.56],
+        },
+        index=pd.to_datetime(
+            ["2020-08-20", "2020-08-21", "2020-08-24", "2020-08-25", "2020-08-26"]
+        ),
+    )
+    hits = limit_matrix(close)
+    assert hits.dtypes.eq("int8").all()
+    # a suspended day is skipped; the 20% ChiNext limit starts on 2020-08-24
+    assert list(hits["sh600000"]) == [0, 1, 0, 1, -1]
+    assert list(hits["sz300750"]) == [0, 1, 1, 0, -1]
+
+    st = pd.Series({"sh600000": True})
+    assert list(limit_matrix(close, st=st)["sh600000"]) == [0, 0, 0, 0, 0]
+
+
+def test_panel_limit_hits(make_ohlcv):
+    frames = {"sh600000": make_ohlcv(100, seed=1), "sz300750": make_ohlcv(80, seed=2)}
+    panel = StockPanel.from_frames(frames)
+    pd.testing.assert_frame_equal(
+        panel.limit_hits(), limit_matrix(panel.full_data["close"])
+    )
@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from insider.indicators.lookback import LOOKBACKS, ema_horizon, lookback
+from insider.stock_insider import StockInsider
+
+
+@pytest.mark.parametrize("name", sorted(LOOKBACKS))
+@pytest.mark.parametrize("head", [1, 30, 90])
+def test_indicator_tail_matches_full_history(make_ohlcv, name, head):
+    si = StockInsider("test", df=make_ohlcv(2000))
+
+    result = si._indicator_tail(name, head)
+    expected = getattr(si, name)().tail(head)
+
+    assert len(result) == lookback(name) + head
+    result = result.tail(head)
+    for col in expected.select_dtypes("number"):
+        # recursive indicators are only exact up to WARMUP_TOLERANCE
+        np.testing.assert_allclose(
+            result[col], expected[col], rtol=1e-5, atol=1e-8, err_msg=col
+        )
+
+
+def test_indicator_tail_full_history():
+    assert lookback("obv") is None
+    assert lookback("sar") is None
+    assert ema_horizon(1) == 0
+
+
+def test_indicator_tail_short_history(make_ohlcv):
+    si = StockInsider("test", df=make_ohlcv(50))
+    assert len(si._indicator_tail("macd", 90)) == 50
+    assert len(si._indicator_tail("macd", None)) == 50
+    assert len(si._indicator_tail("obv", 10)) == 50
@@ -0,0 +1,58 @@
+import pandas as pd
+
+from insider.constants import INDICATOR_CACHE_SIZE
+from insider.stock_insider import StockInsider
+
+
+def test_indicator_results_are_cached(make_ohlcv, monkeypatch):
+    si = StockInsider("test", df=make_ohlcv(100))
+    calls = []
+    original = StockInsider._ma
+
+    def counting_ma(self, col, n, df=None):
+        calls.append((col, n))
+        return original(self, col, n, df=df)
+
+    monkeypatch.setattr(StockInsider, "_ma", counting_ma)
+
+    first = si.ma(5)
+    assert si.ma(n=5).equals(first)
+    assert si.ma() is not first
+    assert calls == [("close", 5)]
+
+    si.ma(10)
+    assert calls == [("close", 5), ("close", 10)]
+
+
+def test_cached_result_is_not_shared(make_ohlcv):
+    si = StockInsider("test", df=make_ohlcv(100))
+    result = si.macd()
+    result.loc[:, "macd"] = 0
+
+    assert not (si.macd()["macd"] == 0).all()
+
+
+def test_cache_invalidated_when_data_changes(make_ohlcv):
+    df = make_ohlcv(100)
+    si = StockInsider("test", df=df.iloc[:50])
+    assert len(si.boll()) == 50
+
+    si._df = df
+    assert len(si.boll()) == 100
+
+    si.append_bar("2001-01-01", 1.0, 1.0, 1.0, 1.0, 1.0)
+    pd.testing.assert_frame_equal(
+        si.boll(), StockInsider("test", df=si.full_data).boll()
+    )
+
+
+def test_cache_is_bounded(make_ohlcv):
+    si = StockInsider("test", df=make_ohlcv(50))
+    for n in range(1, INDICATOR_CACHE_SIZE + 10):
+        si.ma(n)
+
+    assert len(si._indicator_cache) == INDICATOR_CACHE_SIZE
+    assert ("ma", ("n", 1)) not in si._indicator_cache
+
+    si.clear_cache()
+    assert len(si._indicator_cache) == 0
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from insider.stock_insider import StockInsider
+
+INDICATORS = [
+    ("ma", {}),
+    ("md", {}),
+    ("ema", {}),
+    ("macd", {}),
+    ("kdj", {}),
+    ("kdj", {"smooth_type": "ema"}),
+    ("rsi", {}),
+    ("env", {}),
+    ("mi", {}),
+    ("mike", {}),
+    ("adtm", {}),
+    ("rc", {}),
+    ("boll", {}),
+    ("bbiboll", {}),
+    ("atr", {}),
+    ("cdp", {"n": 3}),
+    ("mtm", {}),
+    ("dmi", {}),
+    ("vma", {}),
+    ("vmacd", {}),
+    ("vstd", {}),
+    ("vrsi", {}),
+    ("vosc", {}),
+    ("obv", {}),
+    ("sar", {}),
+]
+
+
+@pytest.fixture
+def df(make_ohlcv):
+    df = make_ohlcv(300)
+    df.loc[40, "close"] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("name, params", INDICATORS)
+def test_arrays_match_frame(df, name, params):
+    def compute(output_format):
+        si = StockInsider("sh600000", df=df, output_format=output_format)
+        return getattr(si, name)(**params)
+
+    expected = compute("frame")
+    arrays = compute("arrays")
+    struct = compute("struct")
+
+    assert list(arrays) == list(expected.columns)
+    assert list(struct.dtype.names) == list(expected.columns)
+    for col in expected.columns:
+        values = expected[col].to_numpy()
+        assert arrays[col].flags.c_contiguous
+        np.testing.assert_array_equal(arrays[col], values)
+        np.testing.assert_array_equal(struct[col], values)
+
+
+def test_results_are_copies(df):
+    si = StockInsider("sh600000", df=df, output_format="arrays")
+    result = si.macd()
+    result["macd"][:] = 0
+    assert not (si.macd()["macd"] == 0).all()
+
+    si = StockInsider("sh600000", df=df, output_format="struct")
+    result = si.macd()
+    result["macd"] = 0
+    assert not (si.macd()["macd"] == 0).all()
+
+
+def test_read_only_results_are_shared(df):
+    si = StockInsider("sh600000", df=df, read_only=True, output_format="arrays")
+    result = si.boll()
+
+    assert np.shares_memory(result["close"], si._df["close"].to_numpy())
+    assert np.shares_memory(result["up"], si.boll()["up"])
+    with pytest.raises(ValueError, match="read-only"):
+        result["up"][0] = 0
+
+
+def test_format_is_switched(df):
+    si = StockInsider("sh600000", df=df)
+    assert isinstance(si.kdj(), pd.DataFrame)
+    si.output_format = "arrays"
+    assert isinstance(si.kdj(), dict)
+    si.output_format = "struct"
+    assert isinstance(si.kdj(), np.ndarray)
+
+    si.output_format = "json"
+    with pytest.raises(ValueError, match="Invalid output_format"):
+        si.kdj()
+
+
+def test_plots_still_use_frames(df):
+    si = StockInsider("sh600000", df=df, output_format="arrays")
+    assert len(si.plot_dmi(show=False).data) == 4
+    assert len(si.plot_sar(head=None, show=False).data) > 0
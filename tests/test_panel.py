@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from insider.indicators.base import BaseMixin
+from insider.indicators.panel import PanelIndicatorMixin
+from insider.panel import StockPanel
+from insider.stock_insider import StockInsider
+
+INDICATORS = [
+    name
+    for name in vars(PanelIndicatorMixin)
+    if not name.startswith("_") and name not in vars(BaseMixin)
+]
+
+
+@pytest.fixture
+def frames(make_ohlcv):
+    # stocks listed on different days, all trading up to the same day
+    return {
+        "sh600000": make_ohlcv(300, seed=1),
+        "sz000001": make_ohlcv(300, seed=2).iloc[120:],
+        "sz300750": make_ohlcv(300, seed=3).iloc[280:],
+    }
+
+
+@pytest.mark.parametrize("name", INDICATORS)
+def test_panel_matches_single_stock(frames, name):
+    result = getattr(StockPanel.from_frames(frames), name)()
+
+    for code, df in frames.items():
+        expected = getattr(StockInsider(code, df=df.reset_index(drop=True)), name)()
+        expected = expected.set_index(pd.to_datetime(expected["day"]))
+        for col in result.columns.get_level_values(0).unique():
+            values = result[col][code].loc[expected.index]
+            np.testing.assert_allclose(
+                values.to_numpy(dtype="float64"),
+                expected[col].to_numpy(dtype="float64"),
+                rtol=1e-9,
+                err_msg=f"{name}: {col} of {code}",
+            )
+        # no values before a stock is listed
+        unlisted = result.index < expected.index[0]
+        if name != "sar":
+            assert result.xs(code, axis=1, level=1)[unlisted].isna().all().all()
+
+
+def test_sar_skips_suspended_days(frames):
+    df = frames["sh600000"]
+    suspended = df.drop(df.index[100:105])
+    panel = StockPanel.from_frames({"sh600000": suspended, "sz000001": df})
+
+    expected = StockInsider("sh600000", df=suspended.reset_index(drop=True)).sar()
+    result = panel.sar()["sar"]["sh600000"].dropna()
+    np.testing.assert_allclose(result.to_numpy(), expected["sar"].to_numpy())
+
+
+def test_panel_layout(frames):
+    panel = StockPanel.from_frames(frames)
+    assert panel.codes == list(frames)
+    assert list(panel.macd().columns.get_level_values(0).unique()) == [
+        "diff",
+        "dea",
+        "macd",
+    ]
+    stock = panel.stock("sz300750")
+    assert len(stock) == 20
+    np.testing.assert_allclose(stock["close"], frames["sz300750"]["close"])
+
+
+def test_invalid_panel(frames):
+    with pytest.raises(ValueError, match="At least one"):
+        StockPanel.from_frames({})
+    panel = StockPanel.from_frames(frames)
+    with pytest.raises(ValueError, match="missing"):
+        StockPanel(panel.full_data.drop(columns="open", level=0))
+    with pytest.raises(ValueError, match="pairs"):
+        StockPanel(frames["sh600000"])
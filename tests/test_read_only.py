@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from insider.panel import StockPanel
+from insider.stock_insider import StockInsider
+from insider.utils import freeze
+
+
+def _shares(a: pd.Series, b: pd.Series) -> bool:
+    return np.shares_memory(a.to_numpy(), b.to_numpy())
+
+
+def test_freeze(make_ohlcv):
+    df = make_ohlcv(50)
+    frozen = freeze(df)
+
+    pd.testing.assert_frame_equal(frozen, df)
+    assert not _shares(frozen["close"], df["close"])
+    with pytest.raises(ValueError, match="read-only"):
+        frozen["close"].values[0] = 0
+
+    # slices of a frozen frame are not copied again
+    part = frozen.iloc[10:]
+    assert _shares(freeze(part)["close"], frozen["close"])
+
+
+def test_read_only_data_is_shared(make_ohlcv):
+    df = make_ohlcv(100)
+    si = StockInsider("sh600000", df=df, read_only=True)
+
+    full = si.full_data
+    assert _shares(full["close"], si._df["close"])
+    assert _shares(si.show_data(start_date="2000-02-01")["close"], si._df["close"])
+
+    full.loc[0, "close"] = 0
+    full["extra"] = 1
+    assert si._df.loc[0, "close"] == df.loc[0, "close"]
+    assert "extra" not in si._df
+
+
+@pytest.mark.parametrize("name", ["macd", "kdj", "boll", "atr", "obv", "sar"])
+def test_read_only_indicators(make_ohlcv, name):
+    df = make_ohlcv(200)
+    si = StockInsider("sh600000", df=df, read_only=True)
+    result = getattr(si, name)()
+
+    pd.testing.assert_frame_equal(result, getattr(StockInsider("x", df=df), name)())
+    assert _shares(result["close"], si._df["close"])
+
+    # the cached result is shared but stays intact
+    col = "sar" if name == "sar" else result.columns[-1]
+    result.loc[:, col] = 0
+    assert not getattr(si, name)()[col].eq(0).all()
+
+
+def test_set_read_only(make_ohlcv):
+    si = StockInsider("sh600000", df=make_ohlcv(100))
+    assert not _shares(si.full_data["close"], si._df["close"])
+
+    si.set_read_only()
+    assert _shares(si.full_data["close"], si._df["close"])
+    si.set_read_only(False)
+    assert not _shares(si.full_data["close"], si._df["close"])
+
+    panel = StockPanel.from_frames({"a": make_ohlcv(50), "b": make_ohlcv(40)})
+    expected = panel.macd()
+    panel.set_read_only()
+    col = ("close", "a")
+    assert _shares(panel.full_data[col], panel._df[col])
+    pd.testing.assert_frame_equal(panel.macd(), expected)
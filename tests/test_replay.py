@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+import requests
+
+from insider.replay import ReplayServer, payload_path, record
+from insider.stock import Stock
+from insider.universe import StockUniverse
+
+
+def test_record_and_replay(tmp_path, stock_server):
+    stock_server.add("sz002156", "D", stock_server.make_record(20))
+    stock_server.add("sz002156", "W", stock_server.make_record(5))
+    live = Stock("sz002156")
+
+    paths = record(["sz002156"], str(tmp_path), ktypes=["D", "w"], url=stock_server.url)
+    assert paths == [
+        payload_path(str(tmp_path), "sz002156", "D"),
+        payload_path(str(tmp_path), "sz002156", "W"),
+    ]
+
+    replayed = Stock("sz002156", replay_dir=str(tmp_path))
+    pd.testing.assert_frame_equal(replayed.full_data, live.full_data)
+    assert len(Stock("sz002156", ktype="W", replay_dir=str(tmp_path)).full_data) == 5
+
+    with pytest.raises(ValueError, match="No recorded data"):
+        Stock("sh600000", replay_dir=str(tmp_path))
+
+
+def test_replay_dir_from_environment(tmp_path, stock_server, monkeypatch):
+    stock_server.add("sz002156", "D", stock_server.make_record(20))
+    record(["sz002156"], str(tmp_path), url=stock_server.url)
+
+    monkeypatch.setenv("INSIDER_REPLAY_DIR", str(tmp_path))
+    assert len(Stock("sz002156").full_data) == 20
+    assert len(stock_server.requested) == 1
+
+
+def test_replay_server_serves_directory(tmp_path, stock_server):
+    stock_server.add("sh600000", "D", stock_server.make_record(12))
+    record(["sh600000"], str(tmp_path), url=stock_server.url)
+
+    with ReplayServer(str(tmp_path)) as server:
+        assert len(Stock("sh600000", url=server.url).full_data) == 12
+        with pytest.raises(ValueError, match="No data"):
+            Stock("sz000001", url=server.url)
+
+        universe = StockUniverse(["sh600000", "sz000001"], url=server.url)
+        assert list(universe.load()) == ["sh600000"]
+        assert list(universe.failures) == ["sz000001"]
+        assert requests.get(f"{server.url.split('{')[0]}unknown/").status_code == 404
+
+
+def test_url_from_environment(stock_server, monkeypatch):
+    with ReplayServer() as server:
+        server.add("sz002156", "D", stock_server.make_record(8))
+        monkeypatch.setenv("INSIDER_STOCK_URL", server.url)
+        assert len(Stock("sz002156").full_data) == 8
+        assert server.requested == [("sz002156", "D")]
+        assert not stock_server.requested
@@ -0,0 +1,94 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from insider.cache import BarCache
+from insider.resample import resample_bars
+from insider.stock import Stock
+
+
+@pytest.fixture
+def daily(make_ohlcv):
+    # the National Day holiday of 2023 closed the exchanges from Sep 29 to Oct 6
+    df = make_ohlcv(60)
+    df["day"] = pd.bdate_range("2023-09-04", periods=60).strftime("%Y-%m-%d")
+    holiday = df["day"].between("2023-09-29", "2023-10-06")
+    return df[~holiday].reset_index(drop=True)
+
+
+def test_weekly_bars(daily):
+    weekly = resample_bars(daily, "W")
+
+    assert list(weekly.columns) == list(daily.columns)
+    assert weekly["day"].iloc[3] == "2023-09-28"
+    assert weekly["day"].iloc[4] == "2023-10-13"
+    assert weekly["day"].is_unique
+
+    days = pd.to_datetime(daily["day"])
+    week = daily[(days >= "2023-09-25") & (days <= "2023-09-28")]
+    bar = weekly.iloc[3]
+    assert bar["open"] == week["open"].iloc[0]
+    assert bar["close"] == week["close"].iloc[-1]
+    assert bar["high"] == week["high"].max()
+    assert bar["low"] == week["low"].min()
+    assert bar["volumn"] == week["volumn"].sum()
+    assert weekly["volumn"].sum() == daily["volumn"].sum()
+
+
+def test_monthly_bars(daily):
+    monthly = resample_bars(daily.sample(frac=1, random_state=0), "m")
+
+    assert monthly["day"].tolist() == [
+        "2023-09-28",
+        "2023-10-31",
+        "2023-11-24",
+    ]
+    assert monthly["open"].iloc[1] == daily.set_index("day").loc["2023-10-09", "open"]
+    assert monthly["high"].iloc[2] == daily["high"].iloc[-18:].max()
+
+
+def test_changes_and_moving_averages(daily):
+    daily["day"] = pd.to_datetime(daily["day"])
+    prev_close = np.r_[9.5, daily["close"].to_numpy()[:-1]]
+    daily["price_change"] = daily["close"] - prev_close
+    daily["percent_change"] = daily["price_change"] / prev_close * 100
+    daily["ma5"] = daily["v_ma5"] = 0.0
+    daily["extra"] = "x"
+    weekly = resample_bars(daily, "W")
+
+    assert "extra" not in weekly
+    assert weekly["day"].dtype == daily["day"].dtype
+    closes = np.r_[9.5, weekly["close"].to_numpy()]
+    np.testing.assert_allclose(weekly["price_change"], np.diff(closes))
+    np.testing.assert_allclose(
+        weekly["percent_change"], np.diff(closes) / closes[:-1] * 100
+    )
+    np.testing.assert_allclose(
+        weekly["ma5"], weekly["close"].rolling(5, min_periods=1).mean()
+    )
+    np.testing.assert_allclose(
+        weekly["v_ma5"], weekly["volumn"].rolling(5, min_periods=1).mean()
+    )
+
+
+@pytest.mark.parametrize("ktype", ["D", "Y"])
+def test_invalid_ktype(daily, ktype):
+    with pytest.raises(ValueError, match="Invalid ktype"):
+        resample_bars(daily, ktype)
+
+
+def test_stock_resamples_cached_daily_bars(tmp_path, stock_server):
+    stock_server.add("sh600000", "D", stock_server.make_record(120))
+    cache = BarCache(str(tmp_path), fmt="pickle")
+
+    daily = Stock("sh600000", cache=cache)
+    weekly = Stock("sh600000", ktype="W", cache=cache, resample=True)
+    monthly = Stock("sh600000", ktype="M", cache=cache, resample=True)
+
+    assert stock_server.requested == [("sh600000", "D")]
+    assert os.listdir(tmp_path) == [os.path.basename(cache.path("sh600000", "D"))]
+    pd.testing.assert_frame_equal(weekly.full_data, resample_bars(daily.full_data, "W"))
+    assert monthly.ktype == "M"
+    assert len(monthly.full_data) == 6
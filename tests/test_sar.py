@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from insider.stock_insider import StockInsider
+
+
+def _reference_sar(df, af_step=0.02, af_max=0.2):
+    """Row-by-row implementation the array kernel has to reproduce."""
+    df_sar = df.loc[:, ["day", "close", "high", "low"]]
+    trend, af = True, af_step
+    df_sar.loc[:, "sar"] = df_sar["close"]
+    df_sar.loc[:, "trend"] = True
+
+    start_high = df_sar.loc[0, "high"]
+    start_low = df_sar.loc[0, "low"]
+    for i in range(1, len(df_sar)):
+        reverse = False
+        if trend:
+            df_sar.loc[i, "sar"] = df_sar.loc[i - 1, "sar"] + (
+                af * (start_high - df_sar.loc[i - 1, "sar"])
+            )
+            if df_sar.loc[i, "low"] < df_sar.loc[i, "sar"]:
+                reverse = True
+                start_low = df_sar.loc[i, "low"]
+                df_sar.loc[i, "sar"] = start_high
+                af = af_step
+            elif df_sar.loc[i, "high"] > start_high:
+                start_high = df_sar.loc[i, "high"]
+                af = min(af + af_step, af_max)
+        else:
+            df_sar.loc[i, "sar"] = df_sar.loc[i - 1, "sar"] + (
+                af * (start_low - df_sar.loc[i - 1, "sar"])
+            )
+            if df_sar.loc[i, "high"] > df_sar.loc[i, "sar"]:
+                reverse = True
+                start_high = df_sar.loc[i, "high"]
+                df_sar.loc[i, "sar"] = start_low
+                af = af_step
+            elif df_sar.loc[i, "low"] < start_low:
+                start_low = df_sar.loc[i, "low"]
+                af = min(af + af_step, af_max)
+        trend = trend != reverse
+        df_sar.loc[i, "trend"] = trend
+
+    df_sar.loc[:, "color"] = df_sar["trend"].apply(lambda x: "red" if x else "green")
+    return df_sar
+
+
+@pytest.mark.parametrize("af_step, af_max", [(0.02, 0.2), (0.01, 0.1), (0.05, 0.5)])
+def test_sar_matches_reference(make_ohlcv, af_step, af_max):
+    df = make_ohlcv(400)
+    result = StockInsider("test", df=df).sar(af_step=af_step, af_max=af_max)
+    expected = _reference_sar(df, af_step=af_step, af_max=af_max)
+
+    np.testing.assert_allclose(result["sar"], expected["sar"])
+    np.testing.assert_array_equal(result["trend"], expected["trend"].astype(bool))
+    pd.testing.assert_series_equal(
+        result["color"], expected["color"], check_dtype=False
+    )
+
+
+def test_sar_single_row(make_ohlcv):
+    df = make_ohlcv(1)
+    result = StockInsider("test", df=df).sar()
+    assert result["sar"].iloc[0] == df["close"].iloc[0]
+    assert result["color"].iloc[0] == "red"
@@ -0,0 +1,101 @@
+import pytest
+
+from insider.screener import (
+    BOLL_BREAKOUT,
+    KDJ_CROSS,
+    MACD_TURNS_POSITIVE,
+    SAR_FLIP,
+    CrossAbove,
+    Flip,
+    Screener,
+)
+from insider.stock_insider import StockInsider
+
+CONDITIONS = [KDJ_CROSS, MACD_TURNS_POSITIVE, BOLL_BREAKOUT, SAR_FLIP]
+
+
+def _expected(df, condition):
+    """Evaluate a condition on the full history, without the tail shortcut."""
+    result = getattr(StockInsider("sh600000", df=df), condition.indicator)(
+        **condition.params
+    )
+    before, after = result.iloc[-2], result.iloc[-1]
+    if isinstance(condition, Flip):
+        return bool(before[condition.col]) != bool(after[condition.col])
+    other = condition.other
+    if isinstance(other, str):
+        return (
+            before[condition.col] <= before[other]
+            and after[condition.col] > after[other]
+        )
+    return before[condition.col] <= other and after[condition.col] > other
+
+
+@pytest.fixture
+def frames(make_ohlcv):
+    # the same stocks ending on consecutive days, so that every condition is met
+    return {
+        f"sz{i:06d}": make_ohlcv(300, seed=i % 2).iloc[: 200 + i // 2]
+        for i in range(60)
+    }
+
+
+@pytest.mark.parametrize("condition", CONDITIONS, ids=lambda c: c.name)
+def test_condition_matches_full_history(frames, condition):
+    hits = 0
+    for df in frames.values():
+        values = condition.evaluate(StockInsider("sh600000", df=df))
+        assert (values is not None) == _expected(df, condition)
+        hits += values is not None
+    assert hits > 0
+
+
+def test_screener_run_frames(frames):
+    screener = Screener(CONDITIONS, require="any", processes=2, chunksize=4)
+    matches = screener.run_frames(frames)
+
+    assert not screener.failures
+    assert matches
+    for code, hits in matches.items():
+        assert hits["day"] == frames[code]["day"].iloc[-1]
+        for condition in CONDITIONS:
+            assert (condition.name in hits) == _expected(frames[code], condition)
+    kdj = next(hits["kdj_cross"] for hits in matches.values() if "kdj_cross" in hits)
+    assert kdj["J"] > kdj["D"]
+
+    both = Screener([KDJ_CROSS, SAR_FLIP], processes=2).run_frames(frames)
+    assert set(both) <= set(matches)
+    assert all({"kdj_cross", "sar_flip"} <= set(hits) for hits in both.values())
+
+
+def test_screener_run(stock_server):
+    codes = [f"sz{i:06d}" for i in range(12)]
+    for i, code in enumerate(codes):
+        stock_server.add(code, "D", stock_server.make_record(60 + i, seed=i))
+
+    screener = Screener(
+        [CrossAbove("ma", "close", 10, n=5), Flip("sar", "trend", to=True)],
+        require="any",
+        processes=2,
+        url=stock_server.url,
+    )
+    matches = screener.run(codes + ["sh600999"])
+
+    assert list(screener.failures) == ["sh600999"]
+    assert isinstance(screener.failures["sh600999"], ValueError)
+    assert set(matches) <= set(codes)
+    for hits in matches.values():
+        if "sar.trend flip" in hits:
+            assert hits["sar.trend flip"] == {"trend": True}
+    assert sorted(stock_server.requested) == sorted(
+        (code, "D") for code in codes + ["sh600999"]
+    )
+
+
+def test_invalid_screener():
+    with pytest.raises(ValueError, match="At least one"):
+        Screener([])
+    with pytest.raises(ValueError, match="require"):
+        Screener([KDJ_CROSS], require="most")
+    with pytest.raises(ValueError, match="processes"):
+        Screener([KDJ_CROSS], processes=0)
@@ -1,6 +1,9 @@
+import pandas as pd
 import pytest
 
+from insider.constants import NUMERIC_COLUMNS
 from insider.stock import Stock
+from insider.stock_insider import StockInsider
 
 
 def test_wrong_stock_code():
@@ -22,3 +25,65 @@ def test_wrong_ktype(ktype):
     msg = "Invalid ktype is given"
     with pytest.raises(ValueError, match=msg):
         Stock("sh123456", ktype=ktype)
+
+
+def test_parse_record():
+    record = [
+        ["2020-01-02", "1,234.50", "1,240.00", "1,230.00", "1,220.00", "12,345,678.00"]
+        + [
+            "1.50",
+            "0.12",
+            "10.00",
+            "11.00",
+            "12.00",
+            "1,000.00",
+            "2,000.00",
+            "3,000.00",
+        ],
+        ["2020-01-03", "1.00", "2.00", "3.00", "4.00", "5.00"]
+        + ["6.00", "-7.00", "8.00", "9.00", "10.00", "11.00", "12.00", "13.00"],
+    ]
+    df = Stock._parse_record(record)
+
+    assert list(df.columns) == ["day"] + NUMERIC_COLUMNS
+    assert df["day"].dtype.kind == "M"
+    assert (df[NUMERIC_COLUMNS].dtypes == "float64").all()
+    assert df.loc[0, "open"] == 1234.5
+    assert df.loc[0, "volumn"] == 12345678.0
+    assert df.loc[1, "percent_change"] == -7.0
+
+
+def test_fetch_stock_data(stock_server):
+    stock_server.add("sz002156", "D", stock_server.make_record(15))
+    stock = Stock("sz002156")
+
+    assert len(stock.full_data) == 15
+    assert len(stock.show_data(start_date="2000-01-10")) == 10
+
+
+@pytest.mark.parametrize("parse_dates", [True, False])
+@pytest.mark.parametrize(
+    "start_date, end_date, expected",
+    [
+        (None, None, (0, 20)),
+        ("2000-01-05", None, (2, 20)),
+        (None, "2000-01-05", (0, 3)),
+        ("2000-01-08", "2000-01-12", (5, 8)),
+        ("1999-01-01", "1999-12-31", (0, 0)),
+    ],
+)
+def test_choose_date(make_ohlcv, parse_dates, start_date, end_date, expected):
+    df = make_ohlcv(20)
+    if parse_dates:
+        df["day"] = pd.to_datetime(df["day"])
+
+    result = Stock._choose_date(df, start_date, end_date)
+    pd.testing.assert_frame_equal(result, df.iloc[expected[0] : expected[1]])
+
+
+def test_unsorted_data_is_sorted(make_ohlcv):
+    df = make_ohlcv(20)
+    si = StockInsider("test", df=df.iloc[::-1])
+
+    pd.testing.assert_frame_equal(si.full_data, df)
+    assert len(si.show_data(start_date="2000-01-10", end_date="2000-01-14")) == 5
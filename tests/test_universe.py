@@ -0,0 +1,50 @@
+import pytest
+import pandas as pd
+
+from insider.universe import StockUniverse
+
+
+def test_universe_load(stock_server):
+    codes = [f"sz{i:06d}" for i in range(20)]
+    for i, code in enumerate(codes):
+        stock_server.add(code, "D", stock_server.make_record(30, seed=i))
+
+    universe = StockUniverse(codes, max_workers=4)
+    data = universe.load()
+
+    assert list(data) == codes
+    assert not universe.failures
+    assert all(len(df) == 30 for df in data.values())
+    assert sorted(stock_server.requested) == [(code, "D") for code in codes]
+
+
+def test_universe_reports_failures(stock_server):
+    stock_server.add("sh600000", "D", stock_server.make_record(10))
+
+    universe = StockUniverse(["sh600000", "sh600001", "sx600002"], max_workers=2)
+    data = universe.load()
+
+    assert list(data) == ["sh600000"]
+    assert list(universe.failures) == ["sh600001", "sx600002"]
+    assert isinstance(universe.failures["sh600001"], ValueError)
+
+
+def test_universe_panel(stock_server):
+    stock_server.add("sh600000", "D", stock_server.make_record(10, seed=1))
+    stock_server.add("sz000001", "D", stock_server.make_record(12, seed=2))
+
+    universe = StockUniverse(["sh600000", "sz000001"])
+    with pytest.raises(ValueError, match="No data is loaded yet"):
+        universe.panel()
+
+    universe.load()
+    panel = universe.panel("close")
+    assert list(panel.columns) == ["sh600000", "sz000001"]
+    assert len(panel) == 12
+    assert panel["sh600000"].isna().sum() == 2
+
+    stock_panel = universe.to_panel()
+    assert stock_panel.codes == ["sh600000", "sz000001"]
+    pd.testing.assert_frame_equal(
+        stock_panel.full_data["close"], panel, check_names=False, check_index_type=False
+    )